@@ -0,0 +1,57 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+from metrics.registry import record_cache
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def _load_user(request):
+    # The user row is cached between requests (accounts.signals drops it when
+    # the user is saved, deleted or logs out). A hit is only used when the
+    # session's auth hash matches it, so a password change still signs the
+    # other sessions out; anything else goes through auth.get_user().
+    try:
+        user_id = request.session[SESSION_KEY]
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+    timeout = settings.AUTH_USER_CACHE_TIMEOUT
+    key = user_cache_key(user_id)
+    user = cache.get(key) if timeout else None
+    if user is not None and backend_path in settings.AUTHENTICATION_BACKENDS:
+        session_hash = request.session.get(HASH_SESSION_KEY)
+        if session_hash and constant_time_compare(session_hash, user.get_session_auth_hash()):
+            record_cache('user', True)
+            return user
+    user = auth.get_user(request)
+    if timeout and user.is_authenticated:
+        record_cache('user', False)
+        cache.set(key, user, timeout=timeout)
+    return user
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = _load_user(request)
+    return request._cached_user
+
+
+async def auser(request):
+    return await sync_to_async(get_user)(request)
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+        request.auser = partial(auser, request)
@@ -1 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts import urls as account_urls
+from accounts.middleware import user_cache_key
+from benchmarks.testing import QueryBudgetMixin
+
+
+User = get_user_model()
+
+
+class AccountQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def test_every_url_has_a_budget(self):
+        self.assertBudgetsDeclared(account_urls)
+
+    def test_signup(self):
+        self.assertQueriesOk(self.client.get(reverse('accounts:signup')))
+        response = self.client.post(reverse('accounts:signup'), {
+            'username': 'newcomer',
+            'email': 'newcomer@example.com',
+            'password1': 'correct-horse-battery',
+            'password2': 'correct-horse-battery',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertQueriesOk(response)
+
+    def test_login_and_logout(self):
+        User.objects.create_user('member', password='correct-horse-battery')
+        self.assertQueriesOk(self.client.get(reverse('accounts:login')))
+        response = self.client.post(
+            reverse('accounts:login'), {'username': 'member', 'password': 'correct-horse-battery'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertQueriesOk(response)
+        self.assertQueriesOk(self.client.post(reverse('accounts:logout')))
+
+
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('member')
+        self.client.force_login(self.user)
+
+    def auth_queries(self):
+        tables = [connection.ops.quote_name(model._meta.db_table) for model in (User, Session)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('clubs:list'))
+        # Lookups of the session or user row, not joins such as the club creator.
+        return response, [query for query in queries if any(f'FROM {table} WHERE' in query['sql'] for table in tables)]
+
+    def test_session_and_user_come_from_the_cache(self):
+        self.auth_queries()
+        response, queries = self.auth_queries()
+        self.assertEqual(queries, [])
+        self.assertContains(response, 'member')
+
+    def test_flash_messages_skip_the_session(self):
+        response = self.client.post(reverse('accounts:logout'))
+        self.assertIn('messages', response.cookies)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_saving_the_user_refreshes_it(self):
+        self.auth_queries()
+        self.user.username = 'renamed'
+        self.user.save()
+        response, queries = self.auth_queries()
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, 'renamed')
+
+    def test_password_change_elsewhere_signs_the_session_out(self):
+        self.auth_queries()
+        self.user.set_password('another-horse-battery')
+        self.user.save()
+        # Cached again by a request of another session: this one's hash no longer matches.
+        cache.set(user_cache_key(self.user.pk), User.objects.get(pk=self.user.pk))
+        response, _ = self.auth_queries()
+        self.assertNotContains(response, 'Welcome, <span class="font-semibold">member')
+
@@ -8,4 +8,10 @@ urlpatterns = [
     path('signup/', SignUpView.as_view(), name='signup'),
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
-]
\ No newline at end of file
+]
+
+query_budgets = {
+    'signup': 13,
+    'login': 11,
+    'logout': 6,
+}
@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from api import urls as api_urls
+from benchmarks.testing import QueryBudgetMixin
+from clubs.models import Club
+from memberships.models import Membership
+from posts.models import Post
+
+
+User = get_user_model()
+
+
+class ApiTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        for i in range(4):
+            Membership.objects.create(user=User.objects.create_user(f'member{i}'), club=cls.club, status='APPROVED')
+        for i in range(5):
+            Post.objects.create(
+                title=f'Post {i}', body=f'Body {i}', club=cls.club, author=cls.admin, type='NEWS' if i % 2 else 'BLOG'
+            )
+        cls.post = Post.objects.latest('created_at')
+        cls.outsider = User.objects.create_user('outsider')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_every_url_has_a_budget(self):
+        self.assertBudgetsDeclared(api_urls)
+
+    def test_clubs(self):
+        response = self.client.get(reverse('api:clubs'))
+        self.assertQueriesOk(response)
+        club, = response.json()['results']
+        self.assertEqual((club['id'], club['slug'], club['member_count']), (self.club.pk, 'chess-club', 5))
+
+    def test_clubs_etag(self):
+        url = reverse('api:clubs')
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            not_modified = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(not_modified.status_code, 304)
+        # Only the newest updated_at, off its index; no COUNT of the table.
+        validator, = [query['sql'] for query in queries if 'clubs_club' in query['sql']]
+        self.assertIn('MAX', validator)
+        self.assertNotIn('COUNT', validator)
+
+        other = Club.objects.create(name='Film Club', description='Screenings', creator=self.admin)
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+    def test_sparse_fields_narrow_the_select(self):
+        url = reverse('api:club_posts', kwargs={'pk': self.club.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'title'})
+        self.assertEqual(response.json()['results'][0], {'id': self.post.pk, 'title': self.post.title})
+        select = queries[-1]['sql']
+        self.assertNotIn('body', select)
+        self.assertNotIn('auth_user', select)
+        self.assertEqual(self.client.get(url, {'fields': 'title,secret'}).status_code, 400)
+
+    def test_cursor_pagination(self):
+        url = reverse('api:club_posts', kwargs={'pk': self.club.pk})
+        seen, params = [], {'limit': 2}
+        while True:
+            response = self.client.get(url, params)
+            self.assertQueriesOk(response)
+            data = response.json()
+            seen += [post['id'] for post in data['results']]
+            if not data['next']:
+                break
+            params = {'limit': 2, 'cursor': data['next'].split('cursor=')[1]}
+        self.assertEqual(seen, list(Post.objects.filter(club=self.club).values_list('pk', flat=True)))
+        news = self.client.get(url, {'type': 'news'}).json()['results']
+        self.assertEqual(len(news), 2)
+
+    def test_members_require_membership(self):
+        url = reverse('api:club_members', kwargs={'pk': self.club.pk})
+        response = self.client.get(url)
+        self.assertQueriesOk(response)
+        self.assertEqual(len(response.json()['results']), 5)
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_post_detail_etag(self):
+        url = reverse('api:post', kwargs={'pk': self.post.pk})
+        response = self.client.get(url)
+        self.assertQueriesOk(response)
+        self.assertEqual(response.json()['club'], 'chess-club')
+        not_modified = self.client.get(url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertNotEqual(self.client.get(url, {'fields': 'title'})['ETag'], response['ETag'])
+        self.post.title = 'Renamed'
+        self.post.save()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': response['ETag']}).status_code, 200)
+
+    def test_not_found(self):
+        response = self.client.get(reverse('api:post', kwargs={'pk': 0}))
+        self.assertEqual((response.status_code, response.json()), (404, {'error': 'Not found.'}))
+        self.assertEqual(self.client.get(reverse('api:club_posts', kwargs={'pk': 0})).status_code, 404)
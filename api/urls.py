@@ -0,0 +1,19 @@
+from django.urls import path
+from api.views import ClubListApiView, ClubMemberListApiView, ClubPostListApiView, PostDetailApiView
+
+
+app_name = 'api'
+
+urlpatterns = [
+    path('clubs/', ClubListApiView.as_view(), name='clubs'),
+    path('clubs/<int:pk>/posts/', ClubPostListApiView.as_view(), name='club_posts'),
+    path('clubs/<int:pk>/members/', ClubMemberListApiView.as_view(), name='club_members'),
+    path('posts/<int:pk>/', PostDetailApiView.as_view(), name='post'),
+]
+
+query_budgets = {
+    'clubs': 4,
+    'club_posts': 4,
+    'club_members': 6,
+    'post': 4,
+}
@@ -0,0 +1,205 @@
+from django.core.exceptions import PermissionDenied
+from django.db.models import Max, OuterRef, Subquery
+from django.http import Http404, JsonResponse
+from django.views import View
+from clubs.cache import club_list_version
+from clubs.mixins import ClubMemberRequiredMixin, ConditionalGetMixin, ReplicaReadMixin
+from clubs.models import Club
+from clubs.pagination import CursorPaginator
+from memberships.models import Membership
+from posts.models import Post
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class ApiMixin:
+    # Put first in the bases so errors raised by the permission and replica
+    # mixins come back as JSON too.
+    http_method_names = ['get', 'head', 'options']
+    # UserPassesTestMixin: deny with PermissionDenied instead of a login redirect.
+    raise_exception = True
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return self.error('Not found.', 404)
+        except PermissionDenied:
+            if not request.user.is_authenticated:
+                return self.error('Authentication required.', 401)
+            return self.error('Permission denied.', 403)
+        except ApiError as exc:
+            return self.error(exc.message, exc.status)
+
+    def error(self, message, status):
+        return JsonResponse({'error': message}, status=status)
+
+
+class FieldsMixin:
+    # Public field name -> values() lookup. ?fields=a,b narrows the SELECT to
+    # those columns (and only the joins they need); id is always included.
+    fields = {}
+    default_fields = None
+
+    def get_fields(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            names = self.default_fields or list(self.fields)
+        else:
+            names = [name.strip() for name in requested.split(',') if name.strip()]
+            unknown = [name for name in names if name not in self.fields]
+            if unknown:
+                raise ApiError(f"Unknown field(s): {', '.join(unknown)}. Choose from {', '.join(self.fields)}.")
+        return {'id': 'pk', **{name: self.fields[name] for name in names}}
+
+    def serialize(self, row, fields):
+        # Rows come from values(), so no model instances are built.
+        return {name: row[lookup] for name, lookup in fields.items()}
+
+
+class ApiView(ConditionalGetMixin, FieldsMixin, View):
+    def get_validator_parts(self):
+        # Each URL (fields, cursor, filters) is its own representation.
+        state = self.get_state()
+        return None if state is None else (self.request.get_full_path(), *state)
+
+    def get_state(self):
+        # Values that change whenever the response would, or None for a 404.
+        raise NotImplementedError
+
+
+class CollectionView(ApiView):
+    page_size = 20
+    max_page_size = 100
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_page_size(self):
+        try:
+            limit = int(self.request.GET.get('limit', self.page_size))
+        except ValueError:
+            raise ApiError('limit must be a number.')
+        return min(max(limit, 1), self.max_page_size)
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        # The cursor is built from created_at and pk, so they are always selected.
+        queryset = self.get_queryset().values(*{*fields.values(), 'pk', 'created_at'})
+        page = CursorPaginator(queryset, self.get_page_size()).get_page(request.GET.get('cursor'))
+        return JsonResponse({
+            'results': [self.serialize(row, fields) for row in page.object_list],
+            'next': self.page_url(page.next_cursor),
+            'previous': self.page_url(page.previous_cursor),
+        })
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return self.request.build_absolute_uri(f'{self.request.path}?{query.urlencode()}')
+
+
+class ClubListApiView(ApiMixin, ReplicaReadMixin, CollectionView):
+    fields = {
+        'name': 'name',
+        'slug': 'slug',
+        'description': 'description',
+        'member_count': 'member_count',
+        'post_count': 'published_post_count',
+        'creator': 'creator__username',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+
+    def get_state(self):
+        # As ClubListView: any club change (counters bump updated_at too), off
+        # the updated_at index, or deletion, from the club-list version.
+        return Club.objects.aggregate(last_change=Max('updated_at'))['last_change'], club_list_version()
+
+    def get_queryset(self):
+        return Club.objects.with_member_counts()
+
+
+class ClubPostListApiView(ApiMixin, ReplicaReadMixin, CollectionView):
+    fields = {
+        'title': 'title',
+        'excerpt': 'excerpt',
+        'body': 'body',
+        'type': 'type',
+        'author': 'author__username',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+    default_fields = ['title', 'excerpt', 'type', 'author', 'created_at', 'updated_at']
+    post_types = {'news': Post.objects.news, 'blog': Post.objects.blogs, None: Post.objects.published}
+
+    def get_state(self):
+        # The club row (its counters cover post removals) and its newest post change.
+        if not hasattr(self, '_state'):
+            self._state = Club.objects.filter(pk=self.kwargs['pk']).annotate(
+                last_post_change=Subquery(
+                    Post.objects.filter(club=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]
+                ),
+            ).values_list('updated_at', 'last_post_change').first()
+        return self._state
+
+    def get_queryset(self):
+        if self.get_state() is None:
+            raise Http404
+        posts = self.post_types.get(self.request.GET.get('type'))
+        if posts is None:
+            raise ApiError('type must be news or blog.')
+        return posts().filter(club=self.kwargs['pk'])
+
+
+class ClubMemberListApiView(ApiMixin, ReplicaReadMixin, ClubMemberRequiredMixin, CollectionView):
+    fields = {
+        'username': 'user__username',
+        'role': 'role',
+        'joined': 'created_at',
+    }
+
+    def get_state(self):
+        # Approvals and removals bump the club's counters; role changes only
+        # touch the membership. The club was loaded by the permission check.
+        club = self.get_club()
+        last_member_change = Membership.objects.for_club(club).order_by('-updated_at').values_list(
+            'updated_at', flat=True
+        ).first()
+        return club.updated_at, last_member_change
+
+    def get_queryset(self):
+        return Membership.objects.approved().for_club(self.get_club())
+
+
+class PostDetailApiView(ApiMixin, ReplicaReadMixin, ApiView):
+    fields = {
+        'title': 'title',
+        'excerpt': 'excerpt',
+        'body': 'body',
+        'type': 'type',
+        'club': 'club__slug',
+        'club_name': 'club__name',
+        'author': 'author__username',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+
+    def get_state(self):
+        return Post.objects.published().filter(pk=self.kwargs['pk']).values_list(
+            'updated_at', 'club__updated_at'
+        ).first()
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        row = Post.objects.published().filter(pk=self.kwargs['pk']).values(*set(fields.values())).first()
+        if row is None:
+            raise Http404
+        return JsonResponse(self.serialize(row, fields))
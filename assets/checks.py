@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Error, register
+from assets.css import HOOK_CLASSES, bundle_classes, bundle_path, template_classes
+
+
+@register('assets')
+def check_stylesheet(app_configs, **kwargs):
+    path = bundle_path()
+    try:
+        available = bundle_classes(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return [Error(f'{path} is missing.', hint='Run manage.py build_css.', id='assets.E001')]
+    return [
+        Error(
+            f'{template.relative_to(settings.BASE_DIR)} uses the class {name!r}, '
+            f'which is not in {path.relative_to(settings.BASE_DIR)}.',
+            hint='Run manage.py build_css; if it cannot build the class, add a rule for it in assets/css.py.',
+            id='assets.E002',
+        )
+        for name, template in sorted(template_classes().items())
+        if name not in available and name not in HOOK_CLASSES
+    ]
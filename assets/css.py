@@ -0,0 +1,349 @@
+import re
+from pathlib import Path
+
+from django.conf import settings
+
+
+# A small stand-in for the Tailwind compiler: the utilities the templates use,
+# with Tailwind v3's default values, turned into a stylesheet at build time.
+
+SCREENS = {'sm': '640px', 'md': '768px', 'lg': '1024px', 'xl': '1280px', '2xl': '1536px'}
+PSEUDO_CLASSES = {'hover': ':hover', 'focus': ':focus', 'active': ':active', 'disabled': ':disabled',
+                  'first': ':first-child', 'last': ':last-child'}
+
+# Classes the templates' JavaScript looks up; they carry no styles.
+HOOK_CLASSES = {'bulk-select', 'tab-button', 'tab-content'}
+
+COLORS = {
+    'gray': ['#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151', '#1f2937', '#111827'],
+    'red': ['#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d'],
+    'orange': ['#fff7ed', '#ffedd5', '#fed7aa', '#fdba74', '#fb923c', '#f97316', '#ea580c', '#c2410c', '#9a3412', '#7c2d12'],
+    'yellow': ['#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308', '#ca8a04', '#a16207', '#854d0e', '#713f12'],
+    'green': ['#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d', '#166534', '#14532d'],
+    'teal': ['#f0fdfa', '#ccfbf1', '#99f6e4', '#5eead4', '#2dd4bf', '#14b8a6', '#0d9488', '#0f766e', '#115e59', '#134e4a'],
+    'blue': ['#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a'],
+    'indigo': ['#eef2ff', '#e0e7ff', '#c7d2fe', '#a5b4fc', '#818cf8', '#6366f1', '#4f46e5', '#4338ca', '#3730a3', '#312e81'],
+    'purple': ['#faf5ff', '#f3e8ff', '#e9d5ff', '#d8b4fe', '#c084fc', '#a855f7', '#9333ea', '#7e22ce', '#6b21a8', '#581c87'],
+}
+SHADES = ['50', '100', '200', '300', '400', '500', '600', '700', '800', '900']
+NAMED_COLORS = {'current': 'currentColor', 'transparent': 'transparent', 'black': '#000', 'white': '#fff'}
+PALETTE = [*NAMED_COLORS, *(f'{hue}-{shade}' for hue in COLORS for shade in SHADES)]
+
+FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+}
+FONT_WEIGHTS = {'normal': '400', 'medium': '500', 'semibold': '600', 'bold': '700'}
+RADII = {'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem',
+         'xl': '0.75rem', '2xl': '1rem', 'full': '9999px'}
+MAX_WIDTHS = {'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem', 'xl': '36rem', '2xl': '42rem',
+              '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem', '7xl': '80rem',
+              'full': '100%', 'none': 'none'}
+SHADOWS = {
+    'sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    '': '0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+    'md': '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+    'lg': '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+    'xl': '0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+    'none': '0 0 #0000',
+}
+SIDES = {'': [''], 'x': ['-left', '-right'], 'y': ['-top', '-bottom'],
+         't': ['-top'], 'b': ['-bottom'], 'l': ['-left'], 'r': ['-right']}
+CORNERS = {'': [''], 't': ['-top-left', '-top-right'], 'b': ['-bottom-right', '-bottom-left'],
+           'l': ['-top-left', '-bottom-left'], 'r': ['-top-right', '-bottom-right']}
+GRADIENT_DIRECTIONS = {'r': 'to right', 'l': 'to left', 'b': 'to bottom', 't': 'to top',
+                       'br': 'to bottom right', 'bl': 'to bottom left', 'tr': 'to top right', 'tl': 'to top left'}
+
+# Between the children of space-* and divide-* parents.
+BETWEEN = ' > :not([hidden]) ~ :not([hidden])'
+
+STATIC = {
+    'block': 'display:block', 'inline': 'display:inline', 'inline-block': 'display:inline-block',
+    'flex': 'display:flex', 'inline-flex': 'display:inline-flex', 'grid': 'display:grid',
+    'table': 'display:table', 'hidden': 'display:none',
+    'flex-row': 'flex-direction:row', 'flex-col': 'flex-direction:column', 'flex-wrap': 'flex-wrap:wrap',
+    'flex-1': 'flex:1 1 0%', 'flex-auto': 'flex:1 1 auto', 'flex-none': 'flex:none',
+    'flex-grow': 'flex-grow:1', 'grow': 'flex-grow:1', 'flex-shrink-0': 'flex-shrink:0', 'shrink-0': 'flex-shrink:0',
+    'items-start': 'align-items:flex-start', 'items-center': 'align-items:center', 'items-end': 'align-items:flex-end',
+    'items-baseline': 'align-items:baseline', 'items-stretch': 'align-items:stretch',
+    'justify-start': 'justify-content:flex-start', 'justify-center': 'justify-content:center',
+    'justify-end': 'justify-content:flex-end', 'justify-between': 'justify-content:space-between',
+    'static': 'position:static', 'relative': 'position:relative', 'absolute': 'position:absolute',
+    'overflow-hidden': 'overflow:hidden', 'overflow-auto': 'overflow:auto', 'overflow-x-auto': 'overflow-x:auto',
+    'min-h-screen': 'min-height:100vh', 'min-w-0': 'min-width:0px', 'min-w-full': 'min-width:100%',
+    'text-left': 'text-align:left', 'text-center': 'text-align:center', 'text-right': 'text-align:right',
+    'uppercase': 'text-transform:uppercase', 'lowercase': 'text-transform:lowercase',
+    'capitalize': 'text-transform:capitalize', 'italic': 'font-style:italic',
+    'underline': 'text-decoration-line:underline', 'no-underline': 'text-decoration-line:none',
+    'tracking-tight': 'letter-spacing:-0.025em', 'tracking-wide': 'letter-spacing:0.025em',
+    'tracking-wider': 'letter-spacing:0.05em',
+    'leading-none': 'line-height:1', 'leading-tight': 'line-height:1.25', 'leading-normal': 'line-height:1.5',
+    'leading-relaxed': 'line-height:1.625',
+    'whitespace-nowrap': 'white-space:nowrap', 'whitespace-pre-line': 'white-space:pre-line',
+    'whitespace-pre-wrap': 'white-space:pre-wrap', 'break-words': 'overflow-wrap:break-word',
+    'truncate': 'overflow:hidden;text-overflow:ellipsis;white-space:nowrap',
+    'cursor-pointer': 'cursor:pointer', 'cursor-not-allowed': 'cursor:not-allowed',
+    'outline-none': 'outline:2px solid transparent;outline-offset:2px',
+    'fill-current': 'fill:currentColor',
+    'transition': ('transition-property:color,background-color,border-color,text-decoration-color,fill,stroke,'
+                   'opacity,box-shadow,transform,filter,backdrop-filter;'
+                   'transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms'),
+    'sr-only': ('position:absolute;width:1px;height:1px;padding:0;margin:-1px;overflow:hidden;'
+                'clip:rect(0,0,0,0);white-space:nowrap;border-width:0'),
+    'divide-x': [(BETWEEN, 'border-left-width:1px;border-right-width:0')],
+    'divide-y': [(BETWEEN, 'border-top-width:1px;border-bottom-width:0')],
+    # The typography plugin's prose, cut down to the elements post bodies contain.
+    'prose': [
+        ('', 'color:#374151;max-width:65ch;font-size:1rem;line-height:1.75'),
+        (' p', 'margin-top:1.25em;margin-bottom:1.25em'),
+        (' a', 'color:#111827;text-decoration:underline;font-weight:500'),
+        (' strong', 'color:#111827;font-weight:600'),
+        (' h2', 'color:#111827;font-weight:700;font-size:1.5em;margin-top:2em;margin-bottom:1em;line-height:1.33'),
+        (' h3', 'color:#111827;font-weight:600;font-size:1.25em;margin-top:1.6em;margin-bottom:0.6em;line-height:1.6'),
+        (' ul', 'list-style-type:disc;margin-top:1.25em;margin-bottom:1.25em;padding-left:1.625em'),
+        (' ol', 'list-style-type:decimal;margin-top:1.25em;margin-bottom:1.25em;padding-left:1.625em'),
+        (' blockquote', 'font-style:italic;border-left:0.25rem solid #e5e7eb;padding-left:1em;margin:1.6em 0'),
+        (' > :first-child', 'margin-top:0'),
+        (' > :last-child', 'margin-bottom:0'),
+    ],
+    'prose-lg': [('', 'font-size:1.125rem;line-height:1.78')],
+}
+
+PREFLIGHT = """\
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+html{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4;font-family:ui-sans-serif,system-ui,sans-serif,"Apple Color Emoji","Segoe UI Emoji","Segoe UI Symbol","Noto Color Emoji"}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+small{font-size:80%}
+code,kbd,pre{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,"Liberation Mono","Courier New",monospace;font-size:1em}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,[type='button'],[type='reset'],[type='submit']{-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+"""
+
+TEMPLATE_TAG = re.compile(r'{%.*?%}|{{.*?}}|{#.*?#}', re.S)
+CLASS_ATTRIBUTE = re.compile(r'\bclass="([^"]*)"')
+CLASS_LIST_CALL = re.compile(r'classList\.(?:add|remove|toggle)\(([^)]*)\)')
+QUOTED = re.compile(r"""['"]([^'"]+)['"]""")
+COMMENT = re.compile(r'/\*.*?\*/', re.S)
+DECLARATION_BLOCK = re.compile(r'{[^{}]*}')
+SELECTOR_CLASS = re.compile(r'\.((?:\\.|[\w-])+)')
+
+
+def bundle_path():
+    return Path(settings.BASE_DIR) / 'static' / 'css' / 'app.css'
+
+
+def spacing(value, allow_auto=False):
+    if value == 'px':
+        return '1px'
+    if value == 'auto':
+        return 'auto' if allow_auto else None
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    if number * 2 != int(number * 2):
+        return None
+    return '0px' if number == 0 else f'{number / 4:g}rem'
+
+
+def color(name):
+    if name in NAMED_COLORS:
+        return NAMED_COLORS[name]
+    hue, _, shade = name.rpartition('-')
+    if hue in COLORS and shade in SHADES:
+        return COLORS[hue][SHADES.index(shade)]
+    return None
+
+
+def transparent(value):
+    if not value.startswith('#') or len(value) != 7:
+        return 'transparent' if value == 'transparent' else 'rgb(255 255 255 / 0)'
+    red, green, blue = (int(value[i:i + 2], 16) for i in (1, 3, 5))
+    return f'rgb({red} {green} {blue} / 0)'
+
+
+def color_utility(prefix, value):
+    if prefix == 'bg':
+        return f'background-color:{value}'
+    if prefix == 'text':
+        return f'color:{value}'
+    if prefix == 'border':
+        return f'border-color:{value}'
+    if prefix == 'divide':
+        return [(BETWEEN, f'border-color:{value}')]
+    if prefix == 'ring':
+        return f'--tw-ring-color:{value}'
+    if prefix == 'from':
+        return (f'--tw-gradient-from:{value};--tw-gradient-to:{transparent(value)};'
+                '--tw-gradient-stops:var(--tw-gradient-from),var(--tw-gradient-to)')
+    if prefix == 'to':
+        return f'--tw-gradient-to:{value}'
+    return None
+
+
+def utility(name):
+    # The declarations for one variant-free class: a string, a list of
+    # (selector suffix, declarations) pairs, or None when it is unknown.
+    if name in STATIC:
+        return STATIC[name]
+
+    if match := re.fullmatch(r'(p|m)([xytblr]?)-(.+)', name):
+        prop = 'padding' if match[1] == 'p' else 'margin'
+        value = spacing(match[3], allow_auto=prop == 'margin')
+        return value and ';'.join(f'{prop}{side}:{value}' for side in SIDES[match[2]])
+    if match := re.fullmatch(r'space-([xy])-(.+)', name):
+        value = spacing(match[2])
+        return value and [(BETWEEN, f"margin-{'left' if match[1] == 'x' else 'top'}:{value}")]
+    if match := re.fullmatch(r'gap(?:-([xy]))?-(.+)', name):
+        prop = {None: 'gap', 'x': 'column-gap', 'y': 'row-gap'}[match[1]]
+        value = spacing(match[2])
+        return value and f'{prop}:{value}'
+    if match := re.fullmatch(r'([wh])-(.+)', name):
+        prop = 'width' if match[1] == 'w' else 'height'
+        value = {'full': '100%', 'screen': '100vw' if prop == 'width' else '100vh'}.get(match[2])
+        value = value or spacing(match[2], allow_auto=True)
+        return value and f'{prop}:{value}'
+    if match := re.fullmatch(r'max-w-(.+)', name):
+        width = MAX_WIDTHS.get(match[1])
+        return width and f'max-width:{width}'
+
+    if match := re.fullmatch(r'text-(.+)', name):
+        if match[1] in FONT_SIZES:
+            size, line_height = FONT_SIZES[match[1]]
+            return f'font-size:{size};line-height:{line_height}'
+    if match := re.fullmatch(r'font-(.+)', name):
+        weight = FONT_WEIGHTS.get(match[1])
+        return weight and f'font-weight:{weight}'
+    if match := re.fullmatch(r'(bg|text|border|divide|ring|from|to)-(.+)', name):
+        value = color(match[2])
+        if value:
+            return color_utility(match[1], value)
+    if match := re.fullmatch(r'bg-gradient-to-(\w+)', name):
+        direction = GRADIENT_DIRECTIONS.get(match[1])
+        return direction and f'background-image:linear-gradient({direction},var(--tw-gradient-stops))'
+
+    if match := re.fullmatch(r'border(?:-([xytblr]))?(?:-(0|2|4|8))?', name):
+        width = f'{match[2] or 1}px'
+        return ';'.join(f'border{side}-width:{width}' for side in SIDES[match[1] or ''])
+    if match := re.fullmatch(r'rounded(?:-([tblr]))?(?:-(\w+))?', name):
+        radius = RADII.get(match[2] or '')
+        return radius and ';'.join(f'border{corner}-radius:{radius}' for corner in CORNERS[match[1] or ''])
+    if match := re.fullmatch(r'shadow(?:-(\w+))?', name):
+        shadow = SHADOWS.get(match[1] or '')
+        return shadow and f'box-shadow:{shadow}'
+    if match := re.fullmatch(r'ring(?:-(\d))?', name):
+        width = match[1] or '3'
+        return f'box-shadow:0 0 0 {width}px var(--tw-ring-color,rgb(59 130 246 / 0.5))'
+
+    if match := re.fullmatch(r'grid-cols-(\d+)', name):
+        return f'grid-template-columns:repeat({match[1]},minmax(0,1fr))'
+    if match := re.fullmatch(r'col-span-(\d+)', name):
+        return f'grid-column:span {match[1]} / span {match[1]}'
+    if match := re.fullmatch(r'line-clamp-(\d+)', name):
+        return f'overflow:hidden;display:-webkit-box;-webkit-box-orient:vertical;-webkit-line-clamp:{match[1]}'
+    if match := re.fullmatch(r'opacity-(\d+)', name):
+        return f'opacity:{int(match[1]) / 100:g}'
+    return None
+
+
+def escape(name):
+    return re.sub(r'([^\w-])', r'\\\1', name)
+
+
+def rules_for(name):
+    # (screen or None, CSS rules) for a class with its variants, or None.
+    *variants, base = name.split(':')
+    screen, pseudo = None, ''
+    for variant in variants:
+        if variant in SCREENS and screen is None:
+            screen = variant
+        elif variant in PSEUDO_CLASSES:
+            pseudo += PSEUDO_CLASSES[variant]
+        else:
+            return None
+    if base == 'container' and not variants:
+        return None, ['.container{width:100%}'] + [
+            f'@media (min-width:{width}){{.container{{max-width:{width}}}}}' for width in SCREENS.values()
+        ]
+    declarations = utility(base)
+    if not declarations:
+        return None
+    if isinstance(declarations, str):
+        declarations = [('', declarations)]
+    selector = f'.{escape(name)}{pseudo}'
+    return screen, [f'{selector}{suffix}{{{body}}}' for suffix, body in declarations]
+
+
+def sort_key(name):
+    # Variants after plain utilities, and color utilities in palette order as
+    # Tailwind emits them: a color the tab script adds over border-transparent
+    # or text-gray-700 has to come later to win.
+    *variants, base = name.split(':')
+    prefix, _, value = base.partition('-')
+    if value in PALETTE:
+        return bool(variants), prefix, PALETTE.index(value), name
+    return bool(variants), base, 0, name
+
+
+def build_stylesheet(classes):
+    # Returns the stylesheet and the classes no rule matched. Responsive
+    # variants come last, smallest screen first, so they win over the base.
+    groups = {screen: [] for screen in [None, *SCREENS]}
+    unknown = set()
+    for name in sorted(classes - HOOK_CLASSES, key=sort_key):
+        found = rules_for(name)
+        if found is None:
+            unknown.add(name)
+        else:
+            groups[found[0]].extend(found[1])
+
+    lines = ['/* Generated by manage.py build_css from the classes in the templates; do not edit. */',
+             PREFLIGHT.rstrip(), *groups[None]]
+    for screen, width in SCREENS.items():
+        if groups[screen]:
+            lines += [f'@media (min-width:{width}){{', *groups[screen], '}']
+    return '\n'.join(lines) + '\n', unknown
+
+
+def template_files():
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        yield from sorted(Path(directory).rglob('*.html'))
+
+
+def template_classes():
+    # Class name -> the first template using it, from class attributes and
+    # the classList calls in inline scripts. Template tags are dropped first,
+    # so both branches of an {% if %} inside an attribute count.
+    found = {}
+    for path in template_files():
+        source = TEMPLATE_TAG.sub(' ', path.read_text(encoding='utf-8'))
+        names = [name for value in CLASS_ATTRIBUTE.findall(source) for name in value.split()]
+        names += [name for call in CLASS_LIST_CALL.findall(source) for name in QUOTED.findall(call)]
+        for name in names:
+            found.setdefault(name, path)
+    return found
+
+
+def bundle_classes(css):
+    # Only the innermost blocks are declarations; @media wraps selectors.
+    selectors = DECLARATION_BLOCK.sub(' ', COMMENT.sub(' ', css))
+    return {match.replace('\\', '') for match in SELECTOR_CLASS.findall(selectors)}
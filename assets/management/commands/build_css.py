@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from assets.css import build_stylesheet, bundle_path, template_classes
+
+
+class Command(BaseCommand):
+    help = (
+        'Build static/css/app.css from the utility classes the templates use. The stylesheet '
+        'is committed, so production needs neither Node nor the Tailwind CDN.'
+    )
+    # The assets check fails until this command has written the stylesheet.
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Fail instead of writing when the stylesheet is out of date.')
+
+    def handle(self, *args, check, **options):
+        classes = template_classes()
+        css, unknown = build_stylesheet(set(classes))
+        if unknown:
+            raise CommandError('No rule for: ' + ', '.join(
+                f'{name} ({classes[name].relative_to(settings.BASE_DIR)})' for name in sorted(unknown)
+            ))
+
+        path = bundle_path()
+        current = path.read_text(encoding='utf-8') if path.exists() else None
+        if current == css:
+            self.stdout.write(f'{path} is up to date ({len(classes)} classes).')
+        elif check:
+            raise CommandError(f'{path} is out of date; run manage.py build_css.')
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(css, encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Wrote {path} ({len(classes)} classes, {len(css)} bytes).'))
@@ -0,0 +1,37 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from assets.checks import check_stylesheet
+from assets.css import build_stylesheet
+
+
+class StylesheetTests(SimpleTestCase):
+    def test_committed_stylesheet_is_up_to_date(self):
+        call_command('build_css', check=True, stdout=StringIO())
+
+    def test_rules_follow_variants(self):
+        css, unknown = build_stylesheet({'py-0.5', 'hover:bg-indigo-700', 'md:px-4', 'space-y-2', 'not-a-utility'})
+        self.assertEqual(unknown, {'not-a-utility'})
+        self.assertIn('.py-0\\.5{padding-top:0.125rem;padding-bottom:0.125rem}', css)
+        self.assertIn('.hover\\:bg-indigo-700:hover{background-color:#4338ca}', css)
+        self.assertIn('@media (min-width:768px){\n.md\\:px-4{padding-left:1rem;padding-right:1rem}\n}', css)
+        self.assertIn('.space-y-2 > :not([hidden]) ~ :not([hidden]){margin-top:0.5rem}', css)
+
+    def test_palette_colors_come_after_transparent(self):
+        # The club page's tab script adds border-indigo-600 over border-transparent.
+        css, _ = build_stylesheet({'border-indigo-600', 'border-transparent'})
+        self.assertLess(css.index('.border-transparent'), css.index('.border-indigo-600'))
+
+    def test_check_reports_classes_missing_from_the_stylesheet(self):
+        with tempfile.TemporaryDirectory(dir=settings.BASE_DIR) as directory:
+            Path(directory, 'page.html').write_text(
+                '<div class="px-4 {% if wide %}w-full{% endif %} not-a-utility"></div>'
+            )
+            with override_settings(TEMPLATES=[{**settings.TEMPLATES[0], 'DIRS': [directory]}]):
+                errors = check_stylesheet(None)
+        self.assertEqual([error.id for error in errors], ['assets.E002'])
+        self.assertIn("'not-a-utility'", errors[0].msg)
@@ -0,0 +1,99 @@
+import json
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from benchmarks.management.commands.run_benchmarks import Command as BenchmarkCommand, percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the throughput of the JSON API with the HTML pages that show the same data, '
+        'through the test client against the data created by seed_benchmark_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--cold-cache', action='store_true',
+                            help='Clear the cache before every request.')
+        parser.add_argument('--output', help='Also write the results as JSON.')
+
+    def handle(self, *args, **options):
+        targets = BenchmarkCommand().targets()
+        club, post = targets['club'], targets['post']
+        pairs = {
+            'club_list': (reverse('clubs:list'), reverse('api:clubs')),
+            'club_posts': (
+                reverse('clubs:detail', kwargs={'slug': club.slug}),
+                reverse('api:club_posts', kwargs={'pk': club.pk}),
+            ),
+            'members': (
+                reverse('clubs:members', kwargs={'pk': club.pk}),
+                reverse('api:club_members', kwargs={'pk': club.pk}),
+            ),
+            'post_detail': (
+                reverse('posts:detail', kwargs={'pk': post.pk}),
+                reverse('api:post', kwargs={'pk': post.pk}),
+            ),
+        }
+        if settings.QUERY_INSPECTOR:
+            self.stderr.write('QUERY_INSPECTOR is on; its per-query stack capture inflates the timings.')
+
+        client = Client()
+        client.force_login(targets['admin'])
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name, (html_url, api_url) in pairs.items():
+                results[name] = {
+                    'html': self.measure(client, html_url, options),
+                    'api': self.measure(client, api_url, options),
+                }
+                self.stdout.write(self.format_result(name, results[name]))
+
+        if options['output']:
+            report = {
+                'settings': {key: options[key] for key in ('iterations', 'warmup', 'cold_cache')},
+                'database': connection.vendor,
+                'results': results,
+            }
+            Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def measure(self, client, url, options):
+        for _ in range(options['warmup']):
+            client.get(url)
+        timings, queries = [], []
+        for _ in range(options['iterations']):
+            if options['cold_cache']:
+                cache.clear()
+            with ExitStack() as stack:
+                captured = [stack.enter_context(CaptureQueriesContext(db)) for db in connections.all()]
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(sum(len(queries) for queries in captured))
+        return {
+            'url': url,
+            'status': response.status_code,
+            'throughput': len(timings) / (sum(timings) / 1000),
+            'ms': {'p50': percentile(timings, 50), 'p95': percentile(timings, 95)},
+            'queries': max(queries),
+            'bytes': len(response.content),
+        }
+
+    def format_result(self, name, result):
+        html, api = result['html'], result['api']
+        return (
+            f"{name:<12} html {html['throughput']:7.1f} req/s p50 {html['ms']['p50']:6.2f} ms "
+            f"{html['queries']:2d} queries {html['bytes']:7d} B | "
+            f"api {api['throughput']:7.1f} req/s p50 {api['ms']['p50']:6.2f} ms "
+            f"{api['queries']:2d} queries {api['bytes']:7d} B | x{api['throughput'] / html['throughput']:.1f}"
+        )
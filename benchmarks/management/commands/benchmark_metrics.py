@@ -0,0 +1,134 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from django.test.utils import override_settings
+from django.urls import resolve, reverse
+from benchmarks.management.commands.run_benchmarks import Command as BenchmarkCommand, percentile
+from metrics.middleware import MetricsMiddleware, _request_queries, record_query
+from metrics.registry import MULTIPROCESS
+
+
+METRICS_MIDDLEWARE = 'metrics.middleware.MetricsMiddleware'
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure what the metrics middleware adds per request and per SQL statement, in '
+        'isolation and through the test client against the data created by seed_benchmark_data. '
+        'Set METRICS_MULTIPROC_DIR to an empty directory to measure the mmap store gunicorn uses.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000,
+                            help='Calls for the isolated middleware and query timings.')
+        parser.add_argument('--requests', type=int, default=300, help='Test client requests per setting.')
+        parser.add_argument('--output', help='Also write the results as JSON.')
+
+    def handle(self, *args, **options):
+        if settings.QUERY_INSPECTOR:
+            self.stderr.write('QUERY_INSPECTOR is on; its per-query stack capture inflates the timings.')
+        results = {
+            'store': 'mmap' if MULTIPROCESS else 'memory',
+            'middleware_us': self.measure_middleware(options['iterations']),
+            'query_us': self.measure_queries(options['iterations']),
+            'request_ms': self.measure_requests(options['requests']),
+        }
+        middleware, query, request = results['middleware_us'], results['query_us'], results['request_ms']
+        self.stdout.write(f"Store: {results['store']}")
+        self.stdout.write(f"Middleware overhead per request: {middleware['overhead']:6.1f} us "
+                          f"(p50 {middleware['p50']:.1f} us with, {middleware['baseline_p50']:.1f} us without)")
+        self.stdout.write(f"Overhead per SQL statement:      {query['overhead']:6.1f} us "
+                          f"(SELECT 1 p50 {query['p50']:.1f} us recorded, {query['baseline_p50']:.1f} us not)")
+        self.stdout.write(f"Club list through the client:    p50 {request['p50']:.2f} ms with, "
+                          f"{request['baseline_p50']:.2f} ms without ({request['overhead_percent']:+.1f}%)")
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def time_calls(self, func, iterations):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1_000_000)
+        return timings
+
+    def compare(self, measured, baseline):
+        return {
+            'p50': percentile(measured, 50),
+            'baseline_p50': percentile(baseline, 50),
+            'mean': statistics.fmean(measured),
+            'baseline_mean': statistics.fmean(baseline),
+            'overhead': percentile(measured, 50) - percentile(baseline, 50),
+        }
+
+    def measure_middleware(self, iterations):
+        # A response that costs nothing to make, so all that is timed is the
+        # labelling and the six metric updates.
+        request = RequestFactory().get(reverse('clubs:list'))
+        request.resolver_match = resolve(request.path_info)
+        response = HttpResponse(b'x' * 20000)
+        response['Content-Length'] = '20000'
+
+        def get_response(request):
+            return response
+
+        middleware = MetricsMiddleware(get_response)
+        for _ in range(1000):
+            middleware(request)
+        return self.compare(
+            self.time_calls(lambda: middleware(request), iterations),
+            self.time_calls(lambda: get_response(request), iterations),
+        )
+
+    def measure_queries(self, iterations):
+        connection.ensure_connection()
+        cursor = connection.cursor()
+        token = _request_queries.set([])
+        try:
+            recorded = self.time_calls(lambda: cursor.execute('SELECT 1'), iterations)
+        finally:
+            _request_queries.reset(token)
+        wrappers = connection.execute_wrappers
+        connection.execute_wrappers = [wrapper for wrapper in wrappers if wrapper is not record_query]
+        try:
+            baseline = self.time_calls(lambda: cursor.execute('SELECT 1'), iterations)
+        finally:
+            connection.execute_wrappers = wrappers
+            cursor.close()
+        return self.compare(recorded, baseline)
+
+    def measure_requests(self, requests):
+        # Alternating blocks, so drift in the machine's speed hits both sides.
+        targets = BenchmarkCommand().targets()
+        url = reverse('clubs:list')
+        without = [name for name in settings.MIDDLEWARE if name != METRICS_MIDDLEWARE]
+        with_metrics = [METRICS_MIDDLEWARE, *without]
+        timings = {True: [], False: []}
+        block = max(requests // 10, 1)
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for _ in range(0, requests, block):
+                for enabled in (True, False):
+                    with override_settings(MIDDLEWARE=with_metrics if enabled else without):
+                        client = Client()
+                        client.force_login(targets['admin'])
+                        client.get(url)
+                        for _ in range(block):
+                            start = time.perf_counter()
+                            client.get(url)
+                            timings[enabled].append((time.perf_counter() - start) * 1000)
+        measured, baseline = timings[True], timings[False]
+        return {
+            'url': url,
+            'p50': percentile(measured, 50),
+            'baseline_p50': percentile(baseline, 50),
+            'overhead_percent': (percentile(measured, 50) / percentile(baseline, 50) - 1) * 100,
+        }
@@ -0,0 +1,91 @@
+import json
+import re
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from benchmarks.management.commands.run_benchmarks import Command as BenchmarkCommand
+
+
+# Django's defaults: database sessions, messages in the session when they do
+# not fit the cookie, and a user SELECT on every request.
+DEFAULT_STACK = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'MESSAGE_STORAGE': 'django.contrib.messages.storage.fallback.FallbackStorage',
+    'AUTH_USER_CACHE_TIMEOUT': 0,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Count the database round trips of signed-in requests with Django\'s default session, '
+        'message and user handling and with the configured ones, against the data created by '
+        'seed_benchmark_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Also write the results as JSON.')
+
+    def handle(self, *args, **options):
+        targets = BenchmarkCommand().targets()
+        club, post = targets['club'], targets['post']
+        club_url = reverse('clubs:detail', kwargs={'slug': club.slug})
+        flows = {
+            'club_list': [('get', reverse('clubs:list'))],
+            'club_detail': [('get', club_url)],
+            'post_detail': [('get', reverse('posts:detail', kwargs={'pk': post.pk}))],
+            'feed': [('get', reverse('feeds:home'))],
+            'notifications': [('get', reverse('notifications:inbox'))],
+            # A POST that flashes a message ("already a member", so nothing is
+            # written) and the page that shows it.
+            'message_round_trip': [('post', reverse('clubs:join', kwargs={'pk': club.pk})), ('get', club_url)],
+        }
+        configured = {name: getattr(settings, name) for name in DEFAULT_STACK}
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for label, stack in (('default', DEFAULT_STACK), ('configured', configured)):
+                with override_settings(**stack):
+                    results[label] = self.measure(targets['admin'], flows)
+
+        self.stdout.write(f"{'flow':<20} {'default':>16} {'configured':>16}")
+        for name in flows:
+            before, after = results['default'][name], results['configured'][name]
+            self.stdout.write(
+                f"{name:<20} {before['queries']:>5} ({before['session_and_user']} auth) "
+                f"{after['queries']:>5} ({after['session_and_user']} auth)"
+            )
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def measure(self, user, flows):
+        # A fresh client per stack, since the session engine is bound at login.
+        client = Client()
+        client.force_login(user)
+        tables = '|'.join(
+            re.escape(connection.ops.quote_name(model._meta.db_table)) for model in (Session, get_user_model())
+        )
+        # Statements on the session or user row itself, not joins such as a post's author.
+        own_rows = re.compile(rf'(UPDATE|INSERT INTO|DELETE FROM) ({tables})|SELECT .* FROM ({tables}) WHERE')
+        results = {}
+        for name, requests in flows.items():
+            # Once to warm the caches, then measured.
+            for _ in range(2):
+                with ExitStack() as stack:
+                    captured = [stack.enter_context(CaptureQueriesContext(db)) for db in connections.all()]
+                    for method, url in requests:
+                        getattr(client, method)(url)
+            queries = [query['sql'] for queries in captured for query in queries]
+            results[name] = {
+                'queries': len(queries),
+                'session_and_user': sum(1 for sql in queries if own_rows.match(sql)),
+            }
+        return results
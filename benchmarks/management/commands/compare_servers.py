@@ -0,0 +1,185 @@
+import http.client
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from benchmarks.management.commands.run_benchmarks import PERCENTILES, Command as BenchmarkCommand, percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the site under gunicorn as WSGI (sync views) and as ASGI with uvicorn '
+        'workers (async detail views), put the same concurrent load on both and compare tail latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', action='append', dest='servers', choices=('wsgi', 'asgi'),
+                            help='Only run the named server; may be repeated.')
+        parser.add_argument('--concurrency', type=int, default=32, help='Clients issuing requests at once.')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per view and server.')
+        parser.add_argument('--warmup', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=2, help='Server processes.')
+        parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker.')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--cold-cache', action='store_true',
+                            help='Run the servers with FRAGMENT_CACHE_TIMEOUT=0.')
+        parser.add_argument('--output', help='Also write the results as JSON.')
+
+    def handle(self, *args, **options):
+        targets = BenchmarkCommand().targets()
+        client = Client()
+        client.force_login(targets['admin'])
+        cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        paths = {
+            'club_detail': reverse('clubs:detail', kwargs={'slug': targets['club'].slug}),
+            'post_detail': reverse('posts:detail', kwargs={'pk': targets['post'].pk}),
+        }
+
+        results = {}
+        for server in options['servers'] or ('wsgi', 'asgi'):
+            with self.serve(server, options):
+                for name, path in paths.items():
+                    self.load(options, path, cookie, options['warmup'])
+                    result = results.setdefault(name, {})[server] = self.load(options, path, cookie, options['requests'])
+                    self.stdout.write(self.format_result(f'{name} {server}', result))
+
+        if options['output']:
+            report = {
+                'settings': {key: options[key] for key in ('concurrency', 'requests', 'workers', 'threads', 'cold_cache')},
+                'database': connection.vendor,
+                'results': results,
+            }
+            Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def command(self, server, options):
+        # Both under gunicorn so process management is the same; the ASGI side
+        # runs uvicorn's worker class.
+        command = [
+            sys.executable, '-m', 'gunicorn', f'clubhub.{server}:application',
+            '--bind', f"127.0.0.1:{options['port']}", '--workers', str(options['workers']),
+            '--log-level', 'warning',
+        ]
+        if server == 'wsgi':
+            return [*command, '--worker-class', 'gthread', '--threads', str(options['threads'])]
+        return [*command, '--worker-class', 'uvicorn.workers.UvicornWorker']
+
+    @contextmanager
+    def serve(self, server, options):
+        env = {
+            **os.environ,
+            'ASYNC_VIEWS': str(server == 'asgi'),
+            'DEBUG': 'False',
+            'QUERY_INSPECTOR': 'False',
+            'ALLOWED_HOSTS': '127.0.0.1',
+            # Persistent connections leak under ASGI, where every request runs in
+            # a fresh thread context; the async views' DB workers keep theirs.
+            'DB_CONN_MAX_AGE': '60' if server == 'wsgi' else '0',
+        }
+        if options['cold_cache']:
+            env['FRAGMENT_CACHE_TIMEOUT'] = '0'
+        # The workers share their metrics through files, as in production.
+        env['METRICS_MULTIPROC_DIR'] = metrics_dir = tempfile.mkdtemp(prefix='clubhub-metrics-')
+
+        # With DEBUG off, pages link the hashed static names from the manifest.
+        call_command('collectstatic', interactive=False, verbosity=0)
+        command = self.command(server, options)
+        process = subprocess.Popen(command, env=env, cwd=settings.BASE_DIR)
+        try:
+            self.wait_until_listening(process, server, options['port'])
+            yield
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+    def wait_until_listening(self, process, name, port):
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'{name} exited with status {process.returncode}.')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'{name} did not start listening on port {port}.')
+
+    def load(self, options, path, cookie, total):
+        # Closed loop: each client sends its next request as soon as the last one returns.
+        timings, errors = [], []
+        remaining = iter(range(total))
+        lock = threading.Lock()
+
+        def client():
+            connection = http.client.HTTPConnection('127.0.0.1', options['port'], timeout=30)
+            headers = {'Cookie': cookie}
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                start = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                except (OSError, http.client.HTTPException) as exc:
+                    connection.close()
+                    with lock:
+                        errors.append(repr(exc))
+                    continue
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    if response.status == 200:
+                        timings.append(elapsed)
+                    else:
+                        errors.append(str(response.status))
+            connection.close()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        if not timings:
+            raise CommandError(f'Every request to {path} failed: {errors[:3]}')
+        return {
+            'requests': len(timings),
+            'errors': len(errors),
+            'throughput': len(timings) / wall,
+            'ms': {
+                **{f'p{p}': percentile(timings, p) for p in PERCENTILES},
+                'mean': statistics.fmean(timings),
+                'max': max(timings),
+            },
+        }
+
+    def format_result(self, name, result):
+        ms = result['ms']
+        return (
+            f"{name:<18} p50 {ms['p50']:8.2f} ms  p95 {ms['p95']:8.2f} ms  p99 {ms['p99']:8.2f} ms  "
+            f"max {ms['max']:8.2f} ms  {result['throughput']:7.1f} req/s  errors {result['errors']}"
+        )
+
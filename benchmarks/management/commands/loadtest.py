@@ -0,0 +1,300 @@
+import http.client
+import json
+import random
+import re
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils.crypto import get_random_string
+from benchmarks.management.commands.compare_servers import Command as ServerCommand
+from benchmarks.management.commands.run_benchmarks import percentile
+from clubs.models import Club
+from memberships.models import Membership
+from posts.models import Post
+from tasks.queue import batch
+from tasks.worker import run_tasks
+
+
+TRAFFIC = Path(__file__).resolve().parents[2] / 'traffic.jsonl'
+
+# Signed-in personas get their own users; members and admins belong to every
+# load test club, outsiders to none.
+PERSONAS = ('anonymous', 'member', 'admin', 'outsider')
+ROLES = {'member': 'MEMBER', 'admin': 'ADMIN'}
+PLACEHOLDER = re.compile(r'{(\w+)}')
+PLACEHOLDERS = ('club_id', 'club_slug', 'post_id')
+USERNAME_PREFIX = 'load_'
+CLUB_PREFIX = 'Loadtest Club'
+
+PERCENTILES = (50, 95, 99)
+# Upper bounds of the latency histogram buckets, in ms.
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def read_traffic(path):
+    routes = []
+    with open(path, encoding='utf-8') as stream:
+        for line, text in enumerate(stream, 1):
+            if not text.strip():
+                continue
+            try:
+                route = json.loads(text)
+            except json.JSONDecodeError as exc:
+                raise CommandError(f'{path}:{line}: {exc}')
+            if not isinstance(route, dict) or not str(route.get('url', '')).startswith('/'):
+                raise CommandError(f'{path}:{line}: needs a url starting with /.')
+            route['method'] = route.get('method', 'GET').upper()
+            route.setdefault('persona', 'anonymous')
+            route.setdefault('weight', 1)
+            route.setdefault('name', f"{route['method']} {route['url']}")
+            if route['persona'] not in PERSONAS:
+                raise CommandError(f"{path}:{line}: unknown persona {route['persona']!r}; "
+                                   f"choose from {', '.join(PERSONAS)}.")
+            if not isinstance(route['weight'], (int, float)) or route['weight'] <= 0:
+                raise CommandError(f'{path}:{line}: weight must be a positive number.')
+            unknown = set(PLACEHOLDER.findall(route['url'])) - set(PLACEHOLDERS)
+            if unknown:
+                raise CommandError(f"{path}:{line}: unknown placeholder(s) {', '.join(sorted(unknown))}; "
+                                   f"choose from {', '.join(PLACEHOLDERS)}.")
+            if any(other['name'] == route['name'] for other in routes):
+                raise CommandError(f"{path}:{line}: duplicate name {route['name']!r}.")
+            routes.append(route)
+    if not routes:
+        raise CommandError(f'{path} has no requests.')
+    return routes
+
+
+def histogram(timings):
+    counts = Counter(next((bound for bound in BUCKETS if ms <= bound), None) for ms in timings)
+    return {**{str(bound): counts[bound] for bound in BUCKETS}, '+Inf': counts[None]}
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a weighted request mix from a JSONL traffic file against the site under '
+        'gunicorn with concurrent clients, closed-loop or at a fixed arrival rate, and '
+        'report per-route throughput, latency percentiles and error rates.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('traffic', nargs='?', default=str(TRAFFIC),
+                            help='JSONL with name, method, url, persona, weight and optional data/expect '
+                                 'per line; defaults to benchmarks/traffic.jsonl.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Clients issuing requests at once.')
+        parser.add_argument('--rate', type=float,
+                            help='Start requests at this many per second instead of as soon as a '
+                                 'client is free; latency then counts from the scheduled start.')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds measured.')
+        parser.add_argument('--warmup', type=float, default=5, help='Seconds run before measuring.')
+        parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi')
+        parser.add_argument('--workers', type=int, default=2, help='Server processes.')
+        parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker.')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--cold-cache', action='store_true',
+                            help='Run the server with FRAGMENT_CACHE_TIMEOUT=0.')
+        parser.add_argument('--clubs', type=int, default=3, help='Load test clubs to seed.')
+        parser.add_argument('--posts', type=int, default=30, help='Published posts per club.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', default='loadtest-report.json')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0 or options['clubs'] < 1:
+            raise CommandError('--concurrency, --duration and --clubs must be positive.')
+        if options['rate'] is not None and options['rate'] <= 0:
+            raise CommandError('--rate must be positive.')
+        routes = read_traffic(options['traffic'])
+        users, clubs = self.seed(options)
+        headers = self.sign_in(users)
+
+        with ServerCommand().serve(options['server'], options):
+            samples = self.run(routes, clubs, headers, options)
+        window = options['duration']
+
+        results = {route['name']: self.summarize(route, samples[route['name']], window) for route in routes}
+        total = self.summarize({}, [sample for name in samples for sample in samples[name]], window)
+        report = {
+            'settings': {
+                'traffic': options['traffic'],
+                'mode': 'closed' if options['rate'] is None else 'open',
+                **{key: options[key] for key in (
+                    'rate', 'concurrency', 'duration', 'warmup', 'server', 'workers', 'threads', 'cold_cache',
+                )},
+            },
+            'database': connection.vendor,
+            'routes': results,
+            'total': total,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+
+        for name, result in results.items():
+            self.stdout.write(self.format_result(name, result))
+        self.stdout.write(self.format_result('total', total))
+        if options['rate'] is not None:
+            self.stdout.write(f"Target {options['rate']:.1f} req/s, achieved {total['throughput']:.1f} req/s.")
+        style = self.style.ERROR if total['errors'] else self.style.SUCCESS
+        self.stdout.write(style(f"Wrote {options['output']}"))
+
+    def seed(self, options):
+        # Idempotent, so repeated runs reuse the users, clubs and posts.
+        User = get_user_model()
+        usernames = [
+            f'{USERNAME_PREFIX}{persona}_{i}'
+            for persona in PERSONAS[1:] for i in range(options['concurrency'])
+        ]
+        password = make_password(None)
+        User.objects.bulk_create([User(username=name, password=password) for name in usernames],
+                                 ignore_conflicts=True)
+        users = defaultdict(list)
+        for user in User.objects.filter(username__in=usernames).order_by('pk'):
+            users[user.username[len(USERNAME_PREFIX):].rpartition('_')[0]].append(user)
+
+        clubs = []
+        for i in range(1, options['clubs'] + 1):
+            name = f'{CLUB_PREFIX} {i}'
+            clubs.append(Club.objects.filter(name=name).first() or Club.objects.create(
+                name=name, description='Seeded by the loadtest command.', creator=users['admin'][0],
+            ))
+
+        existing = set(Membership.objects.filter(club__in=clubs).values_list('user_id', 'club_id'))
+        with batch():
+            for persona, role in ROLES.items():
+                for user in users[persona]:
+                    for club in clubs:
+                        if (user.pk, club.pk) not in existing:
+                            Membership.objects.create(user=user, club=club, role=role, status='APPROVED')
+            for club in clubs:
+                for i in range(Post.objects.published().filter(club=club).count(), options['posts']):
+                    Post.objects.create(
+                        club=club, author=users['admin'][0], title=f'{club.name} meeting {i + 1}',
+                        body='Weekly meeting notes for the load test.', type=('NEWS', 'BLOG')[i % 2],
+                    )
+        # Build the members' feeds and notifications before the server starts.
+        run_tasks()
+
+        posts = defaultdict(list)
+        for post_id, club_id in Post.objects.published().filter(club__in=clubs).values_list('pk', 'club_id'):
+            posts[club_id].append(post_id)
+        return users, [
+            {'club_id': club.pk, 'club_slug': club.slug, 'post_ids': posts[club.pk]}
+            for club in clubs
+        ]
+
+    def sign_in(self, users):
+        # Per persona, one set of headers per client: a session from force_login
+        # and a CSRF cookie the token header repeats.
+        headers = {'anonymous': []}
+        for persona, persona_users in users.items():
+            headers[persona] = []
+            for user in persona_users:
+                client = Client()
+                client.force_login(user)
+                token = get_random_string(32)
+                headers[persona].append({
+                    'Cookie': f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}; '
+                              f'{settings.CSRF_COOKIE_NAME}={token}',
+                    'X-CSRFToken': token,
+                })
+        return headers
+
+    def run(self, routes, clubs, headers, options):
+        samples = defaultdict(list)
+        lock = threading.Lock()
+        arrivals = iter(range(10**12))
+        weights = [route['weight'] for route in routes]
+        rate = options['rate']
+        start = time.perf_counter() + 0.1
+        measured = start + options['warmup']
+        end = measured + options['duration']
+
+        def path_for(route, rng):
+            club = rng.choice(clubs)
+            values = {**club, 'post_id': rng.choice(club['post_ids']) if club['post_ids'] else 0}
+            return PLACEHOLDER.sub(lambda match: str(values[match[1]]), route['url'])
+
+        def client(index):
+            rng = random.Random(options['seed'] + index)
+            connection = http.client.HTTPConnection('127.0.0.1', options['port'], timeout=30)
+            while True:
+                if rate is None:
+                    # Closed loop: the next request goes out as soon as the last returns.
+                    scheduled = max(time.perf_counter(), start)
+                else:
+                    with lock:
+                        scheduled = start + next(arrivals) / rate
+                if scheduled >= end:
+                    break
+                time.sleep(max(0, scheduled - time.perf_counter()))
+
+                route = rng.choices(routes, weights)[0]
+                request_headers = {**headers[route['persona']][index]} if route['persona'] != 'anonymous' else {}
+                body = None
+                if 'data' in route:
+                    body = urlencode(route['data'])
+                    request_headers['Content-Type'] = 'application/x-www-form-urlencoded'
+                sent = time.perf_counter()
+                try:
+                    connection.request(route['method'], path_for(route, rng), body=body, headers=request_headers)
+                    response = connection.getresponse()
+                    response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    status = None
+                finished = time.perf_counter()
+                # At a fixed rate, time spent waiting for a free client counts too.
+                elapsed = (finished - (sent if rate is None else scheduled)) * 1000
+                if scheduled >= measured:
+                    with lock:
+                        samples[route['name']].append((elapsed, self.is_error(route, status), status))
+            connection.close()
+
+        threads = [threading.Thread(target=client, args=(index,)) for index in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples
+
+    def is_error(self, route, status):
+        if status is None:
+            return True
+        if 'expect' in route:
+            return status != route['expect']
+        return status >= 400
+
+    def summarize(self, route, samples, window):
+        timings = [elapsed for elapsed, error, _ in samples if not error]
+        errors = Counter('connection' if status is None else str(status) for _, error, status in samples if error)
+        result = {
+            **{key: route[key] for key in ('method', 'url', 'persona', 'weight') if key in route},
+            'requests': len(samples),
+            'errors': sum(errors.values()),
+            'error_rate': sum(errors.values()) / len(samples) if samples else 0.0,
+            'error_statuses': dict(errors),
+            'throughput': len(timings) / window,
+        }
+        if timings:
+            result['ms'] = {
+                **{f'p{p}': percentile(timings, p) for p in PERCENTILES},
+                'mean': statistics.fmean(timings),
+                'max': max(timings),
+            }
+            result['histogram'] = histogram(timings)
+        return result
+
+    def format_result(self, name, result):
+        ms = result.get('ms')
+        latency = (f"p50 {ms['p50']:8.2f} ms  p95 {ms['p95']:8.2f} ms  p99 {ms['p99']:8.2f} ms"
+                   if ms else f"{'no successful requests':<47}")
+        return (f"{name:<22} {result['requests']:7d} req  {result['throughput']:7.1f} req/s  {latency}  "
+                f"errors {result['error_rate']:6.2%}")
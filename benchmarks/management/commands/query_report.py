@@ -0,0 +1,66 @@
+import json
+import statistics
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarize a query inspector log (QUERY_INSPECTOR_LOG) and list the views '
+        'with the most queries, budget overruns and repeated statements.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.QUERY_INSPECTOR_LOG)
+        parser.add_argument('--limit', type=int, default=10)
+
+    def handle(self, *args, log, limit, **options):
+        if not log:
+            raise CommandError('Pass --log or set QUERY_INSPECTOR_LOG.')
+        path = Path(log)
+        if not path.exists():
+            raise CommandError(f'{path} does not exist.')
+
+        views = defaultdict(lambda: {'counts': [], 'ms': [], 'over': 0, 'budget': None, 'repeated': {}})
+        for line in path.read_text().splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            view = views[entry['view_name'] or entry['path']]
+            view['counts'].append(entry['queries'])
+            view['ms'].append(entry['ms'])
+            view['budget'] = entry['budget']
+            if entry['budget'] is not None and entry['queries'] > entry['budget']:
+                view['over'] += 1
+            for group in entry['repeated']:
+                known = view['repeated'].get(group['shape'])
+                if known is None or group['count'] > known['count']:
+                    view['repeated'][group['shape']] = group
+
+        if not views:
+            self.stdout.write('The log is empty.')
+            return
+
+        def badness(item):
+            view = item[1]
+            worst = max(view['counts'])
+            return (view['over'] > 0, len(view['repeated']), worst / (view['budget'] or worst or 1), worst)
+
+        ranked = sorted(views.items(), key=badness, reverse=True)[:limit]
+        self.stdout.write(f"{'view':<32} {'requests':>8} {'median':>7} {'max':>5} {'budget':>6} {'over':>5} {'sql ms':>8}")
+        for name, view in ranked:
+            budget = view['budget'] if view['budget'] is not None else '-'
+            line = (
+                f"{name:<32} {len(view['counts']):>8} {statistics.median(view['counts']):>7g} "
+                f"{max(view['counts']):>5} {budget:>6} {view['over']:>5} {statistics.fmean(view['ms']):>8.2f}"
+            )
+            self.stdout.write(self.style.ERROR(line) if view['over'] or view['repeated'] else line)
+
+        for name, view in ranked:
+            for group in sorted(view['repeated'].values(), key=lambda group: -group['count']):
+                self.stdout.write(f"\n{name}: repeated {group['count']}x: {group['shape'][:200]}")
+                for frame in group['stack']:
+                    self.stdout.write(f'    at {frame}')
@@ -0,0 +1,199 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from benchmarks.management.commands.seed_benchmark_data import CLUB_PREFIX, USERNAME_PREFIX
+from clubs.models import Club
+from memberships.models import Membership
+from posts.models import Post
+
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(samples, percent):
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * percent / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the hot views through the test client against the data created by '
+        'seed_benchmark_data and write a JSON report that can be compared between commits.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--view', action='append', dest='views',
+                            help='Only run the named view; may be repeated.')
+        parser.add_argument('--cold-cache', action='store_true',
+                            help='Clear the cache before every request.')
+        parser.add_argument('--output', default='benchmark-report.json')
+        parser.add_argument('--compare', help='Print the change against an earlier JSON report.')
+
+    def handle(self, *args, **options):
+        targets = self.targets()
+        scenarios = self.scenarios(targets)
+        if options['views']:
+            unknown = set(options['views']) - set(scenarios)
+            if unknown:
+                raise CommandError(f"Unknown view(s): {', '.join(sorted(unknown))}. "
+                                   f"Choose from {', '.join(scenarios)}.")
+            scenarios = {name: scenarios[name] for name in options['views']}
+
+        if settings.QUERY_INSPECTOR:
+            self.stderr.write('QUERY_INSPECTOR is on; its per-query stack capture inflates the timings.')
+
+        client = Client()
+        client.force_login(targets['admin'])
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name, scenario in scenarios.items():
+                results[name] = self.measure(client, scenario, options)
+                self.stdout.write(self.format_result(name, results[name]))
+
+        report = {'metadata': self.metadata(targets, options), 'results': results}
+        Path(options['output']).write_text(json.dumps(report, indent=2) + '\n')
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+        if options['compare']:
+            self.compare(json.loads(Path(options['compare']).read_text()), report)
+
+    def targets(self):
+        club = Club.objects.filter(name__startswith=CLUB_PREFIX).order_by('-approved_member_count').first()
+        if club is None:
+            raise CommandError('No benchmark data found; run seed_benchmark_data first.')
+        post = Post.objects.published().filter(club=club).order_by('-created_at').first()
+        if post is None:
+            raise CommandError(f'{club.name} has no published posts to benchmark.')
+        return {'club': club, 'admin': club.creator, 'post': post}
+
+    def scenarios(self, targets):
+        club, post = targets['club'], targets['post']
+        create_url = reverse('posts:create', kwargs={'club_pk': club.pk})
+        return {
+            'club_list': {'method': 'get', 'url': reverse('clubs:list')},
+            'club_detail': {'method': 'get', 'url': reverse('clubs:detail', kwargs={'slug': club.slug})},
+            'member_list': {'method': 'get', 'url': reverse('clubs:members', kwargs={'pk': club.pk})},
+            'membership_requests': {'method': 'get', 'url': reverse('clubs:requests', kwargs={'pk': club.pk})},
+            'post_detail': {'method': 'get', 'url': reverse('posts:detail', kwargs={'pk': post.pk})},
+            'feed': {'method': 'get', 'url': reverse('feeds:home')},
+            'post_create_form': {'method': 'get', 'url': create_url},
+            # Rolled back after every request so repeated runs see the same data.
+            'post_create_submit': {
+                'method': 'post',
+                'url': create_url,
+                'data': {'title': 'Benchmark post', 'body': 'Benchmark body text.', 'type': 'NEWS'},
+                'rollback': True,
+            },
+        }
+
+    def request(self, client, scenario):
+        send = getattr(client, scenario['method'])
+        if not scenario.get('rollback'):
+            return send(scenario['url'], scenario.get('data'))
+        with transaction.atomic():
+            response = send(scenario['url'], scenario.get('data'))
+            transaction.set_rollback(True)
+        return response
+
+    def measure(self, client, scenario, options):
+        for _ in range(options['warmup']):
+            self.request(client, scenario)
+
+        timings, query_counts = [], []
+        for _ in range(options['iterations']):
+            if options['cold_cache']:
+                cache.clear()
+            # Count on every alias so reads routed to a replica are included.
+            with ExitStack() as stack:
+                captured = [stack.enter_context(CaptureQueriesContext(db)) for db in connections.all()]
+                start = time.perf_counter()
+                response = self.request(client, scenario)
+                timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f"{scenario['url']} returned {response.status_code}.")
+            query_counts.append(sum(len(queries) for queries in captured))
+
+        return {
+            'url': scenario['url'],
+            'method': scenario['method'].upper(),
+            'status': response.status_code,
+            'iterations': len(timings),
+            'ms': {
+                **{f'p{p}': percentile(timings, p) for p in PERCENTILES},
+                'mean': statistics.fmean(timings),
+                'max': max(timings),
+            },
+            'queries': {'median': statistics.median(query_counts), 'max': max(query_counts)},
+        }
+
+    def metadata(self, targets, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'commit': commit,
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+            'cold_cache': options['cold_cache'],
+            'cache_backend': settings.CACHES['default']['BACKEND'],
+            'query_inspector': settings.QUERY_INSPECTOR,
+            'dataset': {
+                'users': get_user_model().objects.filter(username__startswith=USERNAME_PREFIX).count(),
+                'clubs': Club.objects.filter(name__startswith=CLUB_PREFIX).count(),
+                'memberships': Membership.objects.filter(club__name__startswith=CLUB_PREFIX).count(),
+                'posts': Post.objects.filter(club__name__startswith=CLUB_PREFIX).count(),
+                'target_club_members': targets['club'].approved_member_count,
+            },
+        }
+
+    def format_result(self, name, result):
+        ms = result['ms']
+        return (
+            f"{name:<22} p50 {ms['p50']:8.2f} ms  p95 {ms['p95']:8.2f} ms  p99 {ms['p99']:8.2f} ms  "
+            f"queries {result['queries']['median']:g}"
+        )
+
+    def compare(self, old, new):
+        self.stdout.write(f"\nCompared with {old['metadata'].get('commit') or 'previous run'} "
+                          f"({old['metadata']['database']}):")
+        for name, result in new['results'].items():
+            before = old['results'].get(name)
+            if before is None:
+                self.stdout.write(f'{name:<22} (new)')
+                continue
+            p50_before, p50_after = before['ms']['p50'], result['ms']['p50']
+            change = (p50_after - p50_before) / p50_before * 100 if p50_before else 0.0
+            queries = result['queries']['median'] - before['queries']['median']
+            line = (f'{name:<22} p50 {p50_before:8.2f} -> {p50_after:8.2f} ms ({change:+.1f}%)  '
+                    f'queries {queries:+g}')
+            style = self.style.ERROR if change > 10 or queries > 0 else self.style.SUCCESS
+            self.stdout.write(style(line))
@@ -0,0 +1,255 @@
+import random
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from clubs.models import Club
+from feeds import fanout
+from feeds.models import FeedEntry, LargeClub
+from memberships.models import Membership
+from notifications.delivery import notify_decision
+from notifications.models import Notification
+from posts.models import Post, make_excerpt
+from stats.models import ClubDailyStats
+from stats.rollup import record_events
+from tasks.models import Task
+from tasks.worker import ACTIVE_STATUSES
+
+
+SCALES = {
+    'tiny': {'users': 2000, 'clubs': 100, 'memberships': 5000, 'posts': 2000},
+    'small': {'users': 20000, 'clubs': 1000, 'memberships': 100000, 'posts': 50000},
+    'large': {'users': 200000, 'clubs': 10000, 'memberships': 1000000, 'posts': 500000},
+}
+
+USERNAME_PREFIX = 'bench_'
+CLUB_PREFIX = 'Benchmark Club'
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+# Tasks whose first argument is a club id.
+CLUB_TASKS = [
+    record_events.task_name, notify_decision.task_name,
+    fanout.backfill_members.task_name, fanout.prune_member.task_name,
+]
+
+WORDS = (
+    'club meeting event members practice season team campus student workshop '
+    'tournament welcome project music debate chess robotics film photo hiking '
+    'volunteer community open night games coding design science art trip '
+    'schedule update results training session speaker social weekly board'
+).split()
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Create deterministic synthetic users, clubs, memberships and posts for '
+        'benchmarking, and build their feeds. Club sizes follow a Zipf-like skew, so a few '
+        'clubs are huge.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='tiny')
+        parser.add_argument('--users', type=int)
+        parser.add_argument('--clubs', type=int)
+        parser.add_argument('--memberships', type=int)
+        parser.add_argument('--posts', type=int)
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Zipf exponent for club sizes (0 = uniform).')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete previously seeded benchmark data first.')
+
+    def handle(self, *args, **options):
+        sizes = {
+            name: options[name] if options[name] is not None else default
+            for name, default in SCALES[options['scale']].items()
+        }
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+        User = get_user_model()
+
+        if options['clear']:
+            self.clear(User)
+        elif User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError('Benchmark data already exists; pass --clear to replace it.')
+
+        if sizes['memberships'] > sizes['users'] * sizes['clubs']:
+            raise CommandError('Not enough users and clubs for that many memberships.')
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            user_ids = self.seed_users(User, sizes['users'])
+            club_sizes = self.club_sizes(sizes['clubs'], sizes['memberships'], len(user_ids), options['skew'])
+            plans = self.plan_clubs(club_sizes, self.split(sizes['posts'], club_sizes), user_ids)
+            clubs = self.seed_clubs(plans)
+            self.seed_memberships(clubs, plans)
+            self.seed_posts(clubs, plans)
+        # bulk_create skipped the fan-out too; the feed scenario needs entries.
+        self.log('Building feeds...')
+        call_command('rebuild_feeds', club_ids=[club.pk for club in clubs],
+                     verbosity=self.verbosity, stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {sizes['users']} users, {sizes['clubs']} clubs, {sum(club_sizes)} memberships "
+            f"and {sizes['posts']} posts in {time.perf_counter() - started:.1f}s "
+            f"(largest club: {max(club_sizes)} members)."
+        ))
+
+    def log(self, message):
+        if self.verbosity > 0:
+            self.stdout.write(message)
+
+    def clear(self, User):
+        self.log('Deleting previous benchmark data...')
+        with transaction.atomic():
+            clubs = Club.objects.filter(name__startswith=CLUB_PREFIX)
+            users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+            club_ids = list(clubs.values_list('pk', flat=True))
+            # What the worker and rebuild_feeds wrote for the seeded clubs.
+            # These tables have no delete signals, so each is one DELETE and
+            # the cascades below find nothing left to collect.
+            FeedEntry.objects.filter(Q(club__in=clubs) | Q(user__in=users)).delete()
+            LargeClub.objects.filter(club__in=clubs).delete()
+            ClubDailyStats.objects.filter(club__in=clubs).delete()
+            Notification.objects.filter(Q(club__in=clubs) | Q(recipient__in=users) | Q(actor__in=users)).delete()
+            # Queued work that would write rows for a deleted club. Tasks keyed
+            # by a post or membership find nothing and do nothing.
+            Task.objects.filter(name__in=CLUB_TASKS, status__in=ACTIVE_STATUSES, args__0__in=club_ids).delete()
+            # A club batch at a time, so the collector's instances stay few;
+            # posts and memberships go with their club, which skips the
+            # per-row counter updates.
+            for start in range(0, len(club_ids), self.batch_size):
+                Club.objects.filter(pk__in=club_ids[start:start + self.batch_size]).delete()
+            users.delete()
+
+    def seed_users(self, User, count):
+        self.log(f'Creating {count} users...')
+        password = make_password(BENCHMARK_PASSWORD)
+        users = (
+            User(username=f'{USERNAME_PREFIX}{i:07d}', email=f'{USERNAME_PREFIX}{i:07d}@example.com', password=password)
+            for i in range(count)
+        )
+        for batch in batched(users, self.batch_size):
+            User.objects.bulk_create(batch)
+        return list(
+            User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('username').values_list('pk', flat=True)
+        )
+
+    def club_sizes(self, clubs, memberships, users, skew):
+        weights = [1 / (rank ** skew) for rank in range(1, clubs + 1)]
+        sizes = self.split(memberships, weights)
+        # A club cannot have more members than there are users; spill the excess
+        # over to the smallest clubs.
+        overflow = 0
+        for index, size in enumerate(sizes):
+            if size > users:
+                overflow += size - users
+                sizes[index] = users
+        index = len(sizes) - 1
+        while overflow:
+            room = users - sizes[index]
+            moved = min(room, overflow)
+            sizes[index] += moved
+            overflow -= moved
+            index -= 1
+        # Every club has at least its admin.
+        return [max(size, 1) for size in sizes]
+
+    def split(self, total, weights):
+        weight_sum = sum(weights)
+        shares = [int(total * weight / weight_sum) for weight in weights]
+        for index in range(total - sum(shares)):
+            shares[index % len(shares)] += 1
+        return shares
+
+    def plan_clubs(self, club_sizes, post_counts, user_ids):
+        self.log('Planning memberships and posts...')
+        plans = []
+        for size, posts in zip(club_sizes, post_counts):
+            # The first sampled user of each club is its creator and admin.
+            members = self.rng.sample(user_ids, size)
+            statuses = ['APPROVED'] + [self.status() for _ in range(size - 1)]
+            published = [self.rng.random() < 0.95 for _ in range(posts)]
+            plans.append({'members': members, 'statuses': statuses, 'published': published})
+        return plans
+
+    def status(self):
+        roll = self.rng.random()
+        return 'APPROVED' if roll < 0.85 else 'PENDING' if roll < 0.95 else 'REJECTED'
+
+    def seed_clubs(self, plans):
+        self.log(f'Creating {len(plans)} clubs...')
+        # bulk_create skips the signals, so the admin membership and the
+        # denormalized counters are written here directly.
+        clubs = (
+            Club(
+                name=f'{CLUB_PREFIX} {index:05d}',
+                slug=f'benchmark-club-{index:05d}',
+                description=self.text(20, 80),
+                creator_id=plan['members'][0],
+                approved_member_count=plan['statuses'].count('APPROVED'),
+                pending_request_count=plan['statuses'].count('PENDING'),
+                published_post_count=sum(plan['published']),
+            )
+            for index, plan in enumerate(plans)
+        )
+        for batch in batched(clubs, self.batch_size):
+            Club.objects.bulk_create(batch)
+        return list(Club.objects.filter(name__startswith=CLUB_PREFIX).order_by('name'))
+
+    def seed_memberships(self, clubs, plans):
+        self.log(f"Creating {sum(len(plan['members']) for plan in plans)} memberships...")
+
+        def rows():
+            for club, plan in zip(clubs, plans):
+                for position, (user_id, status) in enumerate(zip(plan['members'], plan['statuses'])):
+                    if position == 0:
+                        role = 'ADMIN'
+                    elif status == 'APPROVED' and self.rng.random() < 0.05:
+                        role = 'MODERATOR'
+                    else:
+                        role = 'MEMBER'
+                    yield Membership(user_id=user_id, club_id=club.pk, role=role, status=status)
+
+        for batch in batched(rows(), self.batch_size):
+            Membership.objects.bulk_create(batch)
+
+    def seed_posts(self, clubs, plans):
+        self.log(f"Creating {sum(len(plan['published']) for plan in plans)} posts...")
+
+        def rows():
+            for club, plan in zip(clubs, plans):
+                authors = [
+                    user_id for user_id, status in zip(plan['members'], plan['statuses']) if status == 'APPROVED'
+                ]
+                for published in plan['published']:
+                    body = self.text(50, 400)
+                    # bulk_create skips Post.save(), which fills in the excerpt.
+                    yield Post(
+                        title=self.text(3, 9).capitalize(),
+                        body=body,
+                        excerpt=make_excerpt(body),
+                        type='NEWS' if self.rng.random() < 0.2 else 'BLOG',
+                        club_id=club.pk,
+                        author_id=self.rng.choice(authors),
+                        is_published=published,
+                    )
+
+        for batch in batched(rows(), self.batch_size):
+            Post.objects.bulk_create(batch)
+
+    def text(self, low, high):
+        return ' '.join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
@@ -0,0 +1,38 @@
+import logging
+
+from benchmarks.queries import QueryInspector, QueryReport, get_query_budgets, write_report
+
+
+logger = logging.getLogger('clubhub.queries')
+
+
+class QueryInspectionMiddleware:
+    # Installed first in MIDDLEWARE (debug and test runs only) so the session
+    # and auth queries of the request are counted too.
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inspector = QueryInspector()
+        with inspector.capture():
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        report = QueryReport(
+            inspector.queries,
+            view_name=view_name,
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+            budget=get_query_budgets(getattr(request, 'urlconf', None)).get(view_name),
+        )
+        request.query_inspection = report
+        write_report(report)
+
+        response.headers['X-Query-Count'] = str(report.count)
+        if report.budget is not None:
+            response.headers['X-Query-Budget'] = str(report.budget)
+        if report.over_budget or report.repeated:
+            logger.warning(report.summary())
+        return response
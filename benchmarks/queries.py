@@ -0,0 +1,187 @@
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import TokenType
+from django.urls import URLResolver, get_resolver
+from django.utils.functional import cached_property
+
+
+_log_lock = threading.Lock()
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_SPACE = re.compile(r'\s+')
+_SKIP_SHAPE = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+_OWN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def statement_shape(sql):
+    # Collapse the parts that differ between otherwise identical statements, so
+    # a query run once per row in a loop groups under a single shape.
+    sql = _SPACE.sub(' ', sql).strip()
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _NUMBER.sub('?', sql)
+
+
+def _project_frame(filename):
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and 'site-packages' not in filename
+        and not filename.startswith(_OWN_DIR)
+    )
+
+
+def capture_stack(limit=8):
+    # Project frames plus the template line being rendered, innermost first;
+    # most N+1s start in a template loop rather than in Python code.
+    frames = []
+    frame = sys._getframe(2)
+    while frame is not None and len(frames) < limit:
+        code = frame.f_code
+        if code.co_name == 'render_annotated' and 'self' in frame.f_locals:
+            node = frame.f_locals['self']
+            origin, token = getattr(node, 'origin', None), getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                tag = '{{ %s }}' if token.token_type == TokenType.VAR else '{%% %s %%}'
+                entry = f'{origin.template_name or origin.name}:{token.lineno} ' + tag % token.contents[:60]
+                if not frames or frames[-1] != entry:
+                    frames.append(entry)
+        elif _project_frame(code.co_filename):
+            path = code.co_filename[len(str(settings.BASE_DIR)) + 1:]
+            if os.sep not in path:
+                # manage.py and other entry scripts say nothing about the cause.
+                frame = frame.f_back
+                continue
+            frames.append(f'{path}:{frame.f_lineno} in {code.co_name}')
+        frame = frame.f_back
+    return frames
+
+
+_current_inspector = ContextVar('query_inspector', default=None)
+
+
+def current_inspector():
+    return _current_inspector.get()
+
+
+class QueryInspector:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        stack = capture_stack()
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'ms': (time.perf_counter() - start) * 1000,
+                'alias': context['connection'].alias,
+                'stack': stack,
+            })
+
+    @contextmanager
+    def capture(self):
+        # Execute wrappers are per thread; the context variable lets code that
+        # queries from other threads for this request (clubhub.aio) join in.
+        token = _current_inspector.set(self)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self))
+                yield self
+        finally:
+            _current_inspector.reset(token)
+
+
+class QueryReport:
+    def __init__(self, queries, view_name=None, method=None, path=None, status=None, budget=None):
+        self.queries = queries
+        self.view_name = view_name
+        self.method = method
+        self.path = path
+        self.status = status
+        self.budget = budget
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.count > self.budget
+
+    @cached_property
+    def repeated(self):
+        threshold = getattr(settings, 'QUERY_INSPECTOR_REPEAT_THRESHOLD', 3)
+        groups = defaultdict(list)
+        for query in self.queries:
+            if not query['sql'].lstrip().upper().startswith(_SKIP_SHAPE):
+                groups[statement_shape(query['sql'])].append(query)
+        return sorted(
+            (
+                {'shape': shape, 'count': len(queries), 'stack': queries[0]['stack']}
+                for shape, queries in groups.items() if len(queries) >= threshold
+            ),
+            key=lambda group: -group['count'],
+        )
+
+    def summary(self):
+        budget = self.budget if self.budget is not None else 'none'
+        lines = [f'{self.method} {self.path} ({self.view_name}): {self.count} queries, budget {budget}']
+        for group in self.repeated:
+            lines.append(f"  repeated {group['count']}x: {group['shape'][:200]}")
+            lines.extend(f'    at {frame}' for frame in group['stack'])
+        return '\n'.join(lines)
+
+    def as_dict(self):
+        return {
+            'view_name': self.view_name,
+            'method': self.method,
+            'path': self.path,
+            'status': self.status,
+            'queries': self.count,
+            'budget': self.budget,
+            'ms': round(sum(query['ms'] for query in self.queries), 3),
+            'repeated': self.repeated,
+        }
+
+
+@lru_cache
+def get_query_budgets(urlconf=None):
+    # Each included urls.py may declare query_budgets = {url_name: max_queries}
+    # beside its urlpatterns; the names are qualified with the namespace here.
+    budgets = {}
+
+    def collect(resolver, namespace):
+        for pattern in resolver.url_patterns:
+            if not isinstance(pattern, URLResolver):
+                continue
+            prefix = ':'.join(filter(None, [namespace, pattern.namespace]))
+            declared = getattr(pattern.urlconf_module, 'query_budgets', {})
+            for name, budget in declared.items():
+                budgets[f'{prefix}:{name}' if prefix else name] = budget
+            collect(pattern, prefix)
+
+    collect(get_resolver(urlconf), '')
+    return budgets
+
+
+def write_report(report):
+    path = getattr(settings, 'QUERY_INSPECTOR_LOG', '')
+    if not path:
+        return
+    line = json.dumps(report.as_dict()) + '\n'
+    with _log_lock, open(path, 'a') as log:
+        log.write(line)
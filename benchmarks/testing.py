@@ -0,0 +1,37 @@
+from django.conf import settings
+
+
+class QueryBudgetMixin:
+    # For TestCase subclasses: checks the report QueryInspectionMiddleware
+    # attaches to each test client request against the budgets in urls.py.
+
+    def get_query_report(self, response):
+        report = getattr(response.wsgi_request, 'query_inspection', None)
+        if report is None:
+            self.fail('QueryInspectionMiddleware is not installed; check QUERY_INSPECTOR.')
+        return report
+
+    def assertWithinQueryBudget(self, response, budget=None):
+        report = self.get_query_report(response)
+        budget = report.budget if budget is None else budget
+        if budget is None:
+            self.fail(f'No query budget is declared for {report.view_name}.')
+        if report.count > budget:
+            self.fail(f'Query budget of {budget} exceeded.\n{report.summary()}')
+
+    def assertNoRepeatedQueries(self, response):
+        report = self.get_query_report(response)
+        if report.repeated:
+            threshold = settings.QUERY_INSPECTOR_REPEAT_THRESHOLD
+            self.fail(f'Statements repeated {threshold} or more times (likely N+1).\n{report.summary()}')
+
+    def assertQueriesOk(self, response, budget=None):
+        self.assertWithinQueryBudget(response, budget)
+        self.assertNoRepeatedQueries(response)
+
+    def assertBudgetsDeclared(self, urls_module):
+        missing = [
+            pattern.name for pattern in urls_module.urlpatterns
+            if pattern.name and pattern.name not in urls_module.query_budgets
+        ]
+        self.assertEqual(missing, [], f'{urls_module.__name__} has URLs without a query budget.')
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset):
+    # The planner's row estimate for the queryset's table, kept current by
+    # autovacuum/ANALYZE. Only meaningful for an unfiltered queryset, and only
+    # PostgreSQL keeps one; None when it cannot be used.
+    query = queryset.query
+    if query.where or query.distinct or query.combinator or query.is_sliced:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # -1 until the table has been analyzed for the first time.
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    # An exact COUNT(*) reads the whole table on PostgreSQL. Past
+    # ADMIN_ESTIMATED_COUNT_THRESHOLD rows the unfiltered changelist shows the
+    # estimate instead; filtered changelists still count exactly.
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super().count
+
+
+class SelectedRelatedListFilter(admin.RelatedFieldListFilter):
+    # RelatedFieldListFilter lists every row of the related table in the
+    # sidebar. This one only shows the selected object, so filtering is done
+    # from links (or ?club__id__exact=) and the sidebar costs one pk lookup.
+    def field_choices(self, field, request, model_admin):
+        if not self.lookup_val:
+            return []
+        related = field.remote_field.model._default_manager.filter(pk__in=self.lookup_val)
+        return [(obj.pk, str(obj)) for obj in related]
+
+    def has_output(self):
+        # Shown (and applied) whenever a value is selected, even a single one.
+        return bool(self.lookup_val)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # Skips the second, unfiltered COUNT(*) behind "N results (M total)".
+    show_full_result_count = False
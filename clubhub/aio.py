@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import copy_context
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from accounts.middleware import get_user
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_DB_WORKERS,
+                thread_name_prefix='clubhub-db',
+            )
+    return _executor
+
+
+def _release_broken_connections():
+    # Worker threads outlive requests, so their connections persist whatever
+    # CONN_MAX_AGE says (that setting must stay 0 under ASGI, where request
+    # threads are not reused); only drop one after an error left it unusable.
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None and connection.errors_occurred and not connection.is_usable():
+            connection.close()
+
+
+def _run(func):
+    _release_broken_connections()
+    inspector = None
+    if settings.QUERY_INSPECTOR:
+        from benchmarks.queries import current_inspector
+        inspector = current_inspector()
+    with inspector.capture() if inspector else nullcontext():
+        return func()
+
+
+async def gather_queries(*funcs):
+    # Django's async ORM runs every query of a request on one shared thread, so
+    # awaiting two querysets at once still executes them back to back. Run
+    # independent sync callables on separate worker threads, each with its own
+    # connection, and return their results in order. The calling context
+    # (replica routing, query inspection) is copied into every task.
+    if not settings.ASYNC_DB_WORKERS:
+        return [await sync_to_async(func)() for func in funcs]
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    return await asyncio.gather(*(
+        loop.run_in_executor(executor, copy_context().run, _run, func)
+        for func in funcs
+    ))
+
+
+async def load_user(request):
+    # The session and user rows are read through a worker's connection too, so
+    # a request that only reads never opens one of its own. request.user is
+    # replaced so sync code (templates, the membership resolver) sees the
+    # same object; the middleware's get_user() makes repeat calls free.
+    request.user, = await gather_queries(partial(get_user, request))
+    return request.user
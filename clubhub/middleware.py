@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+from clubhub.routers import replica_configured
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaPinningMiddleware(MiddlewareMixin):
+    # Read-your-writes: a write request sets a short-lived cookie, and while it
+    # is present ReplicaReadMixin views keep reading from the primary, so the
+    # visitor sees their own change even if the replica is still behind.
+    def process_request(self, request):
+        request.use_replica = (
+            replica_configured()
+            and request.method in SAFE_METHODS
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+        )
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and replica_configured():
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -1,3 +1,5 @@
+import os
+import sys
 from pathlib import Path
 from decouple import config, Csv
 
@@ -7,6 +9,8 @@ SECRET_KEY = config('SECRET_KEY', default='django-insecure-tvei-k%#qs$+kygri53+$
 
 DEBUG = config('DEBUG', default=True, cast=bool)
 
+TESTING = sys.argv[1:2] == ['test']
+
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1', cast=Csv())
 
 INSTALLED_APPS = [
@@ -21,18 +25,56 @@ INSTALLED_APPS = [
     'memberships',
     'posts',
     'accounts',
+    'search',
+    'feeds',
+    'stats',
+    'transfer',
+    'api',
+    'tasks',
+    'notifications',
+    'pagecache',
+    'assets',
+    'metrics',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Serves the collected, precompressed static files before anything else runs.
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Before the session and auth middleware, so cached pages skip them.
+    'pagecache.middleware.PageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'clubhub.middleware.ReplicaPinningMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # AuthenticationMiddleware that caches the user row between requests.
+    'accounts.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request, SQL, cache and response size metrics served at /metrics in the
+# Prometheus text format. Under gunicorn, point METRICS_MULTIPROC_DIR at a
+# directory the workers share, emptied before the server starts. Outside
+# DEBUG the endpoint needs METRICS_TOKEN; without one it answers 404.
+METRICS = config('METRICS', default=True, cast=bool)
+METRICS_MULTIPROC_DIR = config('METRICS_MULTIPROC_DIR', default='')
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+if METRICS_MULTIPROC_DIR:
+    # prometheus_client picks its storage from this when first imported.
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = METRICS_MULTIPROC_DIR
+if METRICS:
+    MIDDLEWARE.insert(0, 'metrics.middleware.MetricsMiddleware')
+
+# Per-request SQL recording, N+1 detection and the query budgets declared in
+# the apps' urls.py. Debug and test runs only; it captures a stack per query.
+QUERY_INSPECTOR = config('QUERY_INSPECTOR', default=DEBUG or TESTING, cast=bool)
+QUERY_INSPECTOR_LOG = config('QUERY_INSPECTOR_LOG', default='')
+QUERY_INSPECTOR_REPEAT_THRESHOLD = config('QUERY_INSPECTOR_REPEAT_THRESHOLD', default=3, cast=int)
+if QUERY_INSPECTOR:
+    MIDDLEWARE.insert(0, 'benchmarks.middleware.QueryInspectionMiddleware')
+
 ROOT_URLCONF = 'clubhub.urls'
 
 TEMPLATES = [
@@ -46,6 +88,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'notifications.context_processors.unread_notifications',
             ],
         },
     },
@@ -61,9 +104,89 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='changeme123'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Optional read replica. List and detail views (ReplicaReadMixin) read from it
+# unless the visitor wrote within the last REPLICA_PIN_SECONDS. Unset values
+# fall back to the primary's, so two SQLite files only need REPLICA_DB_NAME.
+# Tests run against the primary alone; clubhub/tests.py adds a second SQLite
+# file as the replica for the routing tests.
+if (config('REPLICA_DB_HOST', default='') or config('REPLICA_DB_NAME', default='')) and not TESTING:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': config('REPLICA_DB_NAME', default=DATABASES['default']['NAME']),
+        'USER': config('REPLICA_DB_USER', default=DATABASES['default']['USER']),
+        'PASSWORD': config('REPLICA_DB_PASSWORD', default=DATABASES['default']['PASSWORD']),
+        'HOST': config('REPLICA_DB_HOST', default=DATABASES['default']['HOST']),
+        'PORT': config('REPLICA_DB_PORT', default=DATABASES['default']['PORT']),
+    }
+
+DATABASE_ROUTERS = ['clubhub.routers.ReplicaRouter']
+REPLICA_PIN_COOKIE = 'primary_pin'
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=15, cast=int)
+REPLICA_FRAGMENT_CACHE_TIMEOUT = config('REPLICA_FRAGMENT_CACHE_TIMEOUT', default=60, cast=int)
+
+CACHES = {
+    'default': {
+        # locmem for development; use django.core.cache.backends.filebased.FileBasedCache
+        # or django.core.cache.backends.redis.RedisCache (with CACHE_LOCATION) in production.
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='clubhub'),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+    }
+}
+
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Serve the club and post detail pages from async views whose independent
+# queries run side by side on ASYNC_DB_WORKERS threads (see clubhub.aio).
+# Tests run the queries one after another inside the test transaction.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+ASYNC_DB_WORKERS = 0 if TESTING else config('ASYNC_DB_WORKERS', default=8, cast=int)
+
+# Sessions are read from the cache (written through to the database), flash
+# messages travel in a cookie rather than the session, and the signed-in user
+# is cached for AUTH_USER_CACHE_TIMEOUT seconds (0 turns that off). Together
+# they take the session and user queries off most requests. All three need a
+# cache shared by every web process, as the fragment cache already does.
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db')
+MESSAGE_STORAGE = config('MESSAGE_STORAGE', default='django.contrib.messages.storage.cookie.CookieStorage')
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Whole-page cache for anonymous visitors (pagecache app); 0 turns it off, as
+# in tests. A page being re-rendered is locked for PAGE_CACHE_LOCK_TIMEOUT
+# seconds; requests with no copy to fall back on wait up to PAGE_CACHE_LOCK_WAIT.
+PAGE_CACHE_TIMEOUT = 0 if TESTING else config('PAGE_CACHE_TIMEOUT', default=600, cast=int)
+PAGE_CACHE_LOCK_TIMEOUT = config('PAGE_CACHE_LOCK_TIMEOUT', default=10, cast=int)
+PAGE_CACHE_LOCK_WAIT = config('PAGE_CACHE_LOCK_WAIT', default=2.0, cast=float)
+
+# Home feed: posts are copied into each member's feed on publish, except for
+# clubs with FEED_FANOUT_LIMIT or more members, which are merged in on read.
+FEED_FANOUT_LIMIT = config('FEED_FANOUT_LIMIT', default=5000, cast=int)
+FEED_FANOUT_BATCH_SIZE = config('FEED_FANOUT_BATCH_SIZE', default=1000, cast=int)
+FEED_BACKFILL_POSTS = config('FEED_BACKFILL_POSTS', default=50, cast=int)
+
+# Background tasks (tasks app, run by manage.py run_worker): attempts before a
+# task is kept as failed, the first retry delay (doubled per attempt, capped)
+# and how long a worker may hold a task before another takes it over.
+TASK_MAX_ATTEMPTS = config('TASK_MAX_ATTEMPTS', default=5, cast=int)
+TASK_RETRY_DELAY = config('TASK_RETRY_DELAY', default=10, cast=int)
+TASK_RETRY_MAX_DELAY = config('TASK_RETRY_MAX_DELAY', default=3600, cast=int)
+TASK_LOCK_TIMEOUT = config('TASK_LOCK_TIMEOUT', default=300, cast=int)
+
+# Notifications are inserted NOTIFICATION_BATCH_SIZE rows at a time; the
+# unread badge count is cached for NOTIFICATION_COUNT_TIMEOUT seconds and
+# dropped whenever the user's notifications change.
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=1000, cast=int)
+NOTIFICATION_COUNT_TIMEOUT = config('NOTIFICATION_COUNT_TIMEOUT', default=3600, cast=int)
+
+# Admin changelists show PostgreSQL's row estimate instead of an exact
+# COUNT(*) once an unfiltered table has this many rows.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -91,6 +214,20 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic writes content-hashed copies plus .gz and .br variants, which
+# WhiteNoise serves with a one-year immutable Cache-Control. Tests run without
+# collectstatic, so they keep the plain storage and its unhashed names.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if TESTING
+        else 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+# Look files up per request instead of indexing STATIC_ROOT at startup, which
+# development and test runs have not collected.
+WHITENOISE_AUTOREFRESH = DEBUG or TESTING
+
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
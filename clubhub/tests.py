@@ -0,0 +1,123 @@
+import tempfile
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from clubhub.routers import REPLICA_DB_ALIAS, ReplicaRouter, read_from
+from clubs.models import Club
+from posts.models import Post
+
+
+User = get_user_model()
+
+
+class ReplicaRoutingTests(TestCase):
+    # A second SQLite file stands in for the replica. It has the schema but
+    # its own rows, as if lagging, so each page shows which database it was
+    # read from. The alias only exists while this class runs; '__all__'
+    # picks it up when TestCase sets up its databases.
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        databases = {
+            DEFAULT_DB_ALIAS: settings.DATABASES[DEFAULT_DB_ALIAS],
+            REPLICA_DB_ALIAS: {
+                'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(Path(cls.replica_dir.name) / 'replica.sqlite3'),
+            },
+        }
+        connections.settings[REPLICA_DB_ALIAS] = connections.configure_settings(databases)[REPLICA_DB_ALIAS]
+        with connections[REPLICA_DB_ALIAS].schema_editor() as editor:
+            for model in apps.get_models():
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA_DB_ALIAS].close()
+        del connections[REPLICA_DB_ALIAS]
+        del connections.settings[REPLICA_DB_ALIAS]
+        cls.replica_dir.cleanup()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('primary-user')
+        cls.club = Club.objects.create(name='Primary Club', description='On the primary', creator=cls.user)
+        cls.post = Post.objects.create(title='Primary post', body='Body', club=cls.club, author=cls.user)
+        # bulk_create skips the signals, which would write to the primary.
+        replica = REPLICA_DB_ALIAS
+        User.objects.using(replica).bulk_create([User(pk=cls.user.pk, username='replica-user')])
+        Club.objects.using(replica).bulk_create([Club(
+            pk=cls.club.pk, name='Replica Club', slug=cls.club.slug, description='On the replica',
+            creator_id=cls.user.pk, created_at=cls.club.created_at, updated_at=cls.club.updated_at,
+        )])
+        Post.objects.using(replica).bulk_create([Post(
+            pk=cls.post.pk, title='Replica post', body='Body', club_id=cls.club.pk, author_id=cls.user.pk,
+            created_at=cls.post.created_at, updated_at=cls.post.updated_at,
+        )])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_and_detail_pages_read_from_the_replica(self):
+        for url in (reverse('clubs:list'), self.club.get_absolute_url()):
+            with self.subTest(url):
+                response = self.client.get(url)
+                self.assertContains(response, 'Replica Club')
+                self.assertNotContains(response, 'Primary Club')
+
+    def test_pin_cookie_reads_from_the_primary(self):
+        self.client.force_login(User.objects.create_user('joiner'))
+        response = self.client.post(reverse('clubs:join', kwargs={'pk': self.club.pk}))
+        self.assertEqual(response.status_code, 302)
+        cookie = response.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_PIN_SECONDS)
+
+        for url in (reverse('clubs:list'), self.club.get_absolute_url()):
+            with self.subTest(url):
+                self.assertContains(self.client.get(url), 'Primary Club')
+
+        # Once the pin expires, reads go back to the replica (past the club
+        # cards the pinned requests cached).
+        del self.client.cookies[settings.REPLICA_PIN_COOKIE]
+        cache.clear()
+        self.assertContains(self.client.get(reverse('clubs:list')), 'Replica Club')
+
+    @override_settings(PAGE_CACHE_TIMEOUT=600, REPLICA_FRAGMENT_CACHE_TIMEOUT=0)
+    def test_page_rendered_from_the_replica_after_a_purge_is_not_kept(self):
+        url = reverse('clubs:list')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.name = 'Renamed Club'
+            self.club.save()
+        # The replica has not caught up yet.
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Replica Club')
+
+        Club.objects.using(REPLICA_DB_ALIAS).filter(pk=self.club.pk).update(name='Renamed Club')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Renamed Club')
+
+    def test_sessions_and_users_come_from_the_primary(self):
+        # The replica has neither the session nor a user called primary-user.
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('clubs:list'))
+        self.assertContains(response, 'Replica Club')
+        self.assertEqual(response.wsgi_request.user, self.user)
+        self.assertContains(response, 'primary-user')
+
+        router = ReplicaRouter()
+        with read_from(REPLICA_DB_ALIAS):
+            self.assertEqual(router.db_for_read(Club), REPLICA_DB_ALIAS)
+            self.assertEqual(router.db_for_read(User), DEFAULT_DB_ALIAS)
+            self.assertEqual(router.db_for_read(Session), DEFAULT_DB_ALIAS)
+            self.assertEqual(router.db_for_write(Club), DEFAULT_DB_ALIAS)
@@ -6,6 +6,11 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('accounts.urls')),
     path('clubs/', include('clubs.urls')),
+    path('search/', include('search.urls')),
+    path('feed/', include('feeds.urls')),
+    path('api/', include('api.urls')),
+    path('notifications/', include('notifications.urls')),
+    path('metrics', include('metrics.urls')),
     path('', include('posts.urls')),
     path('', RedirectView.as_view(pattern_name='clubs:list', permanent=False)),
 ]
@@ -1,15 +1,30 @@
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
+from clubhub.admin import LargeTableAdmin
 from clubs.models import Club
 
 
 @admin.register(Club)
-class ClubAdmin(admin.ModelAdmin):
-    list_display = ['name', 'creator', 'created_at', 'get_member_count']
+class ClubAdmin(LargeTableAdmin):
+    list_display = ['name', 'creator', 'created_at', 'get_member_count', 'pending_request_count', 'get_posts']
+    list_select_related = ['creator']
     list_filter = ['created_at']
     search_fields = ['name', 'description', 'creator__username']
-    readonly_fields = ['slug', 'created_at', 'updated_at']
-    prepopulated_fields = {'slug': ('name',)}
+    autocomplete_fields = ['creator']
+    readonly_fields = [
+        'slug', 'approved_member_count', 'pending_request_count',
+        'published_post_count', 'created_at', 'updated_at'
+    ]
 
+    # Counts come from the denormalized counters, never from per-row COUNTs.
     def get_member_count(self, obj):
-        return obj.membership_set.filter(status='APPROVED').count()
-    get_member_count.short_description = 'Members'
\ No newline at end of file
+        return obj.approved_member_count
+    get_member_count.short_description = 'Members'
+    get_member_count.admin_order_field = 'approved_member_count'
+
+    def get_posts(self, obj):
+        url = reverse('admin:posts_post_changelist')
+        return format_html('<a href="{}?club__id__exact={}">{}</a>', url, obj.pk, obj.published_post_count)
+    get_posts.short_description = 'Posts'
+    get_posts.admin_order_field = 'published_post_count'
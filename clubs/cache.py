@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from metrics.registry import record_cache
+from pagecache.cache import purge, surrogate_key_version_key
+
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def club_version_key(club_id):
+    return f'club-version:{club_id}'
+
+
+def _new_version():
+    # Time-based rather than incr(): if the version key is evicted we never
+    # fall back to a number whose fragments may still be cached.
+    return time.time_ns()
+
+
+def get_club_versions(club_ids):
+    keys = {club_version_key(club_id): club_id for club_id in club_ids}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+    missing = {key: _new_version() for key, club_id in keys.items() if club_id not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update({keys[key]: version for key, version in missing.items()})
+    return versions
+
+
+def get_club_version(club):
+    version = getattr(club, 'cache_version', None)
+    if version is None:
+        version = get_club_versions([club.pk])[club.pk]
+        club.cache_version = version
+    return version
+
+
+def fragment_cache_key(fragment_name, club, vary_on=()):
+    return make_template_fragment_key(f'{fragment_name}:{club.pk}:{get_club_version(club)}', list(vary_on))
+
+
+def bump_club_version(club_id):
+    # Wait for the commit so a concurrent render cannot store pre-commit data
+    # under the new version.
+    transaction.on_commit(lambda: cache.set(club_version_key(club_id), _new_version(), timeout=None))
+    # Whole pages showing the club, its counters or its posts, for anonymous visitors.
+    purge(f'club:{club_id}', 'club-list')
+
+
+def club_list_version():
+    # When any club was last written or deleted, or None if not known:
+    # bump_club_version purges the page cache's club-list key on every club
+    # change. Read only, as a stamp here would mark cached pages stale.
+    version = cache.get(surrogate_key_version_key('club-list'))
+    if version is None:
+        return None
+    return datetime.fromtimestamp(version / 1e9, tz=timezone.utc)
+
+
+def record_fragment(hit):
+    with _stats_lock:
+        _stats['hits' if hit else 'misses'] += 1
+    record_cache('fragment', hit)
+
+
+def fragment_cache_stats():
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else 0.0}
@@ -0,0 +1,94 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from clubs.models import Club
+from clubs.pagination import CursorPaginator, encode_cursor
+from memberships.models import Membership
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare OFFSET and cursor pagination latency on a deep page of a large '
+        'member list. Seeds throwaway data inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=20000)
+        parser.add_argument('--per-page', type=int, default=20)
+        parser.add_argument('--page', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, members, per_page, page, repeat, **options):
+        if members < page * per_page:
+            members = page * per_page
+            self.stdout.write(f'Raising --members to {members} so page {page} exists.')
+        try:
+            with transaction.atomic():
+                self.run(members, per_page, page, repeat)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, members):
+        User = get_user_model()
+        creator = User.objects.create(username='bench-pagination-creator')
+        club = Club.objects.create(name='Pagination Benchmark Club', description='benchmark', creator=creator)
+        User.objects.bulk_create(
+            [User(username=f'bench-pagination-{i}') for i in range(members)], batch_size=2000
+        )
+        users = User.objects.filter(username__startswith='bench-pagination-').exclude(pk=creator.pk)
+        Membership.objects.bulk_create(
+            [Membership(user_id=user_id, club=club, status='APPROVED') for user_id in users.values_list('pk', flat=True)],
+            batch_size=2000,
+        )
+        # Fresh planner statistics, as a long-lived production table would have.
+        with connection.cursor() as cursor:
+            for model in (User, Membership):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        return club
+
+    def time_it(self, func, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples), max(samples)
+
+    def run(self, members, per_page, page, repeat):
+        self.stdout.write(f'Seeding {members} approved memberships...')
+        club = self.seed(members)
+        queryset = Membership.objects.approved().for_club(club).select_related('user')
+
+        def offset_page():
+            paginator = Paginator(queryset.order_by('-created_at', '-pk'), per_page)
+            current = paginator.get_page(page)
+            list(current.object_list)
+            return paginator.num_pages
+
+        anchor = queryset.order_by('-created_at', '-pk')[(page - 1) * per_page - 1]
+        cursor = encode_cursor(anchor)
+
+        def cursor_page():
+            list(CursorPaginator(queryset, per_page).get_page(cursor).object_list)
+
+        expected = [m.pk for m in Paginator(queryset.order_by('-created_at', '-pk'), per_page).get_page(page)]
+        actual = [m.pk for m in CursorPaginator(queryset, per_page).get_page(cursor)]
+        if expected != actual:
+            self.stderr.write('Cursor page does not match the OFFSET page!')
+
+        offset_median, offset_max = self.time_it(offset_page, repeat)
+        cursor_median, cursor_max = self.time_it(cursor_page, repeat)
+
+        self.stdout.write(f'Page {page} x {per_page} rows of {members} members, {repeat} runs:')
+        self.stdout.write(f'  OFFSET + COUNT(*): median {offset_median:.2f} ms, max {offset_max:.2f} ms')
+        self.stdout.write(f'  cursor (keyset):   median {cursor_median:.2f} ms, max {cursor_max:.2f} ms')
+        self.stdout.write(self.style.SUCCESS(f'  speed-up: {offset_median / cursor_median:.1f}x'))
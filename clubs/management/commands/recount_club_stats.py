@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from clubs.models import Club, COUNTER_FIELDS
+from memberships.models import Membership
+from posts.models import Post
+
+
+def _count_subquery(queryset):
+    counts = queryset.filter(club=OuterRef('pk')).order_by().values('club').annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def actual_counts():
+    return {
+        'approved_member_count': _count_subquery(Membership.objects.approved()),
+        'pending_request_count': _count_subquery(Membership.objects.pending()),
+        'published_post_count': _count_subquery(Post.objects.published()),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized member/request/post counters on clubs and repair drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--club', type=int, action='append', dest='club_ids',
+                            help='Only recount the given club id (repeatable).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drift without writing corrections.')
+
+    def handle(self, *args, batch_size, club_ids, dry_run, **options):
+        queryset = Club.objects.order_by('pk').annotate(
+            **{f'actual_{field}': expr for field, expr in actual_counts().items()}
+        ).only('pk', *COUNTER_FIELDS)
+        if club_ids:
+            queryset = queryset.filter(pk__in=club_ids)
+
+        checked = repaired = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            checked += len(batch)
+
+            drifted = [
+                club.pk for club in batch
+                if any(getattr(club, field) != getattr(club, f'actual_{field}') for field in COUNTER_FIELDS)
+            ]
+            if drifted and not dry_run:
+                # Recompute inside the UPDATE itself so concurrent F() bumps are not lost.
+                Club.objects.filter(pk__in=drifted).update(updated_at=timezone.now(), **actual_counts())
+            repaired += len(drifted)
+
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Checked clubs up to id {last_pk} ({len(drifted)} drifted)')
+
+        action = 'Found' if dry_run else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {repaired} drifted club(s) out of {checked} checked.'
+        ))
@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-18 20:07
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Club = apps.get_model('clubs', 'Club')
+    Membership = apps.get_model('memberships', 'Membership')
+    Post = apps.get_model('posts', 'Post')
+
+    def count_of(queryset):
+        counts = queryset.filter(club=OuterRef('pk')).order_by().values('club').annotate(
+            total=Count('pk')
+        ).values('total')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+    Club.objects.update(
+        approved_member_count=count_of(Membership.objects.filter(status='APPROVED')),
+        pending_request_count=count_of(Membership.objects.filter(status='PENDING')),
+        published_post_count=count_of(Post.objects.filter(is_published=True)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0001_initial'),
+        ('memberships', '0002_membership_memberships_created_0b9d06_idx'),
+        ('posts', '0002_post_posts_post_created_183a3b_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='club',
+            name='approved_member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='pending_request_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
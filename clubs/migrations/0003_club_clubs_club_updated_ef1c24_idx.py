@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 21:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0002_club_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['updated_at'], name='clubs_club_updated_ef1c24_idx'),
+        ),
+    ]
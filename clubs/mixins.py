@@ -1,41 +1,135 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.contrib.messages import get_messages
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from clubhub.aio import gather_queries, load_user
+from clubhub.routers import REPLICA_DB_ALIAS, read_from
 from clubs.models import Club
+from memberships.resolver import get_membership_resolver
+
 
+class ClubRoleRequiredMixin(UserPassesTestMixin):
+    allowed_roles = ()
 
-class ClubMemberRequiredMixin(UserPassesTestMixin):
     def test_func(self):
-        club = self.get_club()
-        return club.membership_set.filter(
-            user=self.request.user,
-            status='APPROVED'
-        ).exists()
+        return self.get_user_role() in self.allowed_roles
 
-    def get_club(self):
+    def get_club_object(self):
         return get_object_or_404(Club, pk=self.kwargs.get('pk') or self.kwargs.get('club_pk'))
 
+    def get_club(self):
+        if not hasattr(self, '_club'):
+            self._club = self.get_club_object()
+        return self._club
 
-class ClubAdminRequiredMixin(UserPassesTestMixin):
-    def test_func(self):
-        club = self.get_club()
-        return club.membership_set.filter(
-            user=self.request.user,
-            role='ADMIN',
-            status='APPROVED'
-        ).exists()
+    def get_membership_resolver(self):
+        return get_membership_resolver(self.request.user)
 
-    def get_club(self):
-        return get_object_or_404(Club, pk=self.kwargs.get('pk') or self.kwargs.get('club_pk'))
+    def get_user_membership(self):
+        return self.get_membership_resolver().approved_membership(self.get_club())
 
+    def get_user_role(self):
+        return self.get_membership_resolver().role(self.get_club())
 
-class ClubModeratorOrAdminMixin(UserPassesTestMixin):
-    def test_func(self):
-        club = self.get_club()
-        return club.membership_set.filter(
-            user=self.request.user,
-            role__in=['ADMIN', 'MODERATOR'],
-            status='APPROVED'
-        ).exists()
 
-    def get_club(self):
-        return get_object_or_404(Club, pk=self.kwargs.get('pk') or self.kwargs.get('club_pk'))
+class ClubMemberRequiredMixin(ClubRoleRequiredMixin):
+    allowed_roles = ('ADMIN', 'MODERATOR', 'MEMBER')
+
+
+class ClubAdminRequiredMixin(ClubRoleRequiredMixin):
+    allowed_roles = ('ADMIN',)
+
+
+class ClubModeratorOrAdminMixin(ClubRoleRequiredMixin):
+    allowed_roles = ('ADMIN', 'MODERATOR')
+
+
+class ReplicaReadMixin:
+    # Put first in the bases so permission checks read from the replica too.
+    def dispatch(self, request, *args, **kwargs):
+        if not getattr(request, 'use_replica', False):
+            return super().dispatch(request, *args, **kwargs)
+        # For the page cache, which keeps replica renders only briefly.
+        request.read_from_replica = True
+        if self.view_is_async:
+            return self.dispatch_async(request, *args, **kwargs)
+        with read_from(REPLICA_DB_ALIAS):
+            response = super().dispatch(request, *args, **kwargs)
+            # Template responses render lazily; do it while still on the replica.
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        return response
+
+    async def dispatch_async(self, request, *args, **kwargs):
+        with read_from(REPLICA_DB_ALIAS):
+            response = await super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                await sync_to_async(response.render)()
+        return response
+
+
+class ConditionalGetMixin:
+    # Conditional GET: get_validator_parts() runs one cheap query for what the
+    # page shows (timestamps, counters); a matching If-None-Match or
+    # If-Modified-Since gets a 304 before the view queries or renders anything.
+    # Put after ReplicaReadMixin so the validator reads the same database.
+    def get_validator_parts(self):
+        # A tuple of values that changes whenever the page would, or None
+        # when the page does not exist.
+        raise NotImplementedError
+
+    def get_validators(self):
+        request = self.request
+        # A pending flash message must be rendered, whatever the validator says.
+        if len(get_messages(request)):
+            return None, None
+        parts = self.get_validator_parts()
+        if parts is None:
+            return None, None
+        user = request.user
+        digest = hashlib.md5(repr((user.pk, parts)).encode(), usedforsecurity=False).hexdigest()
+        # Weak: the markup differs between renders (CSRF tokens) but means the same.
+        etag = f'W/"{digest}"'
+        # Last-Modified cannot say whose page it is, so only anonymous pages get one.
+        last_modified = None
+        if not user.is_authenticated:
+            timestamps = [part for part in parts if hasattr(part, 'timestamp')]
+            last_modified = int(max(timestamps).timestamp()) if timestamps else None
+        return etag, last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self.dispatch_conditional_async(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return self.add_validator_headers(response, etag, last_modified)
+
+    async def dispatch_conditional_async(self, request, *args, **kwargs):
+        await load_user(request)
+        (etag, last_modified), = await gather_queries(self.get_validators)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+        return self.add_validator_headers(response, etag, last_modified)
+
+    def add_validator_headers(self, response, etag, last_modified):
+        if etag is None or response.status_code not in (200, 304):
+            return response
+        response.headers.setdefault('ETag', etag)
+        if last_modified is not None:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+        # Revalidate on every visit, and keep signed-in pages out of shared caches.
+        if self.request.user.is_authenticated:
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ('Cookie',))
+        return response
@@ -1,17 +1,30 @@
 from django.db import models
 from django.conf import settings
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
-from django.db.models import Count, Q
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+
+COUNTER_FIELDS = ('approved_member_count', 'pending_request_count', 'published_post_count')
 
 
 class ClubManager(models.Manager):
     def with_member_counts(self):
-        return self.annotate(
-            member_count=Count(
-                'membership_set',
-                filter=Q(membership_set__status='APPROVED')
-            )
+        return self.annotate(member_count=F('approved_member_count'))
+
+    def bump_counters(self, club_id, **deltas):
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return 0
+        # update() skips auto_now; the counters are on the page, so the club
+        # counts as modified (see ConditionalGetMixin). Decrements are clamped
+        # so a drifted counter cannot break the unsigned CHECK constraint.
+        return self.filter(pk=club_id).update(
+            updated_at=timezone.now(),
+            **{field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+               for field, delta in deltas.items()}
         )
 
 
@@ -24,6 +37,9 @@ class Club(models.Model):
         on_delete=models.CASCADE,
         related_name='created_clubs'
     )
+    approved_member_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_request_count = models.PositiveIntegerField(default=0, editable=False)
+    published_post_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -34,6 +50,8 @@ class Club(models.Model):
         indexes = [
             models.Index(fields=['name']),
             models.Index(fields=['-created_at']),
+            # Max('updated_at') for the club list's conditional GET.
+            models.Index(fields=['updated_at']),
         ]
         verbose_name = 'Club'
         verbose_name_plural = 'Clubs'
@@ -44,6 +62,13 @@ class Club(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Counters are maintained with F() updates by clubs.signals; never
+            # write back the possibly stale values held by this instance.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
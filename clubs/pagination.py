@@ -0,0 +1,123 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(obj, backwards=False):
+    # obj is a model instance or a values() row that includes created_at and pk.
+    created_at, pk = (obj['created_at'], obj['pk']) if isinstance(obj, dict) else (obj.created_at, obj.pk)
+    payload = [created_at.isoformat(), pk, int(backwards)]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, pk, backwards = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at, pk = parse_datetime(created_at), int(pk)
+        # Out-of-range ids would fail in the database rather than here.
+        if created_at is None or not 0 < pk < 2 ** 63:
+            raise ValueError
+        return created_at, pk, bool(backwards)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise InvalidCursor(token)
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.has_next_page = has_next
+        self.has_previous_page = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.has_next_page
+
+    def has_previous(self):
+        return self.has_previous_page
+
+    def has_other_pages(self):
+        return self.has_next_page or self.has_previous_page
+
+    @property
+    def next_cursor(self):
+        if self.has_next_page and self.object_list:
+            return encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous_page and self.object_list:
+            return encode_cursor(self.object_list[0], backwards=True)
+        return None
+
+
+class CursorPaginator:
+    # Keyset pagination over (-created_at, -pk): every page is one LIMIT query
+    # seeking on the index, with no OFFSET scan and no COUNT(*).
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def get_page(self, cursor=None):
+        position = None
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+            except InvalidCursor:
+                position = None
+
+        if position is None:
+            return self._page(self.object_list.order_by('-created_at', '-pk'), has_previous=False)
+
+        created_at, pk, backwards = position
+        if not backwards:
+            # The redundant bound lets the planner seek the created_at index.
+            queryset = self.object_list.filter(created_at__lte=created_at).filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            ).order_by('-created_at', '-pk')
+            return self._page(queryset, has_previous=True)
+
+        queryset = self.object_list.filter(created_at__gte=created_at).filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+        ).order_by('created_at', 'pk')
+        rows = list(queryset[:self.per_page + 1])
+        if len(rows) <= self.per_page:
+            # Walked back to the start; show a full first page instead of a short one.
+            return self.get_page(None)
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return CursorPage(rows, self, has_next=True, has_previous=True)
+
+    def _page(self, queryset, has_previous):
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return CursorPage(rows[:self.per_page], self, has_next=has_next, has_previous=has_previous)
+
+
+class CursorPaginationMixin:
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size)
+        page = paginator.get_page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
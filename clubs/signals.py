@@ -1,7 +1,27 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+from clubs.cache import bump_club_version
 from clubs.models import Club
 from memberships.models import Membership
+from posts.models import Post
+
+
+MEMBERSHIP_COUNTERS = {
+    'APPROVED': 'approved_member_count',
+    'PENDING': 'pending_request_count',
+}
+
+TRACKED_FIELDS = {
+    Membership: ('club_id', 'status'),
+    Post: ('club_id', 'is_published'),
+}
+
+# Sent when the tracked fields of a Membership or Post change, with the
+# (club_id, status) / (club_id, is_published) tuples before and after; None
+# means the row did not exist. Bulk update() calls do not send it.
+tracked_state_changed = Signal()
 
 
 @receiver(post_save, sender=Club)
@@ -12,4 +32,107 @@ def create_admin_membership(sender, instance, created, **kwargs):
             club=instance,
             role='ADMIN',
             status='APPROVED'
-        )
\ No newline at end of file
+        )
+
+
+def _counter_for(sender, state):
+    if state is None:
+        return None
+    club_id, value = state
+    if sender is Membership:
+        field = MEMBERSHIP_COUNTERS.get(value)
+    else:
+        field = 'published_post_count' if value else None
+    return (club_id, field) if club_id and field else None
+
+
+def _apply_counter_change(sender, old_state, new_state):
+    deltas = Counter()
+    old_counter = _counter_for(sender, old_state)
+    new_counter = _counter_for(sender, new_state)
+    if old_counter == new_counter:
+        return
+    if old_counter:
+        deltas[old_counter] -= 1
+    if new_counter:
+        deltas[new_counter] += 1
+
+    per_club = {}
+    for (club_id, field), delta in deltas.items():
+        per_club.setdefault(club_id, {})[field] = delta
+    for club_id, club_deltas in per_club.items():
+        Club.objects.bump_counters(club_id, **club_deltas)
+
+
+def _snapshot(instance):
+    # Read from __dict__ so deferred fields are not loaded just for tracking.
+    values = tuple(instance.__dict__.get(name) for name in TRACKED_FIELDS[type(instance)])
+    return None if None in values else values
+
+
+@receiver(post_init, sender=Membership)
+@receiver(post_init, sender=Post)
+def remember_counter_state(sender, instance, **kwargs):
+    instance._counter_state = _snapshot(instance) if instance.pk else None
+
+
+@receiver(pre_save, sender=Membership)
+@receiver(pre_save, sender=Post)
+def load_counter_state(sender, instance, **kwargs):
+    if instance.pk and not instance._state.adding and instance._counter_state is None:
+        instance._counter_state = sender._base_manager.filter(pk=instance.pk).values_list(
+            *TRACKED_FIELDS[sender]
+        ).first()
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_save, sender=Post)
+def update_club_counters(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    old_state = None if created else instance._counter_state
+    new_state = _snapshot(instance) or old_state
+    _apply_counter_change(sender, old_state, new_state)
+    instance._counter_state = new_state
+    if old_state != new_state:
+        tracked_state_changed.send(sender=sender, instance=instance, old_state=old_state, new_state=new_state)
+
+
+@receiver(pre_delete, sender=Club)
+def remember_deleted_club(sender, instance, origin=None, **kwargs):
+    # pre_delete fires for every collected club before any row is deleted; the
+    # origin (instance or queryset) is shared by the whole delete() call.
+    if origin is not None:
+        origin.__dict__.setdefault('_deleted_club_ids', set()).add(instance.pk)
+
+
+def _club_deleted(instance, origin):
+    # Memberships and posts cascading from their club's deletion: the counters,
+    # feed entries and fragments go with the club, so skip the per-row work.
+    return instance.club_id in getattr(origin, '_deleted_club_ids', ())
+
+
+@receiver(post_delete, sender=Membership)
+@receiver(post_delete, sender=Post)
+def release_club_counters(sender, instance, origin=None, **kwargs):
+    if _club_deleted(instance, origin):
+        return
+    old_state = _snapshot(instance)
+    _apply_counter_change(sender, old_state, None)
+    tracked_state_changed.send(sender=sender, instance=instance, old_state=old_state, new_state=None)
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+def invalidate_club_fragments(sender, instance, **kwargs):
+    bump_club_version(instance.pk)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_club_content_fragments(sender, instance, origin=None, **kwargs):
+    if kwargs.get('raw') or _club_deleted(instance, origin):
+        return
+    bump_club_version(instance.club_id)
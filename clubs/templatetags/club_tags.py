@@ -1,14 +1,16 @@
 from django import template
+from django.conf import settings
+from django.core.cache import cache
+from clubhub.routers import reading_from_replica
+from clubs.cache import fragment_cache_key, record_fragment
+from memberships.resolver import get_membership_resolver
 
 register = template.Library()
 
 
 @register.simple_tag
 def user_role_in_club(user, club):
-    if not user.is_authenticated:
-        return None
-    membership = club.membership_set.filter(user=user, status='APPROVED').first()
-    return membership.role if membership else None
+    return get_membership_resolver(user).role(club)
 
 
 @register.filter
@@ -21,3 +23,45 @@ def can_create_news(user, club):
 def can_create_post(user, club):
     role = user_role_in_club(user, club)
     return role in ['ADMIN', 'MODERATOR', 'MEMBER']
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, club, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.club = club
+        self.vary_on = vary_on
+
+    def render(self, context):
+        club = self.club.resolve(context)
+        key = fragment_cache_key(self.fragment_name, club, [var.resolve(context) for var in self.vary_on])
+        content = cache.get(key)
+        record_fragment(hit=content is not None)
+        if content is None:
+            content = self.nodelist.render(context)
+            timeout = settings.FRAGMENT_CACHE_TIMEOUT
+            if reading_from_replica():
+                # A lagging replica may render pre-write data under the new
+                # version, so keep such fragments only briefly.
+                timeout = min(timeout, settings.REPLICA_FRAGMENT_CACHE_TIMEOUT)
+            cache.set(key, content, timeout)
+        return content
+
+
+@register.tag
+def fragment_cache(parser, token):
+    # {% fragment_cache "name" club [vary_on ...] %} ... {% endfragment_cache %}
+    # The key includes the club's version, which clubs.signals bumps on any
+    # change to the club, its posts or its memberships.
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a fragment name and a club.")
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+    fragment_name = bits[1].strip('\'"')
+    return FragmentCacheNode(
+        nodelist,
+        fragment_name,
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
@@ -1 +1,451 @@
-from django.test import TestCase
+import base64
+import json
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from benchmarks.testing import QueryBudgetMixin
+from clubhub.admin import EstimatedCountPaginator
+from clubhub.routers import REPLICA_DB_ALIAS, read_from
+from clubs import urls as club_urls
+from clubs.models import Club
+from clubs.pagination import CursorPaginator, encode_cursor
+from clubs.views import AsyncClubDetailView
+from memberships.models import Membership
+from posts.models import Post
+from tasks.models import Task
+
+
+User = get_user_model()
+
+
+class ClubQueryBudgetTests(QueryBudgetMixin, TestCase):
+    # Enough rows that a per-row query shows up as a repeated statement.
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='pass')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        cls.other_club = Club.objects.create(name='Film Club', description='Screenings', creator=cls.admin)
+        for i in range(6):
+            user = User.objects.create_user(f'member{i}')
+            Membership.objects.create(user=user, club=cls.club, status='APPROVED')
+            Membership.objects.create(user=user, club=cls.other_club, status='APPROVED')
+        for i in range(4):
+            Membership.objects.create(user=User.objects.create_user(f'pending{i}'), club=cls.club)
+        for i in range(12):
+            Post.objects.create(
+                title=f'Post {i}', body='Body', club=cls.club, author=cls.admin,
+                type='NEWS' if i % 2 else 'BLOG',
+            )
+        cls.pending = Membership.objects.pending().for_club(cls.club).first()
+        cls.member = Membership.objects.for_club(cls.club).filter(role='MEMBER', status='APPROVED').first()
+        cls.outsider = User.objects.create_user('outsider')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_every_url_has_a_budget(self):
+        self.assertBudgetsDeclared(club_urls)
+
+    def test_club_list(self):
+        self.assertQueriesOk(self.client.get(reverse('clubs:list')))
+
+    def test_club_list_anonymous(self):
+        self.client.logout()
+        self.assertQueriesOk(self.client.get(reverse('clubs:list')))
+
+    def test_club_detail(self):
+        self.assertQueriesOk(self.client.get(reverse('clubs:detail', kwargs={'slug': self.club.slug})))
+
+    def test_club_create(self):
+        self.assertQueriesOk(self.client.get(reverse('clubs:create')))
+        response = self.client.post(reverse('clubs:create'), {'name': 'Go Club', 'description': 'Stones'})
+        self.assertEqual(response.status_code, 302)
+        self.assertQueriesOk(response)
+
+    def test_member_list(self):
+        self.assertQueriesOk(self.client.get(reverse('clubs:members', kwargs={'pk': self.club.pk})))
+
+    def test_export_members(self):
+        # The rows are read while the stream is consumed, after the query
+        # inspector has made its report, so count around both.
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('clubs:export_members', kwargs={'pk': self.club.pk}))
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertLessEqual(len(queries), club_urls.query_budgets['export_members'], queries.captured_queries)
+        self.assertIn('user__username', queries[-1]['sql'])
+        self.assertEqual(lines[0], 'username,role,joined')
+        self.assertEqual(len(lines), 1 + self.club.membership_set.approved().count())
+        self.client.force_login(self.member.user)
+        self.assertEqual(self.client.get(reverse('clubs:export_members', kwargs={'pk': self.club.pk})).status_code, 403)
+
+    def test_membership_requests(self):
+        self.assertQueriesOk(self.client.get(reverse('clubs:requests', kwargs={'pk': self.club.pk})))
+
+    def test_join(self):
+        self.client.force_login(self.outsider)
+        response = self.client.post(reverse('clubs:join', kwargs={'pk': self.club.pk}))
+        self.assertEqual(response.status_code, 302)
+        self.assertQueriesOk(response)
+
+    def test_membership_actions(self):
+        for name, membership in [
+            ('approve_membership', self.pending),
+            ('promote_member', self.member),
+            ('demote_member', self.member),
+        ]:
+            with self.subTest(name):
+                response = self.client.post(reverse(f'clubs:{name}', kwargs={'pk': membership.pk}))
+                self.assertEqual(response.status_code, 302)
+                self.assertQueriesOk(response)
+
+    def test_reject_membership(self):
+        response = self.client.post(reverse('clubs:reject_membership', kwargs={'pk': self.pending.pk}))
+        self.assertEqual(response.status_code, 302)
+        self.assertQueriesOk(response)
+
+    def test_bulk_membership(self):
+        response = self.client.post(
+            reverse('clubs:bulk_membership', kwargs={'pk': self.club.pk}), {'action': 'approve', 'scope': 'all'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertQueriesOk(response)
+
+
+class ClubCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        cls.users = [User.objects.create_user(f'user{i}') for i in range(3)]
+
+    def assertCounters(self, members, requests, posts):
+        self.club.refresh_from_db()
+        self.assertEqual(
+            (self.club.approved_member_count, self.club.pending_request_count, self.club.published_post_count),
+            (members, requests, posts),
+        )
+
+    def test_create(self):
+        # The creator's admin membership counts.
+        self.assertCounters(1, 0, 0)
+        Membership.objects.create(user=self.users[0], club=self.club)
+        Membership.objects.create(user=self.users[1], club=self.club, status='APPROVED')
+        Post.objects.create(title='Published', body='Body', club=self.club, author=self.admin)
+        Post.objects.create(title='Draft', body='Body', club=self.club, author=self.admin, is_published=False)
+        self.assertCounters(2, 1, 1)
+
+    def test_approve_and_reject(self):
+        approved = Membership.objects.create(user=self.users[0], club=self.club)
+        rejected = Membership.objects.create(user=self.users[1], club=self.club)
+        self.assertCounters(1, 2, 0)
+        approved.status = 'APPROVED'
+        approved.save()
+        self.assertCounters(2, 1, 0)
+        rejected.status = 'REJECTED'
+        rejected.save()
+        self.assertCounters(2, 0, 0)
+
+    def test_delete(self):
+        membership = Membership.objects.create(user=self.users[0], club=self.club, status='APPROVED')
+        post = Post.objects.create(title='Published', body='Body', club=self.club, author=self.admin)
+        membership.delete()
+        post.delete()
+        self.assertCounters(1, 0, 0)
+
+    def test_decrement_does_not_go_below_zero(self):
+        membership = Membership.objects.create(user=self.users[0], club=self.club, status='APPROVED')
+        Club.objects.filter(pk=self.club.pk).update(approved_member_count=0)
+        membership.delete()
+        self.assertCounters(0, 0, 0)
+
+    def test_club_delete_skips_per_row_work(self):
+        for user in self.users:
+            Membership.objects.create(user=user, club=self.club, status='APPROVED')
+        for i in range(3):
+            Post.objects.create(title=f'Post {i}', body='Body', club=self.club, author=self.admin)
+        Task.objects.all().delete()
+        with CaptureQueriesContext(connection) as queries:
+            self.club.delete()
+        # No counter UPDATEs or queued feed tasks for the cascaded rows.
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+        self.assertFalse(Task.objects.exists())
+
+    def test_recount_club_stats(self):
+        Membership.objects.create(user=self.users[0], club=self.club, status='APPROVED')
+        Post.objects.create(title='Published', body='Body', club=self.club, author=self.admin)
+        Club.objects.filter(pk=self.club.pk).update(
+            approved_member_count=7, pending_request_count=3, published_post_count=0,
+        )
+        call_command('recount_club_stats', '--dry-run', stdout=StringIO())
+        self.assertCounters(7, 3, 0)
+        out = StringIO()
+        call_command('recount_club_stats', stdout=out)
+        self.assertIn('Repaired 1 drifted club(s) out of 1 checked.', out.getvalue())
+        self.assertCounters(2, 0, 1)
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user('creator')
+        for i in range(5):
+            Club.objects.create(name=f'Chess {i}', description='Desc', creator=cls.creator)
+        for i in range(13):
+            Club.objects.create(name=f'Film {i}', description='Desc', creator=cls.creator)
+        # Every club shares a created_at, so the pk alone breaks the ties.
+        Club.objects.update(created_at=timezone.now())
+        cls.chess = list(Club.objects.filter(name__startswith='Chess').order_by('-pk'))
+
+    def paginator(self):
+        return CursorPaginator(Club.objects.filter(name__startswith='Chess'), 2)
+
+    def test_forward_and_backward_across_ties(self):
+        paginator = self.paginator()
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        self.assertEqual([list(page) for page in pages], [self.chess[0:2], self.chess[2:4], self.chess[4:]])
+        self.assertEqual([page.has_previous() for page in pages], [False, True, True])
+
+        previous = paginator.get_page(pages[2].previous_cursor)
+        self.assertEqual(list(previous), self.chess[2:4])
+        self.assertTrue(previous.has_next())
+        first = paginator.get_page(previous.previous_cursor)
+        self.assertEqual(list(first), self.chess[0:2])
+        self.assertFalse(first.has_previous())
+
+    def test_bad_cursors_give_the_first_page(self):
+        def token(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+        created_at = self.chess[0].created_at.isoformat()
+        for cursor in (
+            '!!!', 'abc', token({'a': 1}), token([created_at, 'x', 0]), token([None, 1, 0]),
+            token(['2024-13-45T00:00:00', 1, 0]), token([created_at, 2 ** 70, 0]), token([created_at, -1, 1]),
+        ):
+            with self.subTest(cursor):
+                self.assertEqual(list(self.paginator().get_page(cursor)), self.chess[0:2])
+                response = self.client.get(reverse('clubs:list'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_cursor_links_keep_the_filters(self):
+        url = reverse('clubs:list')
+        response = self.client.get(url, {'name': 'Film'})
+        page = response.context['page_obj']
+        self.assertEqual(len(page), 12)
+        self.assertContains(response, f'?name=Film&amp;cursor={page.next_cursor}')
+
+        response = self.client.get(url, {'name': 'Film', 'cursor': page.next_cursor})
+        self.assertEqual([club.name for club in response.context['page_obj']], ['Film 0'])
+        self.assertEqual(response.context['page_obj'].previous_cursor, encode_cursor(
+            Club.objects.get(name='Film 0'), backwards=True,
+        ))
+
+
+class FragmentCacheTests(TestCase):
+    template = Template('{% load club_tags %}{% fragment_cache "posts" club %}{{ text }}{% endfragment_cache %}')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, text, alias=None):
+        # A fresh instance each time, as a request would load it.
+        context = Context({'club': Club.objects.get(pk=self.club.pk), 'text': text})
+        with read_from(alias):
+            return self.template.render(context)
+
+    def test_cached_until_a_post_or_membership_changes(self):
+        self.assertEqual(self.render('first'), 'first')
+        self.assertEqual(self.render('second'), 'first')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post = Post.objects.create(title='Results', body='Body', club=self.club, author=self.admin)
+        self.assertEqual(self.render('after post'), 'after post')
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertEqual(self.render('after delete'), 'after delete')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Membership.objects.create(user=User.objects.create_user('member'), club=self.club)
+        self.assertEqual(self.render('after join'), 'after join')
+        self.assertEqual(self.render('unchanged'), 'after join')
+
+    def test_other_clubs_stay_cached(self):
+        self.render('first')
+        other = Club.objects.create(name='Film Club', description='Screenings', creator=self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title='Screening', body='Body', club=other, author=self.admin)
+        self.assertEqual(self.render('second'), 'first')
+
+    @override_settings(REPLICA_FRAGMENT_CACHE_TIMEOUT=0)
+    def test_replica_renders_use_the_replica_timeout(self):
+        self.assertEqual(self.render('first', REPLICA_DB_ALIAS), 'first')
+        # Expired at once with a zero replica timeout; primary renders are kept.
+        self.assertEqual(self.render('second'), 'second')
+        self.assertEqual(self.render('third'), 'second')
+
+
+class AsyncClubDetailViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        Post.objects.create(title='Tournament results', body='Body', club=cls.club, author=cls.admin, type='NEWS')
+        Post.objects.create(title='Opening theory', body='Body', club=cls.club, author=cls.admin, type='BLOG')
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self):
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        response = async_to_sync(AsyncClubDetailView.as_view())(request, slug=self.club.slug)
+        return response.render()
+
+    def test_renders_club_posts_and_membership(self):
+        self.client.force_login(self.admin)
+        # The user (force_login left the session in the cache), the ETag
+        # validator, club and memberships, COUNT and LIMIT for each post
+        # section, then the (uncached) unread badge count.
+        with self.assertNumQueries(9):
+            response = self.get()
+        self.assertContains(response, 'Tournament results')
+        self.assertContains(response, 'Opening theory')
+        self.assertEqual(response.context_data['user_membership'].role, 'ADMIN')
+
+    def test_skips_post_queries_for_cached_fragments(self):
+        self.client.force_login(self.admin)
+        self.get()
+        # The validator, club and memberships; the session, user and badge
+        # count now come from the cache.
+        with self.assertNumQueries(3):
+            response = self.get()
+        self.assertContains(response, 'Tournament results')
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.member = User.objects.create_user('member')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        Post.objects.create(title='Tournament results', body='Body', club=cls.club, author=cls.admin, type='NEWS')
+        cls.url = reverse('clubs:detail', kwargs={'slug': cls.club.slug})
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_matching_etag_skips_the_view(self):
+        etag = self.client.get(self.url)['ETag']
+        # The validator only; the session and user come from the cache.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_etag_is_per_viewer(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(self.member)
+        response = self.client.get(self.url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_changes_invalidate(self):
+        self.client.force_login(self.member)
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Membership.objects.create(user=self.member, club=self.club)
+        self.assertEqual(self.client.get(self.url, headers={'if-none-match': etag}).status_code, 200)
+
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title='Next round', body='Body', club=self.club, author=self.admin)
+        self.assertEqual(self.client.get(self.url, headers={'if-none-match': etag}).status_code, 200)
+
+    def test_club_list_validator(self):
+        url = reverse('clubs:list')
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+        # The newest updated_at off its index; no COUNT over the table.
+        self.assertEqual([query['sql'].split(' FROM ')[0] for query in queries], [
+            'SELECT MAX("clubs_club"."updated_at") AS "last_change"',
+        ])
+
+        other = Club.objects.create(name='Film Club', description='Screenings', creator=self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+    def test_anonymous_last_modified(self):
+        self.client.logout()
+        for url in (self.url, reverse('clubs:list')):
+            with self.subTest(url):
+                last_modified = self.client.get(url)['Last-Modified']
+                response = self.client.get(url, headers={'if-modified-since': last_modified})
+                self.assertEqual(response.status_code, 304)
+
+
+class ClubAdminTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('root', password='pass')
+        for i in range(12):
+            Club.objects.create(name=f'Club {i}', description='Desc', creator=User.objects.create_user(f'creator{i}'))
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def test_changelist(self):
+        response = self.client.get(reverse('admin:clubs_club_changelist'))
+        self.assertContains(response, 'Club 11')
+        self.assertQueriesOk(response, budget=6)
+
+    def test_change_form_does_not_list_users(self):
+        response = self.client.get(reverse('admin:clubs_club_change', args=[Club.objects.get(name='Club 0').pk]))
+        self.assertContains(response, 'creator0')
+        self.assertNotContains(response, 'creator11')
+        self.assertQueriesOk(response, budget=6)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        creator = User.objects.create_user('creator')
+        for i in range(5):
+            Club.objects.create(name=f'Club {i}', description='Desc', creator=creator)
+
+    def test_small_tables_count_exactly(self):
+        self.assertEqual(EstimatedCountPaginator(Club.objects.all(), 2).count, 5)
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0)
+    def test_filtered_querysets_count_exactly(self):
+        self.assertEqual(EstimatedCountPaginator(Club.objects.filter(name='Club 1'), 2).count, 1)
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=0)
+    def test_large_tables_use_the_estimate(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('Row estimates are read from PostgreSQL statistics.')
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Club._meta.db_table}')
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(Club.objects.all(), 2).count, 5)
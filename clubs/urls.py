@@ -1,14 +1,18 @@
+from django.conf import settings
 from django.urls import path
-from clubs.views import ClubListView, ClubDetailView, ClubCreateView
+from clubs.views import AsyncClubDetailView, ClubListView, ClubDetailView, ClubCreateView
 from memberships.views import (
     JoinClubView,
     MemberListView,
+    MemberExportView,
     MembershipRequestListView,
     ApproveMembershipView,
     RejectMembershipView,
     PromoteMemberView,
-    DemoteMemberView
+    DemoteMemberView,
+    BulkMembershipActionView
 )
+from stats.views import ClubStatsView
 
 
 app_name = 'clubs'
@@ -22,6 +26,27 @@ urlpatterns = [
     path('membership/<int:pk>/demote/', DemoteMemberView.as_view(), name='demote_member'),
     path('<int:pk>/join/', JoinClubView.as_view(), name='join'),
     path('<int:pk>/members/', MemberListView.as_view(), name='members'),
+    path('<int:pk>/members/export/', MemberExportView.as_view(), name='export_members'),
     path('<int:pk>/requests/', MembershipRequestListView.as_view(), name='requests'),
-    path('<slug:slug>/', ClubDetailView.as_view(), name='detail'),
-]
\ No newline at end of file
+    path('<int:pk>/memberships/bulk/', BulkMembershipActionView.as_view(), name='bulk_membership'),
+    path('<int:pk>/stats/', ClubStatsView.as_view(), name='stats'),
+    path('<slug:slug>/', (AsyncClubDetailView if settings.ASYNC_VIEWS else ClubDetailView).as_view(), name='detail'),
+]
+
+# Most SQL queries one request may run, checked by the query inspector in
+# debug and test runs (benchmarks.middleware.QueryInspectionMiddleware).
+query_budgets = {
+    'list': 5,
+    'create': 8,
+    'approve_membership': 12,
+    'reject_membership': 9,
+    'promote_member': 7,
+    'demote_member': 7,
+    'join': 9,
+    'members': 7,
+    'export_members': 6,
+    'requests': 7,
+    'bulk_membership': 14,
+    'stats': 6,
+    'detail': 10,
+}
@@ -1,77 +1,149 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.views.generic import DetailView, CreateView
-from django.db.models import Prefetch
 from django.core.paginator import Paginator
+from django.core.cache import cache
+from django.db.models import Max, OuterRef, Subquery
+from django.utils.functional import SimpleLazyObject
 from django_filters.views import FilterView
+from clubhub.aio import gather_queries, load_user
+from clubs.cache import club_list_version, fragment_cache_key, get_club_versions
 from clubs.models import Club
 from clubs.forms import ClubForm
 from clubs.filters import ClubFilter
-from posts.models import Post
+from clubs.mixins import ConditionalGetMixin, ReplicaReadMixin
+from clubs.pagination import CursorPaginationMixin
 from memberships.models import Membership
+from posts.models import Post
+from memberships.resolver import get_membership_resolver, load_memberships
+from pagecache.cache import canonical_page, canonical_text
+from pagecache.mixins import CachedPageMixin
 
 
-class ClubListView(FilterView):
+class ClubListView(ReplicaReadMixin, ConditionalGetMixin, CachedPageMixin, CursorPaginationMixin, FilterView):
     model = Club
     filterset_class = ClubFilter
     template_name = 'clubs/club_list.html'
     context_object_name = 'clubs'
     paginate_by = 12
+    page_cache_params = {'name': canonical_text, 'description': canonical_text, 'cursor': canonical_text}
+
+    def get_surrogate_keys(self):
+        return ['club-list']
+
+    def get_validator_parts(self):
+        # Whatever the filters and page, any club change (counters bump
+        # updated_at too) changes the newest updated_at, read off its index.
+        # Deletions do not, so the club-list version from the cache covers them.
+        return Club.objects.aggregate(last_change=Max('updated_at'))['last_change'], club_list_version()
 
     def get_queryset(self):
         return Club.objects.with_member_counts().select_related('creator')
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        clubs = context['clubs']
+        versions = get_club_versions([club.pk for club in clubs])
+        for club in clubs:
+            club.cache_version = versions[club.pk]
+        return context
+
 
-class ClubDetailView(DetailView):
+class ClubDetailView(ReplicaReadMixin, ConditionalGetMixin, CachedPageMixin, DetailView):
     model = Club
     template_name = 'clubs/club_detail.html'
     context_object_name = 'club'
 
-    def get_queryset(self):
-        return Club.objects.select_related('creator').prefetch_related(
-            Prefetch(
-                'posts',
-                queryset=Post.objects.select_related('author').filter(
-                    is_published=True
-                ).order_by('-created_at')
+    paginate_posts_by = 10
+    page_cache_params = {'news_page': canonical_page, 'blog_page': canonical_page}
+
+    def get_surrogate_keys(self):
+        return [f'club:{self.object.pk}']
+
+    def get_validator_parts(self):
+        # The club row (its counters cover post and member removals), its
+        # newest post change and the viewer's own membership.
+        user = self.request.user
+        return Club.objects.filter(slug=self.kwargs['slug']).annotate(
+            last_post_change=Subquery(
+                Post.objects.filter(club=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]
             ),
-            Prefetch(
-                'membership_set',
-                queryset=Membership.objects.select_related('user').filter(
-                    status='APPROVED'
-                )
-            )
-        )
+            membership_change=Subquery(
+                Membership.objects.filter(club=OuterRef('pk'), user=user.pk)
+                .order_by('-updated_at').values('updated_at')[:1]
+            ),
+        ).values_list('updated_at', 'last_post_change', 'membership_change').first()
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        club = self.object
+    def get_queryset(self):
+        return Club.objects.select_related('creator')
 
-        posts = list(club.posts.all())
-        news_posts = [p for p in posts if p.type == 'NEWS']
-        blog_posts = [p for p in posts if p.type == 'BLOG']
+    def get_page_number(self, page_kwarg):
+        try:
+            return max(int(self.request.GET.get(page_kwarg, 1)), 1)
+        except ValueError:
+            return 1
 
-        news_page = self.request.GET.get('news_page', 1)
-        blog_page = self.request.GET.get('blog_page', 1)
+    def paginate_posts(self, queryset, page_number):
+        queryset = queryset.filter(club=self.object).select_related('author').defer('body').order_by('-created_at')
+        paginator = Paginator(queryset, self.paginate_posts_by)
+        return paginator.get_page(page_number)
 
-        news_paginator = Paginator(news_posts, 10)
-        blog_paginator = Paginator(blog_posts, 10)
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        club = self.object
 
-        context['news_posts'] = news_paginator.get_page(news_page)
-        context['blog_posts'] = blog_paginator.get_page(blog_page)
+        # Lazy so that cached post-list fragments skip the COUNT and LIMIT queries.
+        news_page = context['news_page_number'] = self.get_page_number('news_page')
+        blog_page = context['blog_page_number'] = self.get_page_number('blog_page')
+        context['news_posts'] = SimpleLazyObject(lambda: self.paginate_posts(Post.objects.news(), news_page))
+        context['blog_posts'] = SimpleLazyObject(lambda: self.paginate_posts(Post.objects.blogs(), blog_page))
 
         if self.request.user.is_authenticated:
-            context['user_membership'] = next(
-                (m for m in club.membership_set.all() if m.user == self.request.user),
-                None
-            )
+            context['user_membership'] = get_membership_resolver(self.request.user).membership(club)
         else:
             context['user_membership'] = None
 
         return context
 
 
+class AsyncClubDetailView(ClubDetailView):
+    # Same page as ClubDetailView, with the independent reads issued at once:
+    # the club and the visitor's memberships first, then whichever post pages
+    # are not already in the fragment cache.
+    async def get(self, request, *args, **kwargs):
+        user = await load_user(request)
+        self.object, _ = await gather_queries(self.get_object, partial(load_memberships, user))
+        context = self.get_context_data(object=self.object)
+
+        missing = await sync_to_async(self.uncached_post_pages)(context)
+        pages = await gather_queries(*(
+            partial(self.load_posts, queryset, number) for _, queryset, number in missing
+        ))
+        for (name, _, _), page in zip(missing, pages):
+            context[name] = page
+        return self.render_to_response(context)
+
+    def uncached_post_pages(self, context):
+        sections = (
+            ('news_posts', 'club_news', Post.objects.news(), context['news_page_number']),
+            ('blog_posts', 'club_blogs', Post.objects.blogs(), context['blog_page_number']),
+        )
+        return [
+            (name, queryset, number)
+            for name, fragment_name, queryset, number in sections
+            if fragment_cache_key(fragment_name, self.object, [number]) not in cache
+        ]
+
+    def load_posts(self, queryset, page_number):
+        page = self.paginate_posts(queryset, page_number)
+        page.object_list = list(page.object_list)
+        return page
+
+
 class ClubCreateView(LoginRequiredMixin, CreateView):
     model = Club
     form_class = ClubForm
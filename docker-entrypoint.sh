@@ -20,16 +20,19 @@ if ! pg_isready -h "${DB_HOST:-localhost}" -p "${DB_PORT:-5432}" -U "${DB_USER:-
     exit 1
 fi
 
-echo "Running database migrations..."
-python3 manage.py migrate --noinput
+# The web container migrates and collects static files; others (the task
+# worker) set RUN_SETUP=false and skip it.
+if [ "${RUN_SETUP:-true}" = "true" ]; then
+    echo "Running database migrations..."
+    python3 manage.py migrate --noinput
 
-echo "Collecting static files..."
-mkdir -p /app/staticfiles
-python3 manage.py collectstatic --noinput --clear || true
+    echo "Collecting static files..."
+    mkdir -p /app/staticfiles
+    python3 manage.py collectstatic --noinput --clear || true
 
-if [ -n "$DJANGO_SUPERUSER_USERNAME" ] && [ -n "$DJANGO_SUPERUSER_PASSWORD" ]; then
-    echo "Checking/creating superuser account..."
-    python3 manage.py shell <<EOF
+    if [ -n "$DJANGO_SUPERUSER_USERNAME" ] && [ -n "$DJANGO_SUPERUSER_PASSWORD" ]; then
+        echo "Checking/creating superuser account..."
+        python3 manage.py shell <<EOF
 from django.contrib.auth import get_user_model
 User = get_user_model()
 username = '$DJANGO_SUPERUSER_USERNAME'
@@ -43,6 +46,14 @@ if not User.objects.filter(username=username).exists():
 else:
     print(f'✓ Superuser "{username}" already exists.')
 EOF
+    fi
+fi
+
+# Each process keeps its metrics in files here; an earlier run's would be
+# added to this one's.
+if [ -n "$METRICS_MULTIPROC_DIR" ]; then
+    rm -rf "$METRICS_MULTIPROC_DIR"
+    mkdir -p "$METRICS_MULTIPROC_DIR"
 fi
 
 echo "========================================"
@@ -0,0 +1,15 @@
+from django.contrib import admin
+from feeds.models import FeedEntry, LargeClub
+
+
+@admin.register(FeedEntry)
+class FeedEntryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'post', 'club', 'created_at']
+    list_select_related = ['user', 'post', 'club']
+    raw_id_fields = ['user', 'post', 'club']
+
+
+@admin.register(LargeClub)
+class LargeClubAdmin(admin.ModelAdmin):
+    list_display = ['club', 'created_at']
+    raw_id_fields = ['club']
@@ -0,0 +1,84 @@
+from django.conf import settings
+from clubs.models import Club
+from feeds.models import FeedEntry, LargeClub
+from memberships.models import Membership
+from posts.models import Post
+from tasks.queue import task
+
+
+def is_large_club(club_id):
+    return LargeClub.objects.filter(club_id=club_id).exists()
+
+
+def mark_large_club(club_id):
+    LargeClub.objects.get_or_create(club_id=club_id)
+    # Its posts are now merged in at read time; the fanned-out copies are dead.
+    FeedEntry.objects.filter(club_id=club_id).delete()
+
+
+def _insert(entries):
+    batch_size = settings.FEED_FANOUT_BATCH_SIZE
+    for start in range(0, len(entries), batch_size):
+        FeedEntry.objects.bulk_create(entries[start:start + batch_size], ignore_conflicts=True)
+
+
+@task
+def fan_out_post(post_id):
+    post = Post.objects.published().filter(pk=post_id).values('club_id', 'created_at').first()
+    if post is None or is_large_club(post['club_id']):
+        return 0
+    club_id = post['club_id']
+    members = Club.objects.filter(pk=club_id).values_list('approved_member_count', flat=True).first() or 0
+    if members >= settings.FEED_FANOUT_LIMIT:
+        mark_large_club(club_id)
+        return 0
+
+    user_ids = Membership.objects.approved().for_club(club_id).values_list('user_id', flat=True).distinct()
+    entries = [
+        FeedEntry(user_id=user_id, post_id=post_id, club_id=club_id, created_at=post['created_at'])
+        for user_id in user_ids
+    ]
+    _insert(entries)
+    return len(entries)
+
+
+@task
+def retract_post(post_id):
+    # The post may have been republished while the task waited.
+    if Post.objects.published().filter(pk=post_id).exists():
+        return 0
+    count, _ = FeedEntry.objects.filter(post_id=post_id).delete()
+    return count
+
+
+@task
+def backfill_members(club_id, user_ids):
+    # Newly approved members start with the club's recent posts in their feed.
+    if not user_ids or is_large_club(club_id):
+        return 0
+    # Queued tasks can run late; skip anyone who has left the club since.
+    user_ids = list(
+        Membership.objects.approved().filter(club_id=club_id, user_id__in=user_ids)
+        .values_list('user_id', flat=True).distinct()
+    )
+    posts = list(
+        Post.objects.published().filter(club_id=club_id)
+        .order_by('-created_at', '-pk')
+        .values_list('pk', 'created_at')[:settings.FEED_BACKFILL_POSTS]
+    )
+    entries = [
+        FeedEntry(user_id=user_id, post_id=post_id, club_id=club_id, created_at=created_at)
+        for user_id in user_ids
+        for post_id, created_at in posts
+    ]
+    _insert(entries)
+    return len(entries)
+
+
+@task
+def prune_member(club_id, user_id):
+    # A user may hold an older approved membership of the same club.
+    if Membership.objects.approved().filter(club_id=club_id, user_id=user_id).exists():
+        return 0
+    count, _ = FeedEntry.objects.filter(user_id=user_id, club_id=club_id).delete()
+    return count
@@ -0,0 +1,78 @@
+import heapq
+
+from django.db.models import Q
+from clubs.pagination import CursorPage, InvalidCursor, decode_cursor
+from feeds.models import FeedEntry, LargeClub
+from memberships.resolver import get_membership_resolver
+from posts.models import Post
+
+
+def _seek(queryset, position, created_field, pk_field):
+    # Keyset condition on (created_at, post id), newest first, or oldest first
+    # when walking back from a previous-page cursor.
+    if position is None:
+        return queryset.order_by(f'-{created_field}', f'-{pk_field}')
+    created_at, pk, backwards = position
+    if backwards:
+        return queryset.filter(**{f'{created_field}__gte': created_at}).filter(
+            Q(**{f'{created_field}__gt': created_at}) | Q(**{created_field: created_at, f'{pk_field}__gt': pk})
+        ).order_by(created_field, pk_field)
+    return queryset.filter(**{f'{created_field}__lte': created_at}).filter(
+        Q(**{f'{created_field}__lt': created_at}) | Q(**{created_field: created_at, f'{pk_field}__lt': pk})
+    ).order_by(f'-{created_field}', f'-{pk_field}')
+
+
+class FeedPaginator:
+    # Pages of Post objects from the user's clubs. Fanned-out posts come from
+    # one range scan of the user's FeedEntry rows; posts of large clubs are read
+    # from the posts table and merged in by (created_at, pk).
+    def __init__(self, user, per_page):
+        self.user = user
+        self.per_page = int(per_page)
+
+    def large_club_ids(self):
+        resolver = get_membership_resolver(self.user)
+        club_ids = [
+            club_id for club_id, membership in resolver.memberships.items()
+            if membership.status == 'APPROVED'
+        ]
+        if not club_ids:
+            return []
+        return list(LargeClub.objects.filter(club_id__in=club_ids).values_list('club_id', flat=True))
+
+    def fetch(self, position, limit, large_club_ids):
+        entries = FeedEntry.objects.filter(user=self.user).select_related(
+            'post__club', 'post__author'
+        ).defer('post__body')
+        if large_club_ids:
+            entries = entries.exclude(club_id__in=large_club_ids)
+        sources = [[entry.post for entry in _seek(entries, position, 'created_at', 'post_id')[:limit]]]
+        if large_club_ids:
+            posts = Post.objects.published().filter(club_id__in=large_club_ids).select_related(
+                'club', 'author'
+            ).defer('body')
+            sources.append(list(_seek(posts, position, 'created_at', 'pk')[:limit]))
+        backwards = position is not None and position[2]
+        merged = heapq.merge(*sources, key=lambda post: (post.created_at, post.pk), reverse=not backwards)
+        return [post for post, _ in zip(merged, range(limit))]
+
+    def get_page(self, cursor=None):
+        position = None
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+            except InvalidCursor:
+                position = None
+
+        large_club_ids = self.large_club_ids()
+        rows = self.fetch(position, self.per_page + 1, large_club_ids)
+        if position is None or not position[2]:
+            has_next = len(rows) > self.per_page
+            return CursorPage(rows[:self.per_page], self, has_next=has_next, has_previous=position is not None)
+
+        if len(rows) <= self.per_page:
+            # Walked back to the start; show a full first page instead of a short one.
+            return self.get_page(None)
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return CursorPage(rows, self, has_next=True, has_previous=True)
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from clubs.models import Club
+from feeds import fanout
+from feeds.models import FeedEntry, LargeClub
+from memberships.models import Membership
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the materialized home feeds from memberships and posts: every approved '
+        'member gets the club\'s recent posts, and clubs past FEED_FANOUT_LIMIT members '
+        'are switched to read-time merging. Run after deploying feeds or bulk imports.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Clubs per batch.')
+        parser.add_argument('--club', type=int, action='append', dest='club_ids',
+                            help='Only rebuild the given club id (repeatable).')
+
+    def handle(self, *args, batch_size, club_ids, **options):
+        queryset = Club.objects.order_by('pk').only('pk', 'approved_member_count')
+        if club_ids:
+            queryset = queryset.filter(pk__in=club_ids)
+        large = set(LargeClub.objects.values_list('club_id', flat=True))
+
+        clubs = entries = merged = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for club in batch:
+                clubs += 1
+                if club.pk in large or club.approved_member_count >= settings.FEED_FANOUT_LIMIT:
+                    fanout.mark_large_club(club.pk)
+                    merged += 1
+                    continue
+                user_ids = list(
+                    Membership.objects.approved().for_club(club).values_list('user_id', flat=True).distinct()
+                )
+                with transaction.atomic():
+                    FeedEntry.objects.filter(club_id=club.pk).delete()
+                    entries += fanout.backfill_members(club.pk, user_ids)
+
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Rebuilt clubs up to id {last_pk}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt feeds for {clubs} club(s): {entries} entries written, '
+            f'{merged} large club(s) merged at read time.'
+        ))
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db import models
+
+
+class FeedEntry(models.Model):
+    # One row per (reader, post): the materialized "posts from my clubs" list.
+    # created_at is copied from the post so a page is one range scan on the
+    # (user, -created_at, -post) index.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    post = models.ForeignKey(
+        'posts.Post',
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    club = models.ForeignKey(
+        'clubs.Club',
+        on_delete=models.CASCADE,
+        related_name='feed_entries'
+    )
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'], name='unique_feed_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-post']),
+            models.Index(fields=['user', 'club']),
+        ]
+        verbose_name = 'Feed Entry'
+        verbose_name_plural = 'Feed Entries'
+
+    def __str__(self):
+        return f"{self.user} - {self.post_id}"
+
+
+class LargeClub(models.Model):
+    # Clubs past FEED_FANOUT_LIMIT members are not fanned out; their posts are
+    # merged into each reader's feed at read time instead. A club stays here
+    # once added, so its posts never need moving between the two paths.
+    club = models.OneToOneField(
+        'clubs.Club',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='large_club'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Large Club'
+        verbose_name_plural = 'Large Clubs'
+
+    def __str__(self):
+        return str(self.club_id)
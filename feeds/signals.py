@@ -0,0 +1,37 @@
+from django.dispatch import receiver
+from clubs.signals import tracked_state_changed
+from feeds import fanout
+from memberships.models import Membership
+from posts.models import Post
+
+
+def _active_club(state, active_value):
+    if state is None:
+        return None
+    club_id, value = state
+    return club_id if value == active_value else None
+
+
+@receiver(tracked_state_changed, sender=Post)
+def update_feeds_for_post(sender, instance, old_state, new_state, **kwargs):
+    old_club = _active_club(old_state, True)
+    new_club = _active_club(new_state, True)
+    if old_club == new_club:
+        return
+    # Queued in the saving transaction, so a rolled-back post is never fanned out.
+    if old_club and new_state is not None:
+        fanout.retract_post.enqueue(instance.pk)
+    if new_club:
+        fanout.fan_out_post.enqueue(instance.pk)
+
+
+@receiver(tracked_state_changed, sender=Membership)
+def update_feeds_for_membership(sender, instance, old_state, new_state, **kwargs):
+    old_club = _active_club(old_state, 'APPROVED')
+    new_club = _active_club(new_state, 'APPROVED')
+    if old_club == new_club:
+        return
+    if old_club:
+        fanout.prune_member.enqueue(old_club, instance.user_id)
+    if new_club:
+        fanout.backfill_members.enqueue(new_club, [instance.user_id])
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from benchmarks.testing import QueryBudgetMixin
+from clubs.models import Club
+from feeds import urls as feed_urls
+from feeds.feed import FeedPaginator
+from feeds.models import FeedEntry, LargeClub
+from memberships.models import Membership
+from posts.models import Post
+from tasks.worker import run_tasks
+
+
+User = get_user_model()
+
+
+class FeedTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.reader = User.objects.create_user('reader')
+        cls.chess = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        cls.film = Club.objects.create(name='Film Club', description='Screenings', creator=cls.admin)
+        for club in (cls.chess, cls.film):
+            Membership.objects.create(user=cls.reader, club=club, status='APPROVED')
+
+    def publish(self, club, title):
+        post = Post.objects.create(title=title, body='Body', club=club, author=self.admin)
+        run_tasks()
+        return post
+
+    def feed(self, user, per_page=20, cursor=None):
+        return FeedPaginator(User.objects.get(pk=user.pk), per_page).get_page(cursor)
+
+    def test_every_url_has_a_budget(self):
+        self.assertBudgetsDeclared(feed_urls)
+
+    def test_feed_view(self):
+        for i in range(5):
+            self.publish(self.chess if i % 2 else self.film, f'Post {i}')
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('feeds:home'))
+        self.assertContains(response, 'Post 4')
+        self.assertQueriesOk(response)
+
+    def test_publish_fans_out_and_leaving_prunes(self):
+        post = self.publish(self.chess, 'Opening night')
+        self.assertEqual(set(FeedEntry.objects.filter(post=post).values_list('user', flat=True)),
+                         {self.admin.pk, self.reader.pk})
+
+        membership = Membership.objects.get(user=self.reader, club=self.chess)
+        membership.status = 'REJECTED'
+        membership.save()
+        run_tasks()
+        self.assertFalse(FeedEntry.objects.filter(user=self.reader).exists())
+
+        membership.status = 'APPROVED'
+        membership.save()
+        run_tasks()
+        self.assertEqual([p.title for p in self.feed(self.reader)], ['Opening night'])
+
+    def test_pages_are_newest_first_across_clubs(self):
+        titles = [self.publish(self.chess if i % 2 else self.film, f'Post {i}').title for i in range(7)]
+        first = self.feed(self.reader, per_page=3)
+        second = self.feed(self.reader, per_page=3, cursor=first.next_cursor)
+        self.assertEqual([p.title for p in first] + [p.title for p in second], titles[::-1][:6])
+        back = self.feed(self.reader, per_page=3, cursor=second.previous_cursor)
+        self.assertEqual([p.title for p in back], [p.title for p in first])
+
+    @override_settings(FEED_FANOUT_LIMIT=3)
+    def test_large_clubs_are_merged_at_read_time(self):
+        self.publish(self.film, 'Small club post')
+        Membership.objects.create(user=User.objects.create_user('third'), club=self.chess, status='APPROVED')
+        self.publish(self.chess, 'Large club post')
+        self.assertEqual(list(LargeClub.objects.values_list('club', flat=True)), [self.chess.pk])
+        self.assertFalse(FeedEntry.objects.filter(club=self.chess).exists())
+        self.assertEqual([p.title for p in self.feed(self.reader)], ['Large club post', 'Small club post'])
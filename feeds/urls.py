@@ -0,0 +1,13 @@
+from django.urls import path
+from feeds.views import FeedView
+
+
+app_name = 'feeds'
+
+urlpatterns = [
+    path('', FeedView.as_view(), name='home'),
+]
+
+query_budgets = {
+    'home': 7,
+}
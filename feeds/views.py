@@ -0,0 +1,17 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.views.generic import TemplateView
+from clubs.mixins import ReplicaReadMixin
+from feeds.feed import FeedPaginator
+
+
+class FeedView(ReplicaReadMixin, LoginRequiredMixin, TemplateView):
+    template_name = 'feeds/feed.html'
+    paginate_by = 20
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = FeedPaginator(self.request.user, self.paginate_by).get_page(self.request.GET.get('cursor'))
+        context['page_obj'] = page
+        context['posts'] = page.object_list
+        context['is_paginated'] = page.has_other_pages()
+        return context
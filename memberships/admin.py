@@ -1,11 +1,14 @@
 from django.contrib import admin
+from clubhub.admin import LargeTableAdmin, SelectedRelatedListFilter
 from memberships.models import Membership
 
 
 @admin.register(Membership)
-class MembershipAdmin(admin.ModelAdmin):
+class MembershipAdmin(LargeTableAdmin):
     list_display = ['user', 'club', 'role', 'status', 'created_at']
-    list_filter = ['role', 'status', 'created_at']
+    list_select_related = ['user', 'club']
+    list_filter = ['role', 'status', 'created_at', ('club', SelectedRelatedListFilter)]
     search_fields = ['user__username', 'club__name']
     list_editable = ['role', 'status']
-    readonly_fields = ['created_at', 'updated_at']
\ No newline at end of file
+    autocomplete_fields = ['user', 'club']
+    readonly_fields = ['created_at', 'updated_at']
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 20:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0002_club_counters'),
+        ('memberships', '0002_membership_memberships_created_0b9d06_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['club', 'status', '-created_at'], name='memberships_club_id_6de84f_idx'),
+        ),
+    ]
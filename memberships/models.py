@@ -76,6 +76,8 @@ class Membership(models.Model):
         indexes = [
             models.Index(fields=['user', 'club']),
             models.Index(fields=['club', 'status']),
+            models.Index(fields=['club', 'status', '-created_at']),
+            models.Index(fields=['club', '-updated_at']),
             models.Index(fields=['status']),
             models.Index(fields=['-created_at']),
         ]
@@ -91,6 +93,11 @@ class Membership(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.club.name} ({self.get_role_display()})"
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        # Make clubs.signals reload the tracked state on the next save.
+        self._counter_state = None
     
     @property
     def is_admin(self):
@@ -0,0 +1,53 @@
+from memberships.models import Membership
+
+
+class MembershipResolver:
+    def __init__(self, user):
+        self.user = user
+        self._memberships = None
+
+    @property
+    def memberships(self):
+        if self._memberships is None:
+            self._memberships = {}
+            if self.user.is_authenticated:
+                # Oldest first, so the most recent membership of a club wins.
+                queryset = Membership.objects.for_user(self.user).order_by('created_at', 'pk')
+                for membership in queryset:
+                    self._memberships[membership.club_id] = membership
+        return self._memberships
+
+    def clear(self):
+        self._memberships = None
+
+    def membership(self, club):
+        club_id = getattr(club, 'pk', club)
+        return self.memberships.get(club_id)
+
+    def approved_membership(self, club):
+        membership = self.membership(club)
+        if membership and membership.status == 'APPROVED':
+            return membership
+        return None
+
+    def role(self, club):
+        membership = self.approved_membership(club)
+        return membership.role if membership else None
+
+    def has_role(self, club, roles):
+        return self.role(club) in roles
+
+
+def get_membership_resolver(user):
+    # Cached on the request.user instance so mixins, views and template tags
+    # rendering the same request share one memberships query.
+    resolver = getattr(user, '_membership_resolver', None)
+    if resolver is None:
+        resolver = MembershipResolver(user)
+        user._membership_resolver = resolver
+    return resolver
+
+
+def load_memberships(user):
+    # Fills the resolver up front, e.g. from a clubhub.aio worker thread.
+    return get_membership_resolver(user).memberships
@@ -1 +1,120 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from benchmarks.testing import QueryBudgetMixin
+from clubs.models import Club
+from memberships.models import Membership
+from memberships.views import RejectMembershipView
+from notifications.models import Notification
+from tasks.models import Task
+from tasks.worker import run_tasks
+
+
+User = get_user_model()
+
+
+class MembershipAdminTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('root', password='pass')
+        clubs = [Club.objects.create(name=f'Club {i}', description='Desc', creator=cls.superuser) for i in range(3)]
+        for i in range(12):
+            Membership.objects.create(user=User.objects.create_user(f'member{i}'), club=clubs[i % 3])
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def test_changelist(self):
+        response = self.client.get(reverse('admin:memberships_membership_changelist'))
+        self.assertContains(response, 'member11')
+        self.assertQueriesOk(response, budget=6)
+
+
+class BulkMembershipActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        cls.pending = [
+            Membership.objects.create(user=User.objects.create_user(f'pending{i}'), club=cls.club)
+            for i in range(3)
+        ]
+        cls.approved = Membership.objects.create(
+            user=User.objects.create_user('approved'), club=cls.club, status='APPROVED',
+        )
+        cls.rejected = Membership.objects.create(
+            user=User.objects.create_user('rejected'), club=cls.club, status='REJECTED',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        run_tasks()
+
+    def bulk(self, action, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('clubs:bulk_membership', kwargs={'pk': self.club.pk}), {'action': action, **data}
+            )
+        self.assertEqual(response.status_code, 302)
+        run_tasks()
+
+    def test_approve_all_changes_only_pending_rows(self):
+        self.bulk('approve', scope='all')
+        statuses = dict(Membership.objects.for_club(self.club).values_list('user__username', 'status'))
+        self.assertEqual(statuses, {
+            'admin': 'APPROVED', 'approved': 'APPROVED', 'rejected': 'REJECTED',
+            'pending0': 'APPROVED', 'pending1': 'APPROVED', 'pending2': 'APPROVED',
+        })
+        self.club.refresh_from_db()
+        self.assertEqual((self.club.approved_member_count, self.club.pending_request_count), (5, 0))
+
+        notified = Notification.objects.filter(kind='APPROVED').values_list('recipient_id', flat=True)
+        self.assertEqual(sorted(notified), sorted(membership.user_id for membership in self.pending))
+
+    def test_selected_rows_that_are_not_pending_are_skipped(self):
+        selected = [self.pending[0], self.approved, self.rejected]
+        self.bulk('reject', memberships=[membership.pk for membership in selected])
+        statuses = Membership.objects.filter(pk__in=[membership.pk for membership in selected]).order_by('pk')
+        self.assertEqual(list(statuses.values_list('status', flat=True)), ['REJECTED', 'APPROVED', 'REJECTED'])
+        self.club.refresh_from_db()
+        self.assertEqual((self.club.approved_member_count, self.club.pending_request_count), (2, 2))
+        self.assertEqual(
+            list(Notification.objects.filter(kind='REJECTED').values_list('recipient_id', flat=True)),
+            [self.pending[0].user_id],
+        )
+
+        # Nothing left to change the second time: no counters, no notifications.
+        self.bulk('reject', memberships=[self.pending[0].pk])
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.pending_request_count, 2)
+        self.assertEqual(Notification.objects.filter(kind='REJECTED').count(), 1)
+
+
+class MembershipDecisionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        cls.membership = Membership.objects.create(user=User.objects.create_user('joiner'), club=cls.club)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        run_tasks()
+
+    def test_concurrent_decisions_apply_once(self):
+        # The second admin loaded the request while it was still pending.
+        stale = Membership.objects.select_related('club', 'user').get(pk=self.membership.pk)
+        self.client.post(reverse('clubs:approve_membership', kwargs={'pk': self.membership.pk}))
+        queued = Task.objects.count()
+        self.assertGreater(queued, 0)
+
+        with mock.patch.object(RejectMembershipView, 'get_membership', return_value=stale):
+            response = self.client.post(reverse('clubs:reject_membership', kwargs={'pk': self.membership.pk}))
+        self.assertEqual(response.status_code, 302)
+        self.membership.refresh_from_db()
+        self.assertEqual(self.membership.status, 'APPROVED')
+        self.club.refresh_from_db()
+        self.assertEqual((self.club.approved_member_count, self.club.pending_request_count), (2, 0))
+        self.assertEqual(Task.objects.count(), queued)
@@ -1,15 +1,27 @@
+import csv
+
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlencode
 from django.utils.decorators import method_decorator
 from django.views.decorators.http import require_http_methods
 from django.views import View
 from django_filters.views import FilterView
+from clubs.cache import bump_club_version
 from clubs.models import Club
-from clubs.mixins import ClubMemberRequiredMixin, ClubAdminRequiredMixin
+from clubs.mixins import ClubMemberRequiredMixin, ClubAdminRequiredMixin, ReplicaReadMixin
+from clubs.pagination import CursorPaginationMixin
+from feeds.fanout import backfill_members
 from memberships.models import Membership
 from memberships.filters import MemberFilter, MembershipRequestFilter
+from notifications.delivery import notify_decision
+from stats.rollup import queue_events
+from tasks.queue import batch
+from transfer.formats import Echo
 
 
 @method_decorator(require_http_methods(['POST']), name='dispatch')
@@ -30,17 +42,20 @@ class JoinClubView(LoginRequiredMixin, View):
             elif existing_membership.status == 'REJECTED':
                 messages.error(request, 'Your previous membership request was rejected.')
         else:
-            Membership.objects.create(
-                user=request.user,
-                club=club,
-                status='PENDING'
-            )
+            # The membership, its counters and the queued stats and
+            # notification tasks commit together.
+            with batch():
+                Membership.objects.create(
+                    user=request.user,
+                    club=club,
+                    status='PENDING'
+                )
             messages.success(request, f'Your request to join "{club.name}" has been submitted!')
 
         return redirect('clubs:detail', slug=club.slug)
 
 
-class MemberListView(LoginRequiredMixin, ClubMemberRequiredMixin, FilterView):
+class MemberListView(ReplicaReadMixin, LoginRequiredMixin, ClubMemberRequiredMixin, CursorPaginationMixin, FilterView):
     model = Membership
     template_name = 'clubs/member_list.html'
     context_object_name = 'members'
@@ -54,15 +69,39 @@ class MemberListView(LoginRequiredMixin, ClubMemberRequiredMixin, FilterView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['club'] = self.get_club()
-        if self.request.user.is_authenticated:
-            context['user_membership'] = self.get_club().membership_set.filter(
-                user=self.request.user,
-                status='APPROVED'
-            ).first()
+        context['user_membership'] = self.get_user_membership()
         return context
 
 
-class MembershipRequestListView(LoginRequiredMixin, ClubAdminRequiredMixin, FilterView):
+def csv_safe(value):
+    # Spreadsheets run cells starting with these as formulas; usernames may
+    # start with + - or @.
+    return f"'{value}" if value[:1] in ('=', '+', '-', '@') else value
+
+
+class MemberExportView(LoginRequiredMixin, ClubAdminRequiredMixin, View):
+    # Streams the CSV while the rows are read, chunk by chunk, so a club of any
+    # size downloads in constant memory.
+    chunk_size = 2000
+
+    def get(self, request, pk):
+        club = self.get_club()
+        rows = Membership.objects.approved().for_club(club).order_by('-created_at', '-pk').values_list(
+            'user__username', 'role', 'created_at'
+        ).iterator(chunk_size=self.chunk_size)
+        writer = csv.writer(Echo())
+
+        def lines():
+            yield writer.writerow(['username', 'role', 'joined'])
+            for username, role, created_at in rows:
+                yield writer.writerow([csv_safe(username), role, created_at.isoformat()])
+
+        response = StreamingHttpResponse(lines(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{club.slug}-members.csv"'
+        return response
+
+
+class MembershipRequestListView(ReplicaReadMixin, LoginRequiredMixin, ClubAdminRequiredMixin, CursorPaginationMixin, FilterView):
     model = Membership
     template_name = 'clubs/membership_requests.html'
     context_object_name = 'requests'
@@ -79,19 +118,38 @@ class MembershipRequestListView(LoginRequiredMixin, ClubAdminRequiredMixin, Filt
         return context
 
 
-@method_decorator(require_http_methods(['POST']), name='dispatch')
-class ApproveMembershipView(LoginRequiredMixin, ClubAdminRequiredMixin, View):
-    def get_club(self):
-        membership = get_object_or_404(Membership, pk=self.kwargs['pk'])
-        return membership.club
+class MembershipObjectMixin:
+    def get_membership(self):
+        if not hasattr(self, '_membership'):
+            self._membership = get_object_or_404(
+                Membership.objects.select_related('club', 'user'),
+                pk=self.kwargs['pk']
+            )
+        return self._membership
+
+    def get_club_object(self):
+        return self.get_membership().club
 
+
+def decide_membership(membership, status):
+    # The row is locked and re-checked, so when two admins decide the same
+    # request at once only one changes the counters and queues the tasks.
+    with batch():
+        pending = Membership.objects.select_for_update().filter(pk=membership.pk, status='PENDING').first()
+        if pending is None:
+            return False
+        pending.status = status
+        pending.save(update_fields=['status', 'updated_at'])
+    return True
+
+
+@method_decorator(require_http_methods(['POST']), name='dispatch')
+class ApproveMembershipView(LoginRequiredMixin, MembershipObjectMixin, ClubAdminRequiredMixin, View):
     def post(self, request, pk):
-        membership = get_object_or_404(Membership, pk=pk)
-        club = membership.club
+        membership = self.get_membership()
+        club = self.get_club()
 
-        if membership.status == 'PENDING':
-            membership.status = 'APPROVED'
-            membership.save()
+        if decide_membership(membership, 'APPROVED'):
             messages.success(request, f'{membership.user.username} has been approved as a member!')
         else:
             messages.warning(request, 'This membership request has already been processed.')
@@ -100,18 +158,12 @@ class ApproveMembershipView(LoginRequiredMixin, ClubAdminRequiredMixin, View):
 
 
 @method_decorator(require_http_methods(['POST']), name='dispatch')
-class RejectMembershipView(LoginRequiredMixin, ClubAdminRequiredMixin, View):
-    def get_club(self):
-        membership = get_object_or_404(Membership, pk=self.kwargs['pk'])
-        return membership.club
-
+class RejectMembershipView(LoginRequiredMixin, MembershipObjectMixin, ClubAdminRequiredMixin, View):
     def post(self, request, pk):
-        membership = get_object_or_404(Membership, pk=pk)
-        club = membership.club
+        membership = self.get_membership()
+        club = self.get_club()
 
-        if membership.status == 'PENDING':
-            membership.status = 'REJECTED'
-            membership.save()
+        if decide_membership(membership, 'REJECTED'):
             messages.success(request, f'{membership.user.username}\'s request has been rejected.')
         else:
             messages.warning(request, 'This membership request has already been processed.')
@@ -120,14 +172,10 @@ class RejectMembershipView(LoginRequiredMixin, ClubAdminRequiredMixin, View):
 
 
 @method_decorator(require_http_methods(['POST']), name='dispatch')
-class PromoteMemberView(LoginRequiredMixin, ClubAdminRequiredMixin, View):
-    def get_club(self):
-        membership = get_object_or_404(Membership, pk=self.kwargs['pk'])
-        return membership.club
-
+class PromoteMemberView(LoginRequiredMixin, MembershipObjectMixin, ClubAdminRequiredMixin, View):
     def post(self, request, pk):
-        membership = get_object_or_404(Membership, pk=pk)
-        club = membership.club
+        membership = self.get_membership()
+        club = self.get_club()
 
         if membership.role == 'ADMIN':
             messages.warning(request, 'Cannot change role of club admin.')
@@ -135,21 +183,17 @@ class PromoteMemberView(LoginRequiredMixin, ClubAdminRequiredMixin, View):
             messages.error(request, 'Can only promote approved members.')
         else:
             membership.role = 'MODERATOR'
-            membership.save()
+            membership.save(update_fields=['role', 'updated_at'])
             messages.success(request, f'{membership.user.username} has been promoted to Moderator!')
 
         return redirect('clubs:members', pk=club.pk)
 
 
 @method_decorator(require_http_methods(['POST']), name='dispatch')
-class DemoteMemberView(LoginRequiredMixin, ClubAdminRequiredMixin, View):
-    def get_club(self):
-        membership = get_object_or_404(Membership, pk=self.kwargs['pk'])
-        return membership.club
-
+class DemoteMemberView(LoginRequiredMixin, MembershipObjectMixin, ClubAdminRequiredMixin, View):
     def post(self, request, pk):
-        membership = get_object_or_404(Membership, pk=pk)
-        club = membership.club
+        membership = self.get_membership()
+        club = self.get_club()
 
         if membership.role == 'ADMIN':
             messages.warning(request, 'Cannot change role of club admin.')
@@ -157,7 +201,116 @@ class DemoteMemberView(LoginRequiredMixin, ClubAdminRequiredMixin, View):
             messages.error(request, 'Can only demote approved members.')
         else:
             membership.role = 'MEMBER'
-            membership.save()
+            membership.save(update_fields=['role', 'updated_at'])
             messages.success(request, f'{membership.user.username} has been demoted to Member.')
 
         return redirect('clubs:members', pk=club.pk)
+
+
+# Ids per UPDATE, within SQLite's bound-parameter limit.
+BULK_UPDATE_BATCH_SIZE = 500
+
+BULK_ACTIONS = {
+    'approve': {
+        'guard': {'status': 'PENDING'},
+        'changes': {'status': 'APPROVED'},
+        'counters': {'approved_member_count': 1, 'pending_request_count': -1},
+        'stats': {'approvals': 1},
+        'notify': True,
+        'filterset_class': MembershipRequestFilter,
+        'redirect': 'clubs:requests',
+        'message': '{count} membership request{plural} approved.',
+    },
+    'reject': {
+        'guard': {'status': 'PENDING'},
+        'changes': {'status': 'REJECTED'},
+        'counters': {'pending_request_count': -1},
+        'stats': {'rejections': 1},
+        'notify': True,
+        'filterset_class': MembershipRequestFilter,
+        'redirect': 'clubs:requests',
+        'message': '{count} membership request{plural} rejected.',
+    },
+    'promote': {
+        'guard': {'status': 'APPROVED', 'role': 'MEMBER'},
+        'changes': {'role': 'MODERATOR'},
+        'counters': {},
+        'stats': {},
+        'notify': False,
+        'filterset_class': MemberFilter,
+        'redirect': 'clubs:members',
+        'message': '{count} member{plural} promoted to Moderator.',
+    },
+    'demote': {
+        'guard': {'status': 'APPROVED', 'role': 'MODERATOR'},
+        'changes': {'role': 'MEMBER'},
+        'counters': {},
+        'stats': {},
+        'notify': False,
+        'filterset_class': MemberFilter,
+        'redirect': 'clubs:members',
+        'message': '{count} moderator{plural} demoted to Member.',
+    },
+}
+
+
+@method_decorator(require_http_methods(['POST']), name='dispatch')
+class BulkMembershipActionView(LoginRequiredMixin, ClubAdminRequiredMixin, View):
+    def post(self, request, pk):
+        club = self.get_club()
+        action = BULK_ACTIONS.get(request.POST.get('action'))
+        if action is None:
+            messages.error(request, 'Unknown bulk action.')
+            return redirect('clubs:members', pk=club.pk)
+
+        filterset_class = action['filterset_class']
+        filter_params = {
+            name: request.POST[name] for name in filterset_class.base_filters if request.POST.get(name)
+        }
+        redirect_url = reverse(action['redirect'], kwargs={'pk': club.pk})
+        if filter_params:
+            redirect_url = f'{redirect_url}?{urlencode(filter_params)}'
+
+        queryset = Membership.objects.for_club(club).filter(**action['guard'])
+        if request.POST.get('scope') == 'all':
+            queryset = filterset_class(filter_params, queryset=queryset).qs
+        else:
+            ids = [value for value in request.POST.getlist('memberships') if value.isdigit()]
+            if not ids:
+                messages.warning(request, 'No memberships were selected.')
+                return redirect(redirect_url)
+            queryset = queryset.filter(pk__in=ids)
+
+        with batch():
+            # Lock the matching rows and update exactly those, so the users
+            # notified and the counter deltas match the rows changed; a separate
+            # SELECT and guarded UPDATE can each see different rows under READ
+            # COMMITTED. Rows already processed simply don't match the guard.
+            rows = list(queryset.select_for_update(of=('self',)).order_by('pk').values_list('pk', 'user_id'))
+            ids = [membership_id for membership_id, _ in rows]
+            count = 0
+            for start in range(0, len(ids), BULK_UPDATE_BATCH_SIZE):
+                count += Membership.objects.filter(pk__in=ids[start:start + BULK_UPDATE_BATCH_SIZE]).update(
+                    updated_at=timezone.now(), **action['changes']
+                )
+            # update() skips the signals that notify the users and backfill new
+            # members' feeds.
+            user_ids = [user_id for _, user_id in rows] if action['notify'] else None
+            Club.objects.bump_counters(
+                club.pk, **{field: delta * count for field, delta in action['counters'].items()}
+            )
+            # Neither counters nor daily stats see update(); add them here.
+            queue_events(club.pk, **{field: delta * count for field, delta in action['stats'].items()})
+            if count:
+                bump_club_version(club.pk)
+            if count and user_ids:
+                status = action['changes']['status']
+                notify_decision.enqueue(club.pk, user_ids, status)
+                if status == 'APPROVED':
+                    backfill_members.enqueue(club.pk, user_ids)
+
+        if count:
+            messages.success(request, action['message'].format(count=count, plural='s' if count != 1 else ''))
+        else:
+            messages.warning(request, 'No matching memberships needed changing.')
+        return redirect(redirect_url)
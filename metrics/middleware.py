@@ -0,0 +1,116 @@
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+from metrics.registry import LATENCY, QUERIES, RESPONSE_SIZE, REQUESTS, SQL_TIME, record_cache
+
+
+# The durations of the current request's SQL statements. A context variable
+# rather than a per-request execute_wrapper(), so the queries clubhub.aio runs
+# on its worker threads (which copy the context) are counted too.
+_request_queries = ContextVar('metrics_request_queries', default=None)
+
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+PAGE_CACHE_RESULTS = {'HIT': True, 'STALE': True, 'MISS': False}
+
+
+def record_query(execute, sql, params, many, context):
+    queries = _request_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.append(time.perf_counter() - start)
+
+
+@lru_cache(maxsize=None)
+def instruments(view, method):
+    # labels() takes a lock and builds a key on every call; the children are
+    # looked up once per URL name and method instead.
+    return LATENCY.labels(view, method), QUERIES.labels(view), SQL_TIME.labels(view), RESPONSE_SIZE.labels(view)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # On every new connection, in every thread. Inserted first because an
+    # execute_wrapper() block pops the last wrapper when it exits, and the
+    # connection may be opened inside one (the query inspector's, tests').
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class MetricsMiddleware:
+    # First in MIDDLEWARE, so page cache hits, static files and the session
+    # and auth queries are measured too.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.static_prefix = '/' + settings.STATIC_URL.lstrip('/')
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        queries = []
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        queries = []
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    def record(self, request, response, elapsed, queries):
+        view = self.view_name(request)
+        method = request.method if request.method in METHODS else 'other'
+        latency, query_count, sql_time, response_size = instruments(view, method)
+        REQUESTS.labels(view, method, str(response.status_code)).inc()
+        latency.observe(elapsed)
+        query_count.observe(len(queries))
+        sql_time.observe(sum(queries))
+        size = self.response_size(response)
+        if size is not None:
+            response_size.observe(size)
+        page_cache_hit = PAGE_CACHE_RESULTS.get(response.get('X-Page-Cache'))
+        if page_cache_hit is not None:
+            record_cache('page', page_cache_hit)
+
+    def view_name(self, request):
+        match = request.resolver_match
+        if match is None:
+            # Static files and page cache hits are answered before the URL is
+            # resolved; the label stays the URL name either way.
+            if request.path_info.startswith(self.static_prefix):
+                return 'static'
+            try:
+                match = resolve(request.path_info, getattr(request, 'urlconf', None))
+            except Resolver404:
+                return 'unmatched'
+        return match.view_name
+
+    def response_size(self, response):
+        # CommonMiddleware has set Content-Length on every non-streaming response.
+        length = response.get('Content-Length')
+        if length is not None:
+            return int(length)
+        return None if response.streaming else len(response.content)
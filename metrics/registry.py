@@ -0,0 +1,48 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+
+# With PROMETHEUS_MULTIPROC_DIR set (settings.METRICS_MULTIPROC_DIR), every
+# process keeps its samples in mmap files in that directory and a scrape sums
+# them, so all gunicorn workers report through whichever one answers.
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+REQUESTS = Counter(
+    'clubhub_http_requests', 'Requests by URL name, method and status.', ['view', 'method', 'status'],
+)
+LATENCY = Histogram(
+    'clubhub_http_request_duration_seconds', 'Time spent in Django per request.', ['view', 'method'],
+    buckets=LATENCY_BUCKETS,
+)
+QUERIES = Histogram(
+    'clubhub_db_queries_per_request', 'SQL statements run per request.', ['view'], buckets=QUERY_BUCKETS,
+)
+SQL_TIME = Histogram(
+    'clubhub_db_duration_seconds', 'Time spent in SQL per request.', ['view'], buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'clubhub_http_response_size_bytes', 'Response body size.', ['view'], buckets=SIZE_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    'clubhub_cache_lookups', 'Lookups in the page, fragment, user and unread count caches.', ['cache', 'result'],
+)
+
+
+def record_cache(name, hit):
+    CACHE_LOOKUPS.labels(name, 'hit' if hit else 'miss').inc()
+
+
+def exposition():
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
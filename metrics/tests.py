@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from benchmarks.testing import QueryBudgetMixin
+from metrics import urls as metrics_urls
+
+
+User = get_user_model()
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('member')
+
+    def test_every_url_has_a_budget(self):
+        self.assertBudgetsDeclared(metrics_urls)
+
+    def test_request_is_recorded_under_its_url_name(self):
+        view = {'view': 'clubs:list'}
+        before = {
+            'requests': sample('clubhub_http_requests_total', **view, method='GET', status='200'),
+            'latency': sample('clubhub_http_request_duration_seconds_count', **view, method='GET'),
+            'queries': sample('clubhub_db_queries_per_request_sum', **view),
+            'bytes': sample('clubhub_http_response_size_bytes_sum', **view),
+        }
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('clubs:list'))
+
+        self.assertEqual(sample('clubhub_http_requests_total', **view, method='GET', status='200'),
+                         before['requests'] + 1)
+        self.assertEqual(sample('clubhub_http_request_duration_seconds_count', **view, method='GET'),
+                         before['latency'] + 1)
+        self.assertEqual(sample('clubhub_db_queries_per_request_sum', **view), before['queries'] + len(queries))
+        self.assertEqual(sample('clubhub_http_response_size_bytes_sum', **view),
+                         before['bytes'] + len(response.content))
+        self.assertGreater(sample('clubhub_db_duration_seconds_sum', **view), 0)
+
+    def test_user_cache_lookups_are_counted(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('clubs:list'))
+        hits = sample('clubhub_cache_lookups_total', cache='user', result='hit')
+        self.client.get(reverse('clubs:list'))
+        self.assertEqual(sample('clubhub_cache_lookups_total', cache='user', result='hit'), hits + 1)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_scrape(self):
+        self.client.get(reverse('clubs:list'))
+        response = self.client.get(reverse('metrics:scrape'), headers={'Authorization': 'Bearer secret'})
+        self.assertEqual(response['Content-Type'].split(';')[0], 'text/plain')
+        self.assertContains(response, 'clubhub_http_requests_total{method="GET",status="200",view="clubs:list"}')
+        self.assertQueriesOk(response)
+
+    def test_unauthenticated_scrape_is_refused(self):
+        url = reverse('metrics:scrape')
+        # No token outside DEBUG: the endpoint does not exist.
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with override_settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get(url).status_code, 401)
+            self.assertEqual(self.client.get(url, headers={'Authorization': 'Bearer wrong'}).status_code, 401)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+from metrics.registry import exposition
+
+
+class MetricsView(View):
+    http_method_names = ['get', 'head']
+
+    def get(self, request):
+        # Without a token the endpoint is only open in development.
+        if not settings.METRICS or not (settings.METRICS_TOKEN or settings.DEBUG):
+            raise Http404
+        if settings.METRICS_TOKEN and not constant_time_compare(
+            request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'
+        ):
+            return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+        body, content_type = exposition()
+        return HttpResponse(body, content_type=content_type)
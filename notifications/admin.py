@@ -0,0 +1,10 @@
+from django.contrib import admin
+from notifications.models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['recipient', 'kind', 'club', 'actor', 'read_at', 'created_at']
+    list_filter = ['kind']
+    list_select_related = ['recipient', 'club', 'actor']
+    raw_id_fields = ['recipient', 'actor', 'club']
@@ -0,0 +1,10 @@
+from django.utils.functional import SimpleLazyObject
+from notifications.counts import get_unread_count
+
+
+def unread_notifications(request):
+    # Lazy, so responses that never render the badge never look it up.
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'unread_notification_count': SimpleLazyObject(lambda: get_unread_count(user))}
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from metrics.registry import record_cache
+from notifications.models import Notification
+
+
+def unread_generation_key(user_id):
+    return f'notifications-unread-generation:{user_id}'
+
+
+def unread_count_key(user_id, generation):
+    return f'notifications-unread:{user_id}:{generation}'
+
+
+def _new_generation():
+    # Time-based, as with club versions: an evicted generation never comes
+    # back as one whose count may still be cached.
+    return time.time_ns()
+
+
+def get_unread_generation(user_id):
+    key = unread_generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_unread_count(user):
+    # Read on every page for the badge, so it comes from the cache; a miss
+    # counts on the partial unread index. The primary is used because
+    # notifications are written by workers, which never pin the reader to it.
+    # The count is stored under the generation read before counting, so one
+    # that lands after an invalidation is never read again.
+    key = unread_count_key(user.pk, get_unread_generation(user.pk))
+    count = cache.get(key)
+    record_cache('unread_count', count is not None)
+    if count is None:
+        count = Notification.objects.using(router.db_for_write(Notification)).for_user(user).unread().count()
+        cache.add(key, count, timeout=settings.NOTIFICATION_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_unread_counts(user_ids):
+    # After the commit, so a miss that reads the new generation counts the
+    # new rows.
+    keys = [unread_generation_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, _new_generation()), timeout=None))
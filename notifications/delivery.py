@@ -0,0 +1,36 @@
+from django.conf import settings
+from memberships.models import Membership
+from notifications.counts import invalidate_unread_counts
+from notifications.models import Notification
+from tasks.queue import task
+
+
+def notify(user_ids, kind, club_id, actor_id=None):
+    # One INSERT per NOTIFICATION_BATCH_SIZE recipients, however many there are.
+    notifications = [
+        Notification(recipient_id=user_id, actor_id=actor_id, club_id=club_id, kind=kind)
+        for user_id in dict.fromkeys(user_ids)
+        if user_id != actor_id
+    ]
+    Notification.objects.bulk_create(notifications, batch_size=settings.NOTIFICATION_BATCH_SIZE)
+    invalidate_unread_counts(notification.recipient_id for notification in notifications)
+    return len(notifications)
+
+
+@task
+def notify_join_request(membership_id):
+    # Only admins can act on requests, so they are the ones told.
+    request = Membership.objects.pending().filter(pk=membership_id).values('club_id', 'user_id').first()
+    if request is None:
+        # Already approved, rejected or withdrawn by the time this ran.
+        return 0
+    admin_ids = Membership.objects.approved().for_club(request['club_id']).filter(role='ADMIN').values_list(
+        'user_id', flat=True
+    )
+    return notify(admin_ids, 'JOIN_REQUEST', request['club_id'], actor_id=request['user_id'])
+
+
+@task
+def notify_decision(club_id, user_ids, status):
+    # status is the membership's new APPROVED or REJECTED status.
+    return notify(user_ids, status, club_id)
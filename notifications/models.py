@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.db import models
+from django.urls import reverse
+
+
+class NotificationQuerySet(models.QuerySet):
+    def for_user(self, user):
+        return self.filter(recipient=user)
+
+    def unread(self):
+        return self.filter(read_at__isnull=True)
+
+
+class Notification(models.Model):
+    KIND_CHOICES = [
+        ('JOIN_REQUEST', 'Join request'),
+        ('APPROVED', 'Membership approved'),
+        ('REJECTED', 'Membership rejected'),
+    ]
+
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    # The user whose action it reports, e.g. the one asking to join.
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    club = models.ForeignKey(
+        'clubs.Club',
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    read_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = NotificationQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at']),
+            # Unread counts and "mark all read" only touch the unread rows.
+            models.Index(
+                fields=['recipient'],
+                condition=models.Q(read_at__isnull=True),
+                name='notifications_unread_idx'
+            ),
+        ]
+        verbose_name = 'Notification'
+        verbose_name_plural = 'Notifications'
+
+    def __str__(self):
+        return f"{self.recipient_id} - {self.get_kind_display()}"
+
+    @property
+    def is_read(self):
+        return self.read_at is not None
+
+    @property
+    def message(self):
+        if self.kind == 'JOIN_REQUEST':
+            return f'{self.actor.username if self.actor else "Someone"} asked to join {self.club.name}.'
+        if self.kind == 'APPROVED':
+            return f'Your request to join {self.club.name} was approved.'
+        return f'Your request to join {self.club.name} was rejected.'
+
+    def get_absolute_url(self):
+        if self.kind == 'JOIN_REQUEST':
+            return reverse('clubs:requests', kwargs={'pk': self.club_id})
+        return reverse('clubs:detail', kwargs={'slug': self.club.slug})
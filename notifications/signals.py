@@ -0,0 +1,17 @@
+from django.dispatch import receiver
+from clubs.signals import tracked_state_changed
+from memberships.models import Membership
+from notifications.delivery import notify_decision, notify_join_request
+
+
+@receiver(tracked_state_changed, sender=Membership)
+def notify_membership_change(sender, instance, old_state, new_state, **kwargs):
+    # Bulk approve/reject use update() and queue their notifications themselves.
+    if new_state is None:
+        return
+    old_status = old_state[1] if old_state else None
+    club_id, status = new_state
+    if status == 'PENDING' and old_status != 'PENDING':
+        notify_join_request.enqueue(instance.pk)
+    elif old_status == 'PENDING' and status in ('APPROVED', 'REJECTED'):
+        notify_decision.enqueue(club_id, [instance.user_id], status)
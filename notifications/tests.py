@@ -0,0 +1,129 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from benchmarks.testing import QueryBudgetMixin
+from clubs.models import Club
+from memberships.models import Membership
+from notifications import urls as notification_urls
+from notifications.counts import get_unread_count, invalidate_unread_counts
+from notifications.models import Notification
+from tasks.worker import run_tasks
+
+
+User = get_user_model()
+
+
+class NotificationTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.joiner = User.objects.create_user('joiner')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+
+    def setUp(self):
+        cache.clear()
+
+    def drain(self):
+        # Unread counts are dropped on commit; run those callbacks too.
+        with self.captureOnCommitCallbacks(execute=True):
+            run_tasks()
+
+    def badge_queries(self, user):
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('clubs:list'))
+        table = connection.ops.quote_name(Notification._meta.db_table)
+        return response, [query for query in queries if table in query['sql']]
+
+    def test_every_url_has_a_budget(self):
+        self.assertBudgetsDeclared(notification_urls)
+
+    def test_join_request_notifies_admins(self):
+        self.client.force_login(self.joiner)
+        self.client.post(reverse('clubs:join', kwargs={'pk': self.club.pk}))
+        self.drain()
+        notification = Notification.objects.get()
+        self.assertEqual((notification.recipient, notification.actor, notification.kind),
+                         (self.admin, self.joiner, 'JOIN_REQUEST'))
+
+        response = self.client.get(reverse('clubs:list'))
+        self.assertNotContains(response, 'asked to join')
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('notifications:inbox'))
+        self.assertContains(response, 'joiner asked to join Chess Club.')
+        self.assertQueriesOk(response)
+
+    def test_badge_count_is_cached_and_invalidated(self):
+        membership = Membership.objects.create(user=self.joiner, club=self.club)
+        self.drain()
+        _, queries = self.badge_queries(self.joiner)
+        self.assertEqual(len(queries), 1)
+        _, queries = self.badge_queries(self.joiner)
+        self.assertEqual(queries, [])
+
+        membership.status = 'APPROVED'
+        membership.save()
+        self.drain()
+        response, queries = self.badge_queries(self.joiner)
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, 'rounded-full">1</span>', html=False)
+
+    def test_count_stored_after_an_invalidation_is_not_read(self):
+        Membership.objects.create(user=self.joiner, club=self.club)
+        self.drain()
+        add = cache.add
+
+        def add_after_mark_all_read(key, value, *args, **kwargs):
+            # The admin reads everything between the count and its store.
+            if key.startswith('notifications-unread:'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    Notification.objects.for_user(self.admin).update(read_at=timezone.now())
+                    invalidate_unread_counts([self.admin.pk])
+            return add(key, value, *args, **kwargs)
+
+        with mock.patch.object(cache, 'add', add_after_mark_all_read):
+            self.assertEqual(get_unread_count(self.admin), 1)
+        self.assertEqual(get_unread_count(self.admin), 0)
+
+    def test_bulk_decisions_notify_every_member(self):
+        users = [User.objects.create_user(f'user{i}') for i in range(3)]
+        memberships = [Membership.objects.create(user=user, club=self.club) for user in users]
+        self.drain()
+        self.client.force_login(self.admin)
+        self.client.post(reverse('clubs:bulk_membership', kwargs={'pk': self.club.pk}), {
+            'action': 'reject', 'memberships': [m.pk for m in memberships[:2]],
+        })
+        self.client.post(reverse('clubs:bulk_membership', kwargs={'pk': self.club.pk}), {
+            'action': 'approve', 'memberships': [memberships[2].pk],
+        })
+        self.drain()
+        self.assertEqual(
+            sorted(Notification.objects.exclude(kind='JOIN_REQUEST').values_list('recipient__username', 'kind')),
+            [('user0', 'REJECTED'), ('user1', 'REJECTED'), ('user2', 'APPROVED')],
+        )
+
+    def test_open_and_mark_all_read(self):
+        for user in [User.objects.create_user(f'user{i}') for i in range(2)]:
+            Membership.objects.create(user=user, club=self.club)
+        self.drain()
+        first, second = Notification.objects.order_by('pk')
+        self.client.force_login(self.admin)
+
+        response = self.client.post(reverse('notifications:open', kwargs={'pk': first.pk}))
+        self.assertRedirects(response, reverse('clubs:requests', kwargs={'pk': self.club.pk}))
+        self.assertQueriesOk(response)
+        self.assertEqual(Notification.objects.unread().count(), 1)
+
+        response = self.client.post(reverse('notifications:read_all'))
+        self.assertQueriesOk(response)
+        self.assertFalse(Notification.objects.unread().exists())
+
+        self.client.force_login(self.joiner)
+        response = self.client.post(reverse('notifications:open', kwargs={'pk': second.pk}))
+        self.assertEqual(response.status_code, 404)
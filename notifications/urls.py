@@ -0,0 +1,17 @@
+from django.urls import path
+from notifications.views import MarkAllReadView, NotificationListView, OpenNotificationView
+
+
+app_name = 'notifications'
+
+urlpatterns = [
+    path('', NotificationListView.as_view(), name='inbox'),
+    path('<int:pk>/open/', OpenNotificationView.as_view(), name='open'),
+    path('read/', MarkAllReadView.as_view(), name='read_all'),
+]
+
+query_budgets = {
+    'inbox': 4,
+    'open': 4,
+    'read_all': 3,
+}
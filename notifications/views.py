@@ -0,0 +1,41 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import get_object_or_404, redirect
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.http import require_http_methods
+from django.views.generic import ListView
+from clubs.pagination import CursorPaginationMixin
+from notifications.counts import invalidate_unread_counts
+from notifications.models import Notification
+
+
+class NotificationListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
+    # Not on the replica: the badge is counted on the primary, and the inbox
+    # should list what it counted.
+    template_name = 'notifications/inbox.html'
+    context_object_name = 'notifications'
+    paginate_by = 20
+
+    def get_queryset(self):
+        return Notification.objects.for_user(self.request.user).select_related('club', 'actor')
+
+
+@method_decorator(require_http_methods(['POST']), name='dispatch')
+class OpenNotificationView(LoginRequiredMixin, View):
+    def post(self, request, pk):
+        notification = get_object_or_404(
+            Notification.objects.for_user(request.user).select_related('club'), pk=pk
+        )
+        if not notification.is_read:
+            Notification.objects.filter(pk=notification.pk).update(read_at=timezone.now())
+            invalidate_unread_counts([request.user.pk])
+        return redirect(notification)
+
+
+@method_decorator(require_http_methods(['POST']), name='dispatch')
+class MarkAllReadView(LoginRequiredMixin, View):
+    def post(self, request):
+        if Notification.objects.for_user(request.user).unread().update(read_at=timezone.now()):
+            invalidate_unread_counts([request.user.pk])
+        return redirect('notifications:inbox')
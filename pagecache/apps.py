@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class PagecacheConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'pagecache'
+
+    def ready(self):
+        import pagecache.signals
@@ -0,0 +1,78 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def surrogate_key_version_key(surrogate_key):
+    return f'page-surrogate:{surrogate_key}'
+
+
+def page_cache_key(host, path, query):
+    digest = hashlib.md5(repr((host, path, query)).encode(), usedforsecurity=False).hexdigest()
+    return f'page:{digest}'
+
+
+def page_lock_key(page_key):
+    return f'{page_key}:lock'
+
+
+def canonical_text(value):
+    # Filters strip their input and ignore empty values.
+    return value.strip() or None
+
+
+def canonical_page(value):
+    # Page numbers as the views read them: anything unparsable, or 1 and
+    # below, is the first page.
+    try:
+        number = int(value)
+    except ValueError:
+        return None
+    return str(number) if number > 1 else None
+
+
+def canonical_query(query_dict, params):
+    # Only the parameters the view reads, last value wins as with
+    # QueryDict.get(), empty and default values dropped, in a fixed order.
+    query = []
+    for name, canonicalize in sorted(params.items()):
+        values = query_dict.getlist(name)
+        value = canonicalize(values[-1]) if values else None
+        if value is not None:
+            query.append((name, value))
+    return tuple(query)
+
+
+def surrogate_key_versions(surrogate_keys, default):
+    # The time each key was last purged. Keys that are not in the cache are
+    # stamped with default.
+    keys = {surrogate_key_version_key(key): key for key in surrogate_keys}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, default, timeout=None)
+        found.update(cache.get_many(missing))
+    return found
+
+
+def is_fresh(entry):
+    # A key that has gone missing may have been purged before it was evicted,
+    # so it is stamped now, which makes every page tagged with it stale.
+    versions = surrogate_key_versions(entry['keys'], default=time.time_ns())
+    return all(version < entry['started'] for version in versions.values())
+
+
+def register_keys(surrogate_keys, started):
+    # Keys seen for the first time were, as far as this page is concerned,
+    # last purged just before it started rendering.
+    surrogate_key_versions(surrogate_keys, default=started - 1)
+
+
+def purge(*surrogate_keys):
+    # Pages tagged with any of the keys are re-rendered on their next request.
+    # After the commit, so that re-render cannot read the old rows.
+    keys = [surrogate_key_version_key(key) for key in surrogate_keys]
+    transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time_ns()), timeout=None))
@@ -0,0 +1,103 @@
+import time
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import parse_http_date_safe
+from pagecache.cache import canonical_query, is_fresh, page_cache_key, page_lock_key, register_keys
+from pagecache.mixins import CachedPageMixin
+
+
+class PageCacheMiddleware(MiddlewareMixin):
+    # Serves CachedPageMixin pages to anonymous GET and HEAD requests from the
+    # cache, ahead of the session and auth middleware, so a hit runs no query.
+    # Entries stay valid until one of their Surrogate-Key tags is purged.
+    # After a purge, one request re-renders the page while the others get the
+    # stale copy; with no copy at all they wait for that render. X-Page-Cache
+    # reports HIT, STALE, MISS or BYPASS.
+    def process_request(self, request):
+        request._page_cache = None
+        if not settings.PAGE_CACHE_TIMEOUT or request.method not in ('GET', 'HEAD'):
+            return None
+        try:
+            view_class = getattr(resolve(request.path_info).func, 'view_class', None)
+        except Resolver404:
+            return None
+        if view_class is None or not issubclass(view_class, CachedPageMixin):
+            return None
+        request._page_cache = {'status': 'BYPASS'}
+        # A session cookie means a signed-in visitor or pending flash messages.
+        if settings.SESSION_COOKIE_NAME in request.COOKIES or CookieStorage.cookie_name in request.COOKIES:
+            return None
+
+        query = canonical_query(request.GET, view_class.page_cache_params)
+        key = page_cache_key(request.get_host(), request.path, query)
+        request._page_cache.update(key=key, started=time.time_ns())
+        entry = cache.get(key)
+        if entry is not None and is_fresh(entry):
+            return self.serve(request, entry, 'HIT')
+
+        if cache.add(page_lock_key(key), True, timeout=settings.PAGE_CACHE_LOCK_TIMEOUT):
+            request._page_cache['status'] = 'MISS'
+            request._page_cache['locked'] = True
+            return None
+        # Another request is rendering this page.
+        if entry is not None:
+            return self.serve(request, entry, 'STALE')
+        deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = cache.get(key)
+            if entry is not None and is_fresh(entry):
+                return self.serve(request, entry, 'HIT')
+        request._page_cache['status'] = 'MISS'
+        return None
+
+    def serve(self, request, entry, status):
+        request._page_cache['status'] = status
+        response = entry['response']
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+            response=response,
+        )
+
+    def process_response(self, request, response):
+        state = getattr(request, '_page_cache', None)
+        if state is None:
+            return response
+        if state.get('locked'):
+            try:
+                if self.can_store(request, response):
+                    surrogate_keys = response['Surrogate-Key'].split()
+                    register_keys(surrogate_keys, state['started'])
+                    timeout = settings.PAGE_CACHE_TIMEOUT
+                    if getattr(request, 'read_from_replica', False):
+                        # A render after a purge may come from a replica that
+                        # has not caught up, so keep it no longer than a
+                        # replica-rendered fragment.
+                        timeout = min(timeout, settings.REPLICA_FRAGMENT_CACHE_TIMEOUT)
+                    cache.set(state['key'], {
+                        'response': response,
+                        'keys': surrogate_keys,
+                        'started': state['started'],
+                    }, timeout=timeout)
+            finally:
+                cache.delete(page_lock_key(state['key']))
+        response.headers['X-Page-Cache'] = state['status']
+        return response
+
+    def can_store(self, request, response):
+        # Nothing that sets a cookie or embeds the visitor's CSRF token.
+        return (
+            request.method == 'GET'
+            and response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+            and 'Surrogate-Key' in response
+        )
@@ -0,0 +1,15 @@
+class CachedPageMixin:
+    # Lets PageCacheMiddleware cache the page for anonymous visitors. The
+    # response is tagged with Surrogate-Key so pagecache.cache.purge() can drop
+    # it. page_cache_params maps each query parameter the view reads to a
+    # function that returns its canonical value, or None when it makes no
+    # difference; all other parameters are left out of the cache key.
+    page_cache_params = {}
+
+    def get_surrogate_keys(self):
+        raise NotImplementedError
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        response.headers['Surrogate-Key'] = ' '.join(self.get_surrogate_keys())
+        return response
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from pagecache.cache import purge
+from posts.models import Post
+
+
+# Club, Membership and Post writes purge club:<id> and club-list through
+# clubs.cache.bump_club_version; a post's own page has its own key.
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_page(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    purge(f'post:{instance.pk}')
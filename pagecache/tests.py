@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from clubs.models import Club
+from pagecache.cache import page_cache_key, page_lock_key
+from posts.models import Post
+
+
+User = get_user_model()
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=600, PAGE_CACHE_LOCK_WAIT=0)
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        cls.post = Post.objects.create(title='Tournament results', body='Body', club=cls.club, author=cls.admin)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_pages_are_cached_and_tagged(self):
+        urls = {
+            reverse('clubs:list'): 'club-list',
+            reverse('clubs:detail', kwargs={'slug': self.club.slug}): f'club:{self.club.pk}',
+            reverse('posts:detail', kwargs={'pk': self.post.pk}): f'post:{self.post.pk} club:{self.club.pk}',
+        }
+        for url, surrogate_keys in urls.items():
+            with self.subTest(url):
+                response = self.client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'MISS')
+                self.assertEqual(response['Surrogate-Key'], surrogate_keys)
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'HIT')
+
+    def test_equivalent_query_strings_share_an_entry(self):
+        list_url = reverse('clubs:list')
+        self.assertEqual(self.client.get(f'{list_url}?name=chess&page=3')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(f'{list_url}?utm_source=x&name=%20chess%20')['X-Page-Cache'], 'HIT')
+        self.assertEqual(self.client.get(f'{list_url}?name=&description=')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(list_url)['X-Page-Cache'], 'HIT')
+
+        detail_url = reverse('clubs:detail', kwargs={'slug': self.club.slug})
+        self.assertEqual(self.client.get(f'{detail_url}?news_page=1&blog_page=x')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(detail_url)['X-Page-Cache'], 'HIT')
+        self.assertEqual(self.client.get(f'{detail_url}?news_page=2')['X-Page-Cache'], 'MISS')
+
+    def test_writes_purge_tagged_pages(self):
+        detail_url = reverse('clubs:detail', kwargs={'slug': self.club.slug})
+        post_url = reverse('posts:detail', kwargs={'pk': self.post.pk})
+        list_url = reverse('clubs:list')
+        for url in (detail_url, post_url, list_url):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title='Opening theory', body='Body', club=self.club, author=self.admin)
+        response = self.client.get(detail_url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Opening theory')
+        self.assertEqual(self.client.get(post_url)['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(list_url)['X-Page-Cache'], 'MISS')
+
+        other = Club.objects.create(name='Film Club', description='Screenings', creator=self.admin)
+        self.client.get(post_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title='Screening', body='Body', club=other, author=self.admin)
+        self.assertEqual(self.client.get(post_url)['X-Page-Cache'], 'HIT')
+
+    def test_one_request_rerenders_after_a_purge(self):
+        url = reverse('clubs:list')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Club.objects.create(name='Film Club', description='Screenings', creator=self.admin)
+        # Another request holds the lock: this one gets the stale copy.
+        cache.add(page_lock_key(page_cache_key('testserver', url, ())), True)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'STALE')
+        self.assertNotContains(response, 'Film Club')
+
+        cache.clear()
+        cache.add(page_lock_key(page_cache_key('testserver', url, ())), True)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Film Club')
+        self.assertIsNone(cache.get(page_cache_key('testserver', url, ())))
+
+    def test_conditional_get_from_cache(self):
+        url = reverse('clubs:detail', kwargs={'slug': self.club.slug})
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['X-Page-Cache']), (304, 'HIT'))
+
+    def test_signed_in_visitors_bypass_the_cache(self):
+        url = reverse('clubs:list')
+        self.client.get(url)
+        self.client.force_login(self.admin)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'BYPASS')
+        self.assertContains(response, 'Create Club')
@@ -1,11 +1,21 @@
 from django.contrib import admin
+from clubhub.admin import LargeTableAdmin, SelectedRelatedListFilter
 from posts.models import Post
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdmin):
     list_display = ['title', 'club', 'author', 'type', 'is_published', 'created_at']
-    list_filter = ['type', 'is_published', 'created_at', 'club']
+    list_select_related = ['club', 'author']
+    list_filter = ['type', 'is_published', 'created_at', ('club', SelectedRelatedListFilter)]
     search_fields = ['title', 'body', 'author__username', 'club__name']
     list_editable = ['is_published']
-    readonly_fields = ['created_at', 'updated_at']
\ No newline at end of file
+    autocomplete_fields = ['club', 'author']
+    readonly_fields = ['created_at', 'updated_at']
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # The change list never shows the body; the change form needs it.
+        if request.resolver_match and request.resolver_match.url_name == 'posts_post_changelist':
+            queryset = queryset.defer('body')
+        return queryset
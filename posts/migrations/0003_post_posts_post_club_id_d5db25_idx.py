@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 20:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0001_initial'),
+        ('posts', '0002_post_posts_post_created_183a3b_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['club', 'type', 'is_published', '-created_at'], name='posts_post_club_id_d5db25_idx'),
+        ),
+    ]
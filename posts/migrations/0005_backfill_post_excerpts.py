@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-18 20:45
+
+from django.db import migrations, transaction
+from django.utils.text import Truncator
+
+
+BATCH_SIZE = 2000
+
+
+def make_excerpt(body):
+    # A frozen copy of posts.models.make_excerpt as of this migration.
+    return Truncator(Truncator(body).words(30, truncate=' …')).chars(300, truncate='…')
+
+
+def backfill_excerpts(apps, schema_editor):
+    # Walks the table by primary key and commits every batch, so large tables
+    # are not locked in one long transaction and an interrupted run resumes
+    # where it stopped.
+    Post = apps.get_model('posts', 'Post')
+    db_alias = schema_editor.connection.alias
+    last_pk = 0
+    while True:
+        batch = list(
+            Post.objects.using(db_alias)
+            .filter(pk__gt=last_pk, excerpt='')
+            .exclude(body='')
+            .only('pk', 'body')
+            .order_by('pk')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for post in batch:
+            post.excerpt = make_excerpt(post.body)
+        with transaction.atomic(using=db_alias):
+            Post.objects.using(db_alias).bulk_update(batch, ['excerpt'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('posts', '0004_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
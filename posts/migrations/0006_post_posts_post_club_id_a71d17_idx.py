@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 20:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0002_club_counters'),
+        ('posts', '0005_backfill_post_excerpts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['club', '-updated_at'], name='posts_post_club_id_a71d17_idx'),
+        ),
+    ]
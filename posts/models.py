@@ -1,6 +1,17 @@
 from django.db import models
 from django.conf import settings
 from django.urls import reverse
+from django.utils.text import Truncator
+
+
+EXCERPT_WORDS = 30
+EXCERPT_MAX_LENGTH = 300
+
+
+def make_excerpt(body):
+    # What list pages used to render with `truncatewords:30`, capped in length
+    # so a single enormous "word" cannot bloat the column.
+    return Truncator(Truncator(body).words(EXCERPT_WORDS, truncate=' …')).chars(EXCERPT_MAX_LENGTH, truncate='…')
 
 
 class PostManager(models.Manager):
@@ -16,7 +27,6 @@ class PostManager(models.Manager):
     def for_club(self, club):
         return self.filter(club=club)
 
-
 class Post(models.Model):
     POST_TYPE_CHOICES = [
         ('BLOG', 'Blog'),
@@ -25,6 +35,8 @@ class Post(models.Model):
 
     title = models.CharField(max_length=200, db_index=True)
     body = models.TextField()
+    # Derived from body on save; list pages show it and defer('body').
+    excerpt = models.CharField(max_length=EXCERPT_MAX_LENGTH, blank=True, editable=False)
     type = models.CharField(
         max_length=4,
         choices=POST_TYPE_CHOICES,
@@ -50,6 +62,8 @@ class Post(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['club', '-created_at']),
+            models.Index(fields=['club', '-updated_at']),
+            models.Index(fields=['club', 'type', 'is_published', '-created_at']),
             models.Index(fields=['type', 'is_published']),
             models.Index(fields=['author']),
             models.Index(fields=['-created_at']),
@@ -60,5 +74,21 @@ class Post(models.Model):
     def __str__(self):
         return f"{self.title} ({self.get_type_display()})"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # A deferred body was not loaded, so it cannot have changed; Django
+        # then saves only the loaded fields.
+        body_changed = update_fields is None or 'body' in update_fields
+        if body_changed and 'body' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.body)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        # Make clubs.signals reload the tracked state on the next save.
+        self._counter_state = None
+
     def get_absolute_url(self):
         return reverse('posts:detail', kwargs={'pk': self.pk})
\ No newline at end of file
@@ -1 +1,105 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from benchmarks.testing import QueryBudgetMixin
+from clubs.models import Club
+from posts import urls as post_urls
+from posts.models import Post
+from tasks.worker import run_tasks
+
+
+User = get_user_model()
+
+
+class PostQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        cls.post = Post.objects.create(title='Opening night', body='Body', club=cls.club, author=cls.admin)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_every_url_has_a_budget(self):
+        self.assertBudgetsDeclared(post_urls)
+
+    def test_post_detail(self):
+        self.assertQueriesOk(self.client.get(reverse('posts:detail', kwargs={'pk': self.post.pk})))
+
+    def test_post_detail_not_modified(self):
+        url = reverse('posts:detail', kwargs={'pk': self.post.pk})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+        self.post.title = 'Opening night, updated'
+        self.post.save()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+    def test_post_create(self):
+        url = reverse('posts:create', kwargs={'club_pk': self.club.pk})
+        self.assertQueriesOk(self.client.get(url))
+        response = self.client.post(url, {'title': 'Results', 'body': 'We won.', 'type': 'NEWS'})
+        self.assertEqual(response.status_code, 302)
+        self.assertQueriesOk(response)
+
+
+class PostExcerptTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+
+    def test_excerpt_follows_body(self):
+        post = Post.objects.create(title='Long', body='word ' * 40, club=self.club, author=self.admin)
+        self.assertEqual(post.excerpt, ' '.join(['word'] * 30) + ' …')
+
+        post.body = 'Rewritten'
+        post.save(update_fields=['body'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Rewritten')
+
+    def test_list_pages_do_not_load_body(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(title='Results', body='Secret body ' * 100, club=self.club, author=self.admin)
+        run_tasks()
+        self.client.force_login(self.admin)
+        column = f'{connection.ops.quote_name("posts_post")}.{connection.ops.quote_name("body")}'
+        for url in (reverse('clubs:detail', kwargs={'slug': self.club.slug}), reverse('feeds:home')):
+            with self.subTest(url), CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertContains(response, 'Secret body')
+            self.assertFalse([query for query in queries if column in query['sql']])
+
+
+class PostAdminTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser('root', password='pass')
+        cls.clubs = [
+            Club.objects.create(name=f'Club {i}', description='Desc', creator=cls.superuser) for i in range(4)
+        ]
+        for i in range(12):
+            Post.objects.create(
+                title=f'Post {i}', body='Body', club=cls.clubs[i % 4], author=User.objects.create_user(f'author{i}')
+            )
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def test_changelist(self):
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertContains(response, 'Post 11')
+        # The club filter does not list every club.
+        self.assertNotContains(response, 'club__id__exact=')
+        self.assertQueriesOk(response, budget=6)
+
+    def test_changelist_filtered_by_club(self):
+        response = self.client.get(reverse('admin:posts_post_changelist'), {'club__id__exact': self.clubs[0].pk})
+        self.assertEqual(response.context['cl'].result_count, 3)
+        self.assertContains(response, f'club__id__exact={self.clubs[0].pk}')
+        self.assertNotContains(response, f'club__id__exact={self.clubs[1].pk}')
+        self.assertQueriesOk(response, budget=7)
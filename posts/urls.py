@@ -1,10 +1,16 @@
+from django.conf import settings
 from django.urls import path
-from posts.views import PostCreateView, PostDetailView
+from posts.views import AsyncPostDetailView, PostCreateView, PostDetailView
 
 
 app_name = 'posts'
 
 urlpatterns = [
     path('clubs/<int:club_pk>/posts/new/', PostCreateView.as_view(), name='create'),
-    path('posts/<int:pk>/', PostDetailView.as_view(), name='detail'),
+    path('posts/<int:pk>/', (AsyncPostDetailView if settings.ASYNC_VIEWS else PostDetailView).as_view(), name='detail'),
 ]
+
+query_budgets = {
+    'create': 14,
+    'detail': 6,
+}
@@ -1,13 +1,18 @@
+from functools import partial
+
 from django.contrib import messages
+from django.db.models import OuterRef, Subquery
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import redirect
 from django.urls import reverse
 from django.views.generic import CreateView, DetailView
-from clubs.models import Club
-from clubs.mixins import ClubMemberRequiredMixin
+from clubhub.aio import gather_queries, load_user
+from clubs.mixins import ClubMemberRequiredMixin, ConditionalGetMixin, ReplicaReadMixin
+from memberships.models import Membership
 from posts.models import Post
 from posts.forms import PostForm
-from memberships.models import Membership
+from memberships.resolver import get_membership_resolver, load_memberships
+from pagecache.mixins import CachedPageMixin
 
 
 class PostCreateView(LoginRequiredMixin, ClubMemberRequiredMixin, CreateView):
@@ -15,16 +20,9 @@ class PostCreateView(LoginRequiredMixin, ClubMemberRequiredMixin, CreateView):
     form_class = PostForm
     template_name = 'posts/post_form.html'
 
-    def get_club(self):
-        return get_object_or_404(Club, pk=self.kwargs['club_pk'])
-
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        club = self.get_club()
-        membership = Membership.objects.approved().for_club(club).filter(
-            user=self.request.user
-        ).first()
-        kwargs['user_role'] = membership.role if membership else None
+        kwargs['user_role'] = self.get_user_role()
         return kwargs
 
     def get_context_data(self, **kwargs):
@@ -34,18 +32,16 @@ class PostCreateView(LoginRequiredMixin, ClubMemberRequiredMixin, CreateView):
 
     def form_valid(self, form):
         club = self.get_club()
-        membership = Membership.objects.approved().for_club(club).filter(
-            user=self.request.user
-        ).first()
+        role = self.get_user_role()
 
-        if not membership:
+        if not role:
             messages.error(self.request, 'You must be a member to create posts.')
             return redirect('clubs:detail', slug=club.slug)
 
         form.instance.club = club
         form.instance.author = self.request.user
 
-        if form.instance.type == 'NEWS' and membership.role not in ['ADMIN', 'MODERATOR']:
+        if form.instance.type == 'NEWS' and role not in ['ADMIN', 'MODERATOR']:
             messages.error(self.request, 'Only admins and moderators can create news posts.')
             return redirect('clubs:detail', slug=club.slug)
 
@@ -56,11 +52,24 @@ class PostCreateView(LoginRequiredMixin, ClubMemberRequiredMixin, CreateView):
         return reverse('clubs:detail', kwargs={'slug': self.get_club().slug})
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ReplicaReadMixin, ConditionalGetMixin, CachedPageMixin, DetailView):
     model = Post
     template_name = 'posts/post_detail.html'
     context_object_name = 'post'
 
+    def get_surrogate_keys(self):
+        # The page also shows the club it was posted in.
+        return [f'post:{self.object.pk}', f'club:{self.object.club_id}']
+
+    def get_validator_parts(self):
+        user = self.request.user
+        return Post.objects.published().filter(pk=self.kwargs['pk']).annotate(
+            membership_change=Subquery(
+                Membership.objects.filter(club=OuterRef('club'), user=user.pk)
+                .order_by('-updated_at').values('updated_at')[:1]
+            ),
+        ).values_list('updated_at', 'club__updated_at', 'membership_change').first()
+
     def get_queryset(self):
         return Post.objects.published().select_related('club', 'author')
 
@@ -68,7 +77,14 @@ class PostDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         context['club'] = self.object.club
         if self.request.user.is_authenticated:
-            context['user_membership'] = Membership.objects.approved().for_club(
-                self.object.club
-            ).filter(user=self.request.user).first()
+            context['user_membership'] = get_membership_resolver(
+                self.request.user
+            ).approved_membership(self.object.club)
         return context
+
+
+class AsyncPostDetailView(PostDetailView):
+    async def get(self, request, *args, **kwargs):
+        user = await load_user(request)
+        self.object, _ = await gather_queries(self.get_object, partial(load_memberships, user))
+        return self.render_to_response(self.get_context_data(object=self.object))
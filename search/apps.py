@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def repair_search_indexes(sender, using, **kwargs):
+    from search.backends import get_search_backend
+    get_search_backend(using).repair()
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'search'
+
+    def ready(self):
+        post_migrate.connect(repair_search_indexes, sender=self)
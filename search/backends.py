@@ -0,0 +1,271 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from clubs.models import Club
+from posts.models import Post
+
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_TOKENS = 8
+
+
+class BaseSearchBackend:
+    def __init__(self, alias=DEFAULT_DB_ALIAS):
+        self.alias = alias
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def install(self):
+        raise NotImplementedError
+
+    def uninstall(self):
+        raise NotImplementedError
+
+    def repair(self):
+        pass
+
+    def search_clubs(self, query):
+        raise NotImplementedError
+
+    def search_posts(self, query):
+        raise NotImplementedError
+
+    def club_queryset(self):
+        return Club.objects.with_member_counts().select_related('creator')
+
+    def post_queryset(self):
+        return Post.objects.published().select_related('club', 'author').defer('body')
+
+    def execute(self, statements):
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    # Weighted tsvector columns generated by Postgres itself, so they never
+    # drift from the row and cost nothing on the Django side.
+    config = 'english'
+    vectors = {
+        Club: ('name', 'description'),
+        Post: ('title', 'body'),
+    }
+    trigram_columns = {
+        Club: ('name',),
+        Post: ('title',),
+    }
+    # Back the existing `icontains` filters (UPPER(col) LIKE '%x%') in ClubFilter.
+    icontains_columns = {
+        Club: ('name', 'description'),
+    }
+
+    def _table(self, model):
+        return self.connection.ops.quote_name(model._meta.db_table)
+
+    def _vector_sql(self, primary, secondary):
+        return (
+            f"setweight(to_tsvector('{self.config}', coalesce({primary}, '')), 'A') || "
+            f"setweight(to_tsvector('{self.config}', coalesce({secondary}, '')), 'B')"
+        )
+
+    def has_trigram(self):
+        if not hasattr(self, '_has_trigram'):
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                self._has_trigram = cursor.fetchone() is not None
+        return self._has_trigram
+
+    def install(self):
+        # Adding a STORED generated column rewrites the table under an ACCESS
+        # EXCLUSIVE lock. The indexes are built CONCURRENTLY, which is only
+        # allowed outside a transaction (see the non-atomic migration).
+        create_index = (
+            'CREATE INDEX IF NOT EXISTS' if self.connection.in_atomic_block
+            else 'CREATE INDEX CONCURRENTLY IF NOT EXISTS'
+        )
+        statements = []
+        for model, (primary, secondary) in self.vectors.items():
+            table = model._meta.db_table
+            statements += [
+                f'ALTER TABLE {self._table(model)} ADD COLUMN IF NOT EXISTS search_vector tsvector '
+                f'GENERATED ALWAYS AS ({self._vector_sql(primary, secondary)}) STORED',
+                f'{create_index} {table}_search_gin ON {self._table(model)} '
+                f'USING gin (search_vector)',
+            ]
+        self.execute(statements)
+
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                return
+        statements = ['CREATE EXTENSION IF NOT EXISTS pg_trgm']
+        for model, columns in self.trigram_columns.items():
+            table = model._meta.db_table
+            statements += [
+                f'{create_index} {table}_{column}_trgm ON {self._table(model)} '
+                f'USING gin ({column} gin_trgm_ops)'
+                for column in columns
+            ]
+        for model, columns in self.icontains_columns.items():
+            table = model._meta.db_table
+            statements += [
+                f'{create_index} {table}_{column}_upper_trgm ON {self._table(model)} '
+                f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+                for column in columns
+            ]
+        self.execute(statements)
+        self._has_trigram = True
+
+    def uninstall(self):
+        statements = []
+        for model, columns in self.trigram_columns.items():
+            statements += [f'DROP INDEX IF EXISTS {model._meta.db_table}_{column}_trgm' for column in columns]
+        for model, columns in self.icontains_columns.items():
+            statements += [f'DROP INDEX IF EXISTS {model._meta.db_table}_{column}_upper_trgm' for column in columns]
+        for model in self.vectors:
+            statements.append(f'ALTER TABLE {self._table(model)} DROP COLUMN IF EXISTS search_vector')
+        self.execute(statements)
+
+    def _search(self, queryset, model, query, trigram_field):
+        from django.contrib.postgres.lookups import SearchVectorExact, TrigramSimilar
+        from django.contrib.postgres.search import (
+            SearchQuery, SearchRank, SearchVectorField, TrigramSimilarity,
+        )
+
+        search_query = SearchQuery(query, config=self.config, search_type='websearch')
+        vector = RawSQL(f'{self._table(model)}.search_vector', [], output_field=SearchVectorField())
+        queryset = queryset.annotate(rank=SearchRank(vector, search_query))
+        condition = SearchVectorExact(vector, search_query)
+
+        if self.has_trigram():
+            queryset = queryset.annotate(similarity=TrigramSimilarity(trigram_field, query))
+            condition = Q(condition) | Q(TrigramSimilar(F(trigram_field), query))
+            score = F('rank') + F('similarity')
+        else:
+            score = F('rank')
+        return queryset.filter(condition).annotate(score=score).order_by('-score', '-created_at')
+
+    def search_clubs(self, query):
+        return self._search(self.club_queryset(), Club, query, 'name')
+
+    def search_posts(self, query):
+        return self._search(self.post_queryset(), Post, query, 'title')
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    # Development fallback: external-content FTS5 tables kept in sync by
+    # triggers, ranked with bm25(). Prefix matching stands in for trigrams.
+    indexes = {
+        Club: ('search_club_fts', ('name', 'description'), (10.0, 1.0)),
+        Post: ('search_post_fts', ('title', 'body'), (10.0, 1.0)),
+    }
+
+    def _trigger_statements(self, model):
+        fts_table, columns, _ = self.indexes[model]
+        table = model._meta.db_table
+        column_list = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        old_values = ', '.join(f'old.{column}' for column in columns)
+        insert = f'INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values});'
+        delete = (
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+            f"VALUES ('delete', old.id, {old_values});"
+        )
+        return [
+            f'CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN {delete} END',
+            f'CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {column_list} ON {table} '
+            f'BEGIN {delete} {insert} END',
+        ]
+
+    def install(self):
+        statements = []
+        for model, (fts_table, columns, _) in self.indexes.items():
+            statements += [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+                f"{', '.join(columns)}, content='{model._meta.db_table}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+                *self._trigger_statements(model),
+                f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+            ]
+        self.execute(statements)
+
+    def uninstall(self):
+        statements = []
+        for fts_table, _, _ in self.indexes.values():
+            statements += [f'DROP TRIGGER IF EXISTS {fts_table}_{suffix}' for suffix in ('ai', 'ad', 'au')]
+            statements.append(f'DROP TABLE IF EXISTS {fts_table}')
+        self.execute(statements)
+
+    def repair(self):
+        # SQLite migrations rebuild tables (and drop their triggers) when
+        # altering columns; put the sync triggers back afterwards.
+        tables = set(self.connection.introspection.table_names())
+        for model, (fts_table, _, _) in self.indexes.items():
+            if fts_table in tables and model._meta.db_table in tables:
+                self.execute(self._trigger_statements(model))
+
+    def match_expression(self, query):
+        tokens = TOKEN_RE.findall(query)[:MAX_TOKENS]
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def _search(self, queryset, model, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        fts_table, _, weights = self.indexes[model]
+        table = self.connection.ops.quote_name(model._meta.db_table)
+        weight_args = ', '.join(str(weight) for weight in weights)
+        matching_ids = RawSQL(f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s', [match])
+        # bm25() is lower-is-better; negate it so every backend sorts by -score.
+        score = RawSQL(
+            f'SELECT -bm25({fts_table}, {weight_args}) FROM {fts_table} '
+            f'WHERE {fts_table} MATCH %s AND rowid = {table}.id',
+            [match],
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matching_ids).annotate(score=score).order_by('-score', '-created_at')
+
+    def search_clubs(self, query):
+        return self._search(self.club_queryset(), Club, query)
+
+    def search_posts(self, query):
+        return self._search(self.post_queryset(), Post, query)
+
+
+class NullSearchBackend(BaseSearchBackend):
+    def install(self):
+        pass
+
+    def uninstall(self):
+        pass
+
+    def search_clubs(self, query):
+        return self.club_queryset().filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        ).annotate(score=Value(0.0)).order_by('-created_at')
+
+    def search_posts(self, query):
+        return self.post_queryset().filter(
+            Q(title__icontains=query) | Q(body__icontains=query)
+        ).annotate(score=Value(0.0)).order_by('-created_at')
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+_backends = {}
+
+
+def get_search_backend(alias=DEFAULT_DB_ALIAS):
+    if alias not in _backends:
+        vendor = connections[alias].vendor
+        _backends[alias] = BACKENDS.get(vendor, NullSearchBackend)(alias)
+    return _backends[alias]
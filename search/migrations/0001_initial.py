@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def install_search_indexes(apps, schema_editor):
+    from search.backends import get_search_backend
+    get_search_backend(schema_editor.connection.alias).install()
+
+
+def uninstall_search_indexes(apps, schema_editor):
+    from search.backends import get_search_backend
+    get_search_backend(schema_editor.connection.alias).uninstall()
+
+
+class Migration(migrations.Migration):
+    # On PostgreSQL the generated search_vector columns rewrite the clubs and
+    # posts tables under an ACCESS EXCLUSIVE lock, blocking reads and writes
+    # for the duration: on a large existing database, apply this in a
+    # maintenance window. The GIN and trigram indexes are then built
+    # CONCURRENTLY, which cannot run inside a transaction.
+    atomic = False
+
+    initial = True
+
+    dependencies = [
+        ('clubs', '0002_club_counters'),
+        ('posts', '0003_post_posts_post_club_id_d5db25_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_indexes, uninstall_search_indexes),
+    ]
@@ -0,0 +1,118 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from benchmarks.testing import QueryBudgetMixin
+from clubs.models import Club
+from posts.models import Post
+from search import urls as search_urls
+from search.apps import repair_search_indexes
+from search.backends import SQLiteSearchBackend, get_search_backend
+
+
+User = get_user_model()
+
+
+class SearchTestData:
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.chess = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+        cls.board = Club.objects.create(name='Board Games', description='Chess, go and more', creator=cls.admin)
+        cls.title_match = Post.objects.create(
+            title='Tournament results', body='Who won', club=cls.chess, author=cls.admin, type='NEWS',
+        )
+        cls.body_match = Post.objects.create(
+            title='Weekly notes', body='Before the tournament', club=cls.chess, author=cls.admin, type='BLOG',
+        )
+        cls.draft = Post.objects.create(
+            title='Tournament draft', body='Unfinished', club=cls.chess, author=cls.admin, is_published=False,
+        )
+
+    def search_posts(self, query):
+        return list(get_search_backend().search_posts(query))
+
+    def search_clubs(self, query):
+        return list(get_search_backend().search_clubs(query))
+
+
+class SearchViewTests(QueryBudgetMixin, SearchTestData, TestCase):
+    def test_every_url_has_a_budget(self):
+        self.assertBudgetsDeclared(search_urls)
+
+    def test_results(self):
+        response = self.client.get(reverse('search:results'), {'q': 'tournament'})
+        self.assertQueriesOk(response)
+        self.assertContains(response, 'Tournament results')
+        self.assertNotContains(response, 'Tournament draft')
+
+    def test_odd_query_syntax(self):
+        for query in ('"', '"chess', 'NEAR(', 'chess NEAR(games', '---', 'OR', '*', 'AND NOT'):
+            with self.subTest(query):
+                self.assertEqual(self.client.get(reverse('search:results'), {'q': query}).status_code, 200)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite FTS5 backend')
+class SQLiteSearchBackendTests(SearchTestData, TestCase):
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(self.search_posts('tournament'), [self.title_match, self.body_match])
+        self.assertEqual(self.search_clubs('chess'), [self.chess, self.board])
+
+    def test_prefix_matching(self):
+        self.assertEqual(self.search_posts('tourn'), [self.title_match, self.body_match])
+
+    def test_hides_unpublished_posts(self):
+        self.assertNotIn(self.draft, self.search_posts('draft'))
+        self.draft.is_published = True
+        self.draft.save()
+        self.assertEqual(self.search_posts('draft'), [self.draft])
+
+    def test_odd_query_syntax(self):
+        self.assertEqual(self.search_posts('"tournament* --- ('), [self.title_match, self.body_match])
+        self.assertEqual(self.search_posts('---'), [])
+
+    def test_triggers_follow_updates_and_deletes(self):
+        self.title_match.title = 'Final standings'
+        self.title_match.save()
+        self.assertEqual(self.search_posts('tournament'), [self.body_match])
+        self.assertEqual(self.search_posts('standings'), [self.title_match])
+        self.body_match.delete()
+        self.assertEqual(self.search_posts('tournament'), [])
+
+    def test_repair_restores_triggers(self):
+        def triggers():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'search_%'")
+                return {name for name, in cursor.fetchall()}
+
+        expected = {
+            f'{fts_table}_{suffix}'
+            for fts_table, _, _ in SQLiteSearchBackend.indexes.values() for suffix in ('ai', 'ad', 'au')
+        }
+        self.assertEqual(triggers(), expected)
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER search_post_fts_au')
+        repair_search_indexes(sender=None, using=connection.alias)
+        self.assertEqual(triggers(), expected)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL full-text backend')
+class PostgresSearchBackendTests(SearchTestData, TestCase):
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(self.search_posts('tournament')[:2], [self.title_match, self.body_match])
+        self.assertEqual(self.search_clubs('chess')[:2], [self.chess, self.board])
+
+    def test_stemming(self):
+        self.assertIn(self.title_match, self.search_posts('tournaments'))
+
+    def test_hides_unpublished_posts(self):
+        self.assertNotIn(self.draft, self.search_posts('draft'))
+
+    def test_vector_follows_updates(self):
+        self.title_match.title = 'Final standings'
+        self.title_match.save()
+        self.assertIn(self.title_match, self.search_posts('standings'))
+        self.body_match.delete()
+        self.assertNotIn(self.body_match, self.search_posts('tournament'))
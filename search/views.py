@@ -0,0 +1,23 @@
+from django.core.paginator import Paginator
+from django.views.generic import TemplateView
+from clubs.mixins import ReplicaReadMixin
+from search.backends import get_search_backend
+
+
+class SearchView(ReplicaReadMixin, TemplateView):
+    template_name = 'search/results.html'
+    paginate_by = 10
+
+    def paginate(self, queryset, page_kwarg):
+        paginator = Paginator(queryset, self.paginate_by)
+        return paginator.get_page(self.request.GET.get(page_kwarg, 1))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()[:200]
+        context['query'] = query
+        if query:
+            backend = get_search_backend()
+            context['clubs'] = self.paginate(backend.search_clubs(query), 'clubs_page')
+            context['posts'] = self.paginate(backend.search_posts(query), 'posts_page')
+        return context
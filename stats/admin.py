@@ -0,0 +1,19 @@
+from django.contrib import admin
+from stats.models import ClubDailyStats, STAT_FIELDS
+
+
+@admin.register(ClubDailyStats)
+class ClubDailyStatsAdmin(admin.ModelAdmin):
+    # Read-only: the rows are maintained by stats.rollup and rollup_stats.
+    list_display = ['club', 'date', *STAT_FIELDS]
+    list_select_related = ['club']
+    list_filter = ['date']
+    date_hierarchy = 'date'
+    search_fields = ['club__name']
+    raw_id_fields = ['club']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
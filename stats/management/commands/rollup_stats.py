@@ -0,0 +1,98 @@
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from clubs.models import Club
+from memberships.models import Membership
+from posts.models import Post
+from stats.models import ClubDailyStats
+from stats.rollup import record_events
+from tasks.models import Task
+from tasks.worker import ACTIVE_STATUSES
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild ClubDailyStats from memberships and posts. New events are counted as they '
+        'happen; run this once to backfill the history from before that, or to repair it. '
+        'Approvals and rejections are dated by the membership\'s last change. Clubs are '
+        'rebuilt a batch at a time, each batch locked against new events, so it is safe to '
+        'run while the task worker is counting them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat,
+                            help='Only rebuild days from this date (YYYY-MM-DD) on.')
+        parser.add_argument('--club', type=int, action='append', dest='club_ids',
+                            help='Only rebuild the given club id (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=100, help='Clubs rebuilt per transaction.')
+
+    def handle(self, *args, since, club_ids, batch_size, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        clubs = Club.objects.order_by('pk')
+        if club_ids:
+            clubs = clubs.filter(pk__in=club_ids)
+        deleted = created = rebuilt = 0
+        last_pk = 0
+        while batch := list(clubs.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size]):
+            last_pk = batch[-1]
+            batch_deleted, batch_created = self.rebuild(batch, since)
+            deleted += batch_deleted
+            created += batch_created
+            rebuilt += len(batch)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Rebuilt clubs up to id {last_pk} ({batch_created} row(s))')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Replaced {deleted} rollup row(s) with {created} for {rebuilt} club(s).'
+        ))
+
+    @transaction.atomic
+    def rebuild(self, club_ids, since):
+        # Every write that produces an event (a membership or post insert, or
+        # the counter bump that comes with a status change) touches the club
+        # row, and stats.rollup.record takes a share lock on it. Holding the
+        # rows for update makes the counts below and the queued events two
+        # separate sets: those committed before are counted here and their
+        # tasks dropped, those after wait and are applied on top.
+        list(Club.objects.filter(pk__in=club_ids).order_by('pk').select_for_update().values_list('pk'))
+        queued = Task.objects.filter(
+            name=record_events.task_name, status__in=ACTIVE_STATUSES, args__0__in=club_ids,
+        ).select_for_update()
+        Task.objects.filter(pk__in=[
+            task.pk for task in queued if not since or date.fromisoformat(task.args[1]) >= since
+        ]).delete()
+
+        # (queryset, the timestamp that dates the event) per counter. The
+        # creator's own admin membership is a join but was never approved.
+        sources = {
+            'joins': (Membership.objects.all(), 'created_at'),
+            'approvals': (Membership.objects.approved().exclude(role='ADMIN'), 'updated_at'),
+            'rejections': (Membership.objects.filter(status='REJECTED'), 'updated_at'),
+            'posts': (Post.objects.published(), 'created_at'),
+        }
+        days = defaultdict(Counter)
+        for field, (queryset, date_field) in sources.items():
+            queryset = queryset.filter(club_id__in=club_ids)
+            if since:
+                queryset = queryset.filter(**{f'{date_field}__date__gte': since})
+            rows = queryset.annotate(day=TruncDate(date_field)).order_by().values('club_id', 'day').annotate(
+                total=Count('pk')
+            )
+            for row in rows:
+                days[row['club_id'], row['day']][field] = row['total']
+
+        stale = ClubDailyStats.objects.filter(club_id__in=club_ids)
+        if since:
+            stale = stale.filter(date__gte=since)
+        deleted, _ = stale.delete()
+        rollups = ClubDailyStats.objects.bulk_create([
+            ClubDailyStats(club_id=club_id, date=day, **counts)
+            for (club_id, day), counts in sorted(days.items())
+        ])
+        return deleted, len(rollups)
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-18 21:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('clubs', '0002_club_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClubDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('joins', models.PositiveIntegerField(default=0)),
+                ('approvals', models.PositiveIntegerField(default=0)),
+                ('rejections', models.PositiveIntegerField(default=0)),
+                ('posts', models.PositiveIntegerField(default=0)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='clubs.club')),
+            ],
+            options={
+                'verbose_name': 'Club Daily Stats',
+                'verbose_name_plural': 'Club Daily Stats',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('club', 'date'), name='unique_club_daily_stats')],
+            },
+        ),
+    ]
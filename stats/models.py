@@ -0,0 +1,30 @@
+from django.db import models
+
+
+STAT_FIELDS = ('joins', 'approvals', 'rejections', 'posts')
+
+
+class ClubDailyStats(models.Model):
+    # Per-club event counts for one day, incremented as the events happen
+    # (stats.rollup.record) so charts never scan memberships or posts.
+    club = models.ForeignKey(
+        'clubs.Club',
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    date = models.DateField()
+    joins = models.PositiveIntegerField(default=0)
+    approvals = models.PositiveIntegerField(default=0)
+    rejections = models.PositiveIntegerField(default=0)
+    posts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['club', 'date'], name='unique_club_daily_stats'),
+        ]
+        verbose_name = 'Club Daily Stats'
+        verbose_name_plural = 'Club Daily Stats'
+
+    def __str__(self):
+        return f"{self.club_id} {self.date}"
@@ -0,0 +1,64 @@
+from datetime import date
+
+from django.db import connections, router
+from django.utils import timezone
+from clubs.models import Club
+from stats.models import ClubDailyStats, STAT_FIELDS
+from tasks.queue import task
+
+
+def record(club_id, day=None, **deltas):
+    # Add to the club's counters for the day in one statement; PostgreSQL and
+    # SQLite share the upsert syntax. Runs inside the caller's transaction.
+    if not any(deltas.values()):
+        return
+    day = day or timezone.localdate()
+    connection = connections[router.db_for_write(ClubDailyStats)]
+    quote = connection.ops.quote_name
+    table = quote(ClubDailyStats._meta.db_table)
+    columns = [quote(field) for field in STAT_FIELDS]
+    increments = ', '.join(f'{column} = {table}.{column} + excluded.{column}' for column in columns)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Waits while rollup_stats rebuilds the club (it holds the row for
+            # update); counter bumps take a weaker lock and are not blocked.
+            clubs = quote(Club._meta.db_table)
+            cursor.execute(f"SELECT 1 FROM {clubs} WHERE {quote('id')} = %s FOR KEY SHARE", [club_id])
+        cursor.execute(
+            f"INSERT INTO {table} ({quote('club_id')}, {quote('date')}, {', '.join(columns)}) "
+            f"VALUES (%s, %s{', %s' * len(columns)}) "
+            f"ON CONFLICT ({quote('club_id')}, {quote('date')}) DO UPDATE SET {increments}",
+            [club_id, day, *(deltas.get(field, 0) for field in STAT_FIELDS)],
+        )
+
+
+@task
+def record_events(club_id, day, **deltas):
+    # Queued by the signal handlers and bulk actions with the day the events
+    # happened, so a backlog is still counted on the right date.
+    record(club_id, date.fromisoformat(day), **deltas)
+
+
+def queue_events(club_id, **deltas):
+    # Writing the rollup row is left to a worker: under a burst of joins it is
+    # a hot row that requests would otherwise wait on.
+    if any(deltas.values()):
+        record_events.enqueue(club_id, timezone.localdate().isoformat(), **deltas)
+
+
+def membership_events(old_state, new_state):
+    if new_state is None:
+        return {}
+    old_status = old_state[1] if old_state else None
+    new_status = new_state[1]
+    return {
+        'joins': int(old_state is None),
+        'approvals': int(old_status == 'PENDING' and new_status == 'APPROVED'),
+        'rejections': int(old_status == 'PENDING' and new_status == 'REJECTED'),
+    }
+
+
+def post_events(old_state, new_state):
+    published_before = bool(old_state and old_state[1])
+    published_now = bool(new_state and new_state[1])
+    return {'posts': int(published_now and not published_before)}
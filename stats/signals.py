@@ -0,0 +1,15 @@
+from django.dispatch import receiver
+from clubs.signals import tracked_state_changed
+from memberships.models import Membership
+from posts.models import Post
+from stats.rollup import membership_events, post_events, queue_events
+
+
+@receiver(tracked_state_changed, sender=Membership)
+@receiver(tracked_state_changed, sender=Post)
+def record_club_events(sender, instance, old_state, new_state, **kwargs):
+    if new_state is None:
+        # Deletions do not rewrite history.
+        return
+    events = membership_events if sender is Membership else post_events
+    queue_events(new_state[0], **events(old_state, new_state))
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from benchmarks.testing import QueryBudgetMixin
+from clubs.models import Club
+from memberships.models import Membership
+from posts.models import Post
+from stats.models import ClubDailyStats, STAT_FIELDS
+from tasks.worker import run_tasks
+
+
+User = get_user_model()
+
+
+class ClubDailyStatsTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin')
+        cls.club = Club.objects.create(name='Chess Club', description='Weekly games', creator=cls.admin)
+
+    def today(self):
+        run_tasks()
+        row = ClubDailyStats.objects.filter(club=self.club, date=timezone.localdate()).values(*STAT_FIELDS).first()
+        return row or dict.fromkeys(STAT_FIELDS, 0)
+
+    def test_events_are_counted_as_they_happen(self):
+        approved = Membership.objects.create(user=User.objects.create_user('a'), club=self.club)
+        approved.status = 'APPROVED'
+        approved.save()
+        # A later role change is not another approval.
+        approved.role = 'MODERATOR'
+        approved.save()
+        for name in ('b', 'c'):
+            Membership.objects.create(user=User.objects.create_user(name), club=self.club)
+        draft = Post.objects.create(title='Draft', body='Body', club=self.club, author=self.admin, is_published=False)
+        Post.objects.create(title='Results', body='Body', club=self.club, author=self.admin)
+        draft.is_published = True
+        draft.save()
+
+        self.client.force_login(self.admin)
+        self.client.post(
+            reverse('clubs:bulk_membership', kwargs={'pk': self.club.pk}), {'action': 'reject', 'scope': 'all'}
+        )
+        # The creator's admin membership counts as a join too.
+        self.assertEqual(self.today(), {'joins': 4, 'approvals': 1, 'rejections': 2, 'posts': 2})
+
+    def test_rollup_stats_rebuilds_from_rows(self):
+        Membership.objects.create(user=User.objects.create_user('a'), club=self.club, status='APPROVED')
+        Membership.objects.create(user=User.objects.create_user('b'), club=self.club, status='REJECTED')
+        Post.objects.create(title='Results', body='Body', club=self.club, author=self.admin)
+        run_tasks()
+        ClubDailyStats.objects.all().delete()
+
+        call_command('rollup_stats', stdout=open('/dev/null', 'w'))
+        self.assertEqual(self.today(), {'joins': 3, 'approvals': 1, 'rejections': 1, 'posts': 1})
+
+    def test_rollup_stats_drops_the_events_it_counts(self):
+        # Still queued when the rebuild runs: counted from the rows instead.
+        Membership.objects.create(user=User.objects.create_user('a'), club=self.club)
+        other = Club.objects.create(name='Film Club', description='Screenings', creator=self.admin)
+        call_command('rollup_stats', '--club', str(self.club.pk), '--batch-size', '1', stdout=open('/dev/null', 'w'))
+        self.assertEqual(self.today(), {'joins': 2, 'approvals': 0, 'rejections': 0, 'posts': 0})
+        # The other club's queued join was left for the worker.
+        self.assertEqual(ClubDailyStats.objects.get(club=other).joins, 1)
+
+        # Events after the rebuild are added on top.
+        Membership.objects.create(user=User.objects.create_user('b'), club=self.club)
+        self.assertEqual(self.today()['joins'], 3)
+
+    def test_stats_page_reads_rollups(self):
+        Post.objects.create(title='Results', body='Body', club=self.club, author=self.admin)
+        run_tasks()
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('clubs:stats', kwargs={'pk': self.club.pk}), {'days': 365})
+        self.assertEqual(response.status_code, 200)
+        self.assertQueriesOk(response)
+        posts = next(chart for chart in response.context['charts'] if chart['name'] == 'Posts')
+        self.assertEqual((posts['total'], len(posts['bars'])), (1, 1))
+
+    def test_stats_page_is_for_admins(self):
+        member = User.objects.create_user('member')
+        Membership.objects.create(user=member, club=self.club, status='APPROVED')
+        self.client.force_login(member)
+        response = self.client.get(reverse('clubs:stats', kwargs={'pk': self.club.pk}))
+        self.assertEqual(response.status_code, 403)
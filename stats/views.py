@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.utils import timezone
+from django.views.generic import TemplateView
+from clubs.mixins import ClubAdminRequiredMixin, ReplicaReadMixin
+from stats.models import ClubDailyStats, STAT_FIELDS
+
+
+class ClubStatsView(ReplicaReadMixin, LoginRequiredMixin, ClubAdminRequiredMixin, TemplateView):
+    template_name = 'stats/club_stats.html'
+    ranges = (30, 90, 365)
+    default_range = 90
+
+    def get_days(self):
+        try:
+            days = int(self.request.GET.get('days', self.default_range))
+        except ValueError:
+            return self.default_range
+        return days if days in self.ranges else self.default_range
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        club = self.get_club()
+        days = self.get_days()
+        end = timezone.localdate()
+        start = end - timedelta(days=days - 1)
+
+        # At most one row per day; days without events have no row.
+        rollups = {
+            row['date']: row
+            for row in ClubDailyStats.objects.filter(club=club, date__range=(start, end)).values('date', *STAT_FIELDS)
+        }
+        dates = [start + timedelta(days=offset) for offset in range(days)]
+        charts = []
+        for field in STAT_FIELDS:
+            values = [rollups.get(day, {}).get(field, 0) for day in dates]
+            peak = max(values)
+            bars = []
+            for offset, (day, value) in enumerate(zip(dates, values)):
+                if value:
+                    # SVG units: one per day across, 0-100 up from the baseline.
+                    height = value * 100 / peak
+                    bars.append({'x': offset, 'y': 100 - height, 'height': height, 'date': day, 'value': value})
+            charts.append({'name': field.capitalize(), 'total': sum(values), 'peak': peak, 'bars': bars})
+
+        context.update({
+            'club': club,
+            'days': days,
+            'ranges': self.ranges,
+            'start': start,
+            'end': end,
+            'charts': charts,
+        })
+        return context
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from django.utils import timezone
+from tasks.models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'max_attempts', 'run_at', 'created_at']
+    list_filter = ['status', 'name']
+    readonly_fields = ['name', 'args', 'kwargs', 'attempts', 'locked_by', 'last_error', 'created_at']
+    actions = ['retry']
+
+    @admin.action(description='Retry selected tasks now')
+    def retry(self, request, queryset):
+        count = queryset.exclude(status='RUNNING').update(status='PENDING', attempts=0, run_at=timezone.now(), locked_by='')
+        self.message_user(request, f'{count} task(s) queued to run again.')
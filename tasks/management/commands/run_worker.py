@@ -0,0 +1,29 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Run queued background tasks. Any number of workers can run at once, on any hosts; '
+        'each task is claimed by one of them. Stops after the running tasks on SIGINT/SIGTERM.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help='Tasks to run at once (threads).')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--burst', action='store_true', help='Exit once no tasks are due.')
+
+    def handle(self, *args, concurrency, poll_interval, burst, **options):
+        if concurrency < 1:
+            raise CommandError('--concurrency must be positive.')
+        log = self.stdout.write if options['verbosity'] > 1 else None
+        worker = Worker(concurrency=concurrency, poll_interval=poll_interval, burst=burst, log=log)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+
+        self.stdout.write(f'Worker started with {concurrency} thread(s).')
+        worker.run()
+        self.stdout.write('Worker stopped.')
@@ -0,0 +1,52 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from tasks.models import Task
+
+
+_local = threading.local()
+
+
+@contextmanager
+def batch():
+    # Runs the block in a transaction and inserts the tasks it enqueues (one
+    # state change can queue stats, feed and notification work) with a single
+    # statement at the end. A savepoint rolled back inside the block does not
+    # take its tasks with it, so keep the block to the writes that queue them.
+    if getattr(_local, 'pending', None) is not None:
+        yield
+        return
+    _local.pending = []
+    try:
+        with transaction.atomic():
+            yield
+            Task.objects.bulk_create(_local.pending)
+    finally:
+        _local.pending = None
+
+
+def task(func=None, *, max_attempts=None):
+    # Marks a function the worker may run and gives it .enqueue(*args, **kwargs).
+    # Arguments are stored as JSON, so pass ids and plain values.
+    def decorate(func):
+        func.task_name = f'{func.__module__}.{func.__qualname__}'
+        func.max_attempts = max_attempts or settings.TASK_MAX_ATTEMPTS
+
+        @wraps(func)
+        def enqueue(*args, **kwargs):
+            # Written in the caller's transaction: workers see the task once
+            # it commits, and a rollback discards it with the data it was for.
+            queued = Task(name=func.task_name, args=list(args), kwargs=kwargs, max_attempts=func.max_attempts)
+            pending = getattr(_local, 'pending', None)
+            if pending is not None:
+                pending.append(queued)
+            else:
+                queued.save()
+            return queued
+        func.enqueue = enqueue
+        return func
+
+    return decorate(func) if func else decorate
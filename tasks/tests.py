@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from tasks.models import Task
+from tasks.queue import batch, task
+from tasks.worker import claim, run_task, run_tasks
+
+
+User = get_user_model()
+
+
+@task
+def create_user(username):
+    User.objects.create(username=username)
+
+
+@task(max_attempts=2)
+def create_user_then_fail(username):
+    User.objects.create(username=username)
+    raise ValueError('boom')
+
+
+@override_settings(TASK_RETRY_DELAY=10, TASK_RETRY_MAX_DELAY=3600)
+class TaskQueueTests(TestCase):
+    def test_enqueue_and_run(self):
+        create_user.enqueue('queued')
+        self.assertFalse(User.objects.filter(username='queued').exists())
+        self.assertEqual(run_tasks(), 1)
+        self.assertTrue(User.objects.filter(username='queued').exists())
+        self.assertFalse(Task.objects.exists())
+
+    def test_rollback_discards_task(self):
+        try:
+            with transaction.atomic():
+                create_user.enqueue('rolled-back')
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertFalse(Task.objects.exists())
+
+    def test_batch_inserts_tasks_together(self):
+        with self.assertNumQueries(3):  # savepoint, INSERT, release
+            with batch():
+                create_user.enqueue('first')
+                create_user.enqueue('second')
+        with self.assertRaises(ValueError), batch():
+            create_user.enqueue('discarded')
+            raise ValueError
+        self.assertEqual(run_tasks(), 2)
+        self.assertEqual(set(User.objects.values_list('username', flat=True)), {'first', 'second'})
+
+    def test_failure_is_retried_with_backoff_then_kept(self):
+        queued = create_user_then_fail.enqueue('flaky')
+        self.assertEqual(run_tasks(), 0)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.locked_by), ('PENDING', 1, ''))
+        self.assertGreater(queued.run_at, timezone.now() + timedelta(seconds=5))
+        self.assertIn('ValueError: boom', queued.last_error)
+        # The failed attempt's writes were rolled back with it.
+        self.assertFalse(User.objects.filter(username='flaky').exists())
+
+        Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        run_tasks()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('FAILED', 2))
+        self.assertEqual(claim('inline'), [])
+
+    def test_task_is_claimed_once(self):
+        create_user.enqueue('once')
+        claimed = claim('first')
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(claim('second'), [])
+        # After the lock times out, another worker takes it over.
+        Task.objects.update(run_at=timezone.now())
+        stolen = claim('second')
+        self.assertEqual([row.pk for row in stolen], [claimed[0].pk])
+        self.assertFalse(run_task(claimed[0]))
+        self.assertTrue(run_task(stolen[0]))
+        self.assertEqual(User.objects.filter(username='once').count(), 1)
+
+    def test_expired_lock_on_the_last_attempt_fails_the_task(self):
+        # The worker died mid-run on its final attempt, so run_task never
+        # recorded the failure.
+        queued = create_user_then_fail.enqueue('crashed')
+        Task.objects.filter(pk=queued.pk).update(
+            status='RUNNING', attempts=2, locked_by='dead', run_at=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(claim('second'), [])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.locked_by), ('FAILED', 2, ''))
+        self.assertIn('lock expired', queued.last_error)
+        self.assertFalse(User.objects.filter(username='crashed').exists())
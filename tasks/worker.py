@@ -0,0 +1,151 @@
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from tasks.models import Task
+
+
+ACTIVE_STATUSES = ('PENDING', 'RUNNING')
+
+
+class LockLost(Exception):
+    pass
+
+
+def due_tasks(now):
+    # Pending tasks that are due, and running tasks whose worker let the lock
+    # expire (it died, or the task overran TASK_LOCK_TIMEOUT) with attempts
+    # left.
+    return Task.objects.filter(status__in=ACTIVE_STATUSES, run_at__lte=now).exclude(
+        status='RUNNING', attempts__gte=F('max_attempts'),
+    ).order_by('run_at')
+
+
+def fail_exhausted_tasks(now):
+    # A task that kills its worker never reaches run_task's except clause, so
+    # its attempts are checked here instead of it being reclaimed forever.
+    return Task.objects.filter(status='RUNNING', run_at__lte=now, attempts__gte=F('max_attempts')).update(
+        status='FAILED',
+        locked_by='',
+        last_error='The lock expired on the last attempt; the worker likely died running it.',
+    )
+
+
+def claim(worker, limit=1):
+    now = timezone.now()
+    lock = {
+        'status': 'RUNNING',
+        'run_at': now + timedelta(seconds=settings.TASK_LOCK_TIMEOUT),
+        'attempts': F('attempts') + 1,
+        'locked_by': worker,
+    }
+    fail_exhausted_tasks(now)
+    if connection.features.has_select_for_update_skip_locked:
+        # Concurrent workers skip each other's rows instead of queueing on them.
+        with transaction.atomic():
+            ids = list(due_tasks(now).select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit])
+            Task.objects.filter(pk__in=ids).update(**lock)
+    else:
+        # SQLite has no row locks but runs one write at a time, so a guarded
+        # UPDATE hands each task to exactly one worker.
+        ids = [
+            pk for pk in due_tasks(now).values_list('pk', flat=True)[:limit]
+            if due_tasks(now).filter(pk=pk).update(**lock)
+        ]
+    if not ids:
+        return []
+    return list(Task.objects.filter(pk__in=ids).order_by('run_at'))
+
+
+def retry_delay(attempt):
+    return min(settings.TASK_RETRY_DELAY * 2 ** (attempt - 1), settings.TASK_RETRY_MAX_DELAY)
+
+
+def run_task(task):
+    # Returns True when the task finished; failures are rescheduled with
+    # exponential backoff until max_attempts, then kept as FAILED.
+    try:
+        func = import_string(task.name)
+        if getattr(func, 'task_name', None) != task.name:
+            raise ImportError(f'{task.name} is not a registered task.')
+        # The task's writes and the removal of its row commit together, so a
+        # crash or retry never applies them twice.
+        with transaction.atomic():
+            func(*task.args, **task.kwargs)
+            if not Task.objects.filter(pk=task.pk, locked_by=task.locked_by).delete()[0]:
+                raise LockLost
+        return True
+    except LockLost:
+        # Another worker took the task over after our lock expired; it will run it.
+        return False
+    except Exception:
+        failed = task.attempts >= task.max_attempts
+        Task.objects.filter(pk=task.pk, locked_by=task.locked_by).update(
+            status='FAILED' if failed else 'PENDING',
+            run_at=timezone.now() + timedelta(seconds=0 if failed else retry_delay(task.attempts)),
+            locked_by='',
+            last_error=traceback.format_exc(),
+        )
+        return False
+
+
+def run_tasks(worker='inline'):
+    # Runs due tasks in this thread until none are left (tests, shells).
+    done = 0
+    while tasks := claim(worker):
+        for task in tasks:
+            done += run_task(task)
+    return done
+
+
+class Worker:
+    def __init__(self, concurrency=1, poll_interval=1.0, burst=False, log=None):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.log = log or (lambda message: None)
+        self.stopping = threading.Event()
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self.work, name=f'worker-{index}') for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def stop(self):
+        self.stopping.set()
+
+    def work(self):
+        # Each thread has its own database connection.
+        name = f'{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}'
+        try:
+            while not self.stopping.is_set():
+                connection.close_if_unusable_or_obsolete()
+                try:
+                    tasks = claim(name)
+                except DatabaseError as exc:
+                    # The database is restarting, or not migrated yet; try again.
+                    self.log(f'claim failed: {exc}')
+                    connection.close()
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                if not tasks:
+                    if self.burst:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                for task in tasks:
+                    finished = run_task(task)
+                    self.log(f"{'done' if finished else 'failed'} {task.name} #{task.pk} (attempt {task.attempts})")
+        finally:
+            connection.close()
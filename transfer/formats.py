@@ -0,0 +1,87 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+
+FORMATS = ('jsonl', 'csv')
+
+# Exported columns per record type, in order, and the values() lookup each is
+# read from. Clubs are referenced by slug and users by username so files can
+# move between databases; import_clubhub reads the same columns.
+RECORDS = {
+    'clubs': {
+        'name': 'name',
+        'slug': 'slug',
+        'description': 'description',
+        'creator': 'creator__username',
+        'created_at': 'created_at',
+    },
+    'memberships': {
+        'club': 'club__slug',
+        'user': 'user__username',
+        'role': 'role',
+        'status': 'status',
+        'created_at': 'created_at',
+    },
+    'posts': {
+        'club': 'club__slug',
+        'author': 'author__username',
+        'title': 'title',
+        'body': 'body',
+        'type': 'type',
+        'is_published': 'is_published',
+        'created_at': 'created_at',
+    },
+}
+
+
+class Echo:
+    # A file-like object whose write() hands the line back, so csv.writer
+    # rows can be yielded to a StreamingHttpResponse.
+    def write(self, value):
+        return value
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def guess_format(path, default='jsonl'):
+    suffix = Path(path).suffix.lstrip('.').lower() if path and path != '-' else ''
+    return suffix if suffix in FORMATS else default
+
+
+def read_rows(stream, fmt):
+    # Yields (line number, row) one at a time. JSONL lines that do not parse
+    # as an object come through as None for the importer to report.
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def row_writer(stream, fmt, columns):
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=columns)
+        writer.writeheader()
+        return writer.writerow
+    return lambda row: stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def export_value(value):
+    # Full precision ISO 8601 in both formats; DjangoJSONEncoder would drop
+    # the microseconds.
+    return value.isoformat() if isinstance(value, datetime) else value
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from clubs.models import Club
+from memberships.models import Membership
+from posts.models import Post
+from transfer.formats import FORMATS, RECORDS, export_value, guess_format, row_writer
+
+
+MODELS = {'clubs': Club, 'memberships': Membership, 'posts': Post}
+
+
+class Command(BaseCommand):
+    help = (
+        'Export clubs, memberships or posts as JSONL or CSV for import_clubhub. Rows are '
+        'streamed from the database in chunks, so memory use does not grow with the table.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('records', choices=RECORDS)
+        parser.add_argument('path', nargs='?', default='-', help='Output file; - (default) for stdout.')
+        parser.add_argument('--format', choices=FORMATS, dest='fmt',
+                            help='Defaults to the file extension, else jsonl.')
+        parser.add_argument('--club', action='append', dest='club_slugs',
+                            help='Only export the club with this slug (repeatable).')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, records, path, fmt, club_slugs, chunk_size, **options):
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be positive.')
+        fmt = fmt or guess_format(path)
+        columns = RECORDS[records]
+
+        queryset = MODELS[records].objects.order_by('pk')
+        if club_slugs:
+            queryset = queryset.filter(**{'slug__in' if records == 'clubs' else 'club__slug__in': club_slugs})
+        # Keep stdout clean for the data when that is where it goes.
+        log = self.stderr if path == '-' else self.stdout
+        rows = queryset.values_list(*columns.values()).iterator(chunk_size=chunk_size)
+
+        stream = self.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        try:
+            write = row_writer(stream, fmt, list(columns))
+            exported = 0
+            for values in rows:
+                write(dict(zip(columns, map(export_value, values))))
+                exported += 1
+                if options['verbosity'] > 1 and not exported % chunk_size:
+                    log.write(f'Exported {exported} {records}')
+        finally:
+            if stream is not self.stdout:
+                stream.close()
+
+        log.write(self.style.SUCCESS(f'Exported {exported} {records}.'))
@@ -0,0 +1,284 @@
+import sys
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+from clubs.cache import bump_club_version
+from clubs.models import Club
+from clubs.signals import MEMBERSHIP_COUNTERS
+from memberships.models import Membership
+from posts.models import Post, make_excerpt
+from transfer.formats import FORMATS, RECORDS, batched, guess_format, read_rows
+
+
+MODELS = {'clubs': Club, 'memberships': Membership, 'posts': Post}
+
+# Columns holding a club slug or a username rather than a model field value.
+CLUB_COLUMNS = {'club'}
+USER_COLUMNS = {'creator', 'user', 'author'}
+
+
+class RowError(Exception):
+    pass
+
+
+def bulk_create_keeping_created_at(model, objects):
+    # bulk_create runs pre_save(), which stamps the auto_now_add field with
+    # the current time; imported rows get the created_at they came with back.
+    created_at = [obj.created_at for obj in objects]
+    model.objects.bulk_create(objects)
+    for obj, value in zip(objects, created_at):
+        obj.created_at = value
+    model.objects.bulk_update(objects, ['created_at'])
+
+
+class Command(BaseCommand):
+    help = (
+        'Import clubs, memberships or posts from JSONL or CSV in the layout export_clubhub '
+        'writes. The input is streamed and inserted with bulk_create, one transaction per '
+        'batch; rows that already exist are skipped, so an interrupted run can be repeated, '
+        'or resumed with --resume-from to skip the lines already read.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('records', choices=RECORDS)
+        parser.add_argument('path', help='Input file; - for stdin.')
+        parser.add_argument('--format', choices=FORMATS, dest='fmt',
+                            help='Defaults to the file extension, else jsonl.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--resume-from', type=int, default=1, metavar='LINE',
+                            help='Skip input lines before LINE, e.g. after the last one a run committed.')
+        parser.add_argument('--create-users', action='store_true',
+                            help='Create unknown users (with unusable passwords) instead of rejecting their rows.')
+
+    def handle(self, *args, records, path, fmt, batch_size, resume_from, create_users, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+        self.records = records
+        self.model = MODELS[records]
+        self.create_users = create_users
+        self.verbosity = options['verbosity']
+        self.totals = Counter()
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            rows = ((line, row) for line, row in read_rows(stream, fmt or guess_format(path)) if line >= resume_from)
+            for batch in batched(rows, batch_size):
+                self.import_batch(batch)
+                if self.verbosity > 0:
+                    self.stdout.write(f'Committed through line {batch[-1][0]}: {self.progress()}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(self.style.SUCCESS(f'Import of {records} finished: {self.progress()}.'))
+        if records != 'clubs' and self.totals['created']:
+            self.stdout.write('Run rollup_stats and rebuild_feeds to include the imported rows in stats and feeds.')
+
+    def progress(self):
+        return (f"{self.totals['created']} created, {self.totals['existing']} already present, "
+                f"{self.totals['rejected']} rejected")
+
+    def reject(self, line, message):
+        self.totals['rejected'] += 1
+        if self.verbosity > 0:
+            self.stderr.write(f'line {line}: {message}')
+
+    def import_batch(self, batch):
+        rows = []
+        for line, row in batch:
+            try:
+                rows.append((line, self.clean(row)))
+            except RowError as exc:
+                self.reject(line, exc)
+        with transaction.atomic():
+            getattr(self, f'insert_{self.records}')(rows)
+
+    def clean(self, row):
+        if row is None:
+            raise RowError('not a JSON object')
+        username_field = get_user_model()._meta.get_field(get_user_model().USERNAME_FIELD)
+        values = {}
+        for column in RECORDS[self.records]:
+            value = row.get(column)
+            if isinstance(value, str):
+                value = value.strip()
+            if column in CLUB_COLUMNS | USER_COLUMNS:
+                if not value:
+                    raise RowError(f'{column}: this field is required')
+                field = username_field if column in USER_COLUMNS else Club._meta.get_field('slug')
+            else:
+                field = self.model._meta.get_field(column)
+                if value in (None, ''):
+                    value = timezone.now() if column == 'created_at' else field.get_default()
+                if column == 'slug' and not value:
+                    value = slugify(row.get('name') or '')
+            try:
+                value = field.clean(value, None)
+            except ValidationError as exc:
+                raise RowError(f"{column}: {' '.join(exc.messages)}")
+            if column == 'slug' and not value:
+                raise RowError('slug: cannot be derived from the name')
+            if column == 'created_at' and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            values[column] = value
+        return values
+
+    def user_ids(self, usernames):
+        User = get_user_model()
+        lookup = f'{User.USERNAME_FIELD}__in'
+        found = dict(User.objects.filter(**{lookup: usernames}).values_list(User.USERNAME_FIELD, 'pk'))
+        missing = set(usernames) - set(found)
+        if missing and self.create_users:
+            User.objects.bulk_create(
+                [User(**{User.USERNAME_FIELD: name, 'password': make_password(None)}) for name in sorted(missing)],
+                ignore_conflicts=True,
+            )
+            found.update(User.objects.filter(**{lookup: missing}).values_list(User.USERNAME_FIELD, 'pk'))
+        return found
+
+    def club_ids(self, slugs):
+        return dict(Club.objects.filter(slug__in=slugs).values_list('slug', 'pk'))
+
+    def resolve(self, rows, club_column, user_column):
+        # Swaps slugs and usernames for ids; rows that name unknown ones are rejected.
+        clubs = self.club_ids({values[club_column] for _, values in rows}) if club_column else {}
+        users = self.user_ids({values[user_column] for _, values in rows})
+        resolved = []
+        for line, values in rows:
+            if club_column and values[club_column] not in clubs:
+                self.reject(line, f"unknown club {values[club_column]!r}")
+            elif values[user_column] not in users:
+                self.reject(line, f"unknown user {values[user_column]!r}")
+            else:
+                values['club_id'] = clubs.get(values.get(club_column))
+                values['user_id'] = users[values[user_column]]
+                resolved.append(values)
+        return resolved
+
+    def update_clubs(self, deltas):
+        for club_id, club_deltas in deltas.items():
+            Club.objects.bump_counters(club_id, **club_deltas)
+            bump_club_version(club_id)
+
+    def insert_clubs(self, rows):
+        rows = self.resolve(rows, None, 'creator')
+        taken = Club.objects.filter(
+            Q(name__in=[values['name'] for values in rows]) | Q(slug__in=[values['slug'] for values in rows])
+        ).values_list('name', 'slug')
+        taken_names = {name for name, _ in taken}
+        taken_slugs = {slug for _, slug in taken}
+
+        clubs = []
+        for values in rows:
+            if values['name'] in taken_names or values['slug'] in taken_slugs:
+                self.totals['existing'] += 1
+                continue
+            taken_names.add(values['name'])
+            taken_slugs.add(values['slug'])
+            clubs.append(Club(
+                name=values['name'],
+                slug=values['slug'],
+                description=values['description'],
+                creator_id=values['user_id'],
+                created_at=values['created_at'],
+                approved_member_count=1,
+            ))
+        bulk_create_keeping_created_at(Club, clubs)
+        # bulk_create sends no post_save, so the create_admin_membership signal
+        # does not run; the creators' admin memberships are inserted here.
+        bulk_create_keeping_created_at(Membership, [
+            Membership(user_id=club.creator_id, club_id=club.pk, role='ADMIN', status='APPROVED',
+                       created_at=club.created_at)
+            for club in clubs
+        ])
+        self.totals['created'] += len(clubs)
+
+    def insert_memberships(self, rows):
+        # A user may hold several memberships of a club (rejected, then asked
+        # again), so a row is already present only if one matches it exactly,
+        # if it is a second pending request, which the constraint forbids, or
+        # if it is the creator's admin membership the clubs import wrote.
+        rows = self.resolve(rows, 'club', 'user')
+        existing = set()
+        pending = set()
+        admins = set()
+        for user_id, club_id, role, status, created_at in Membership.objects.filter(
+            club_id__in={values['club_id'] for values in rows},
+            user_id__in={values['user_id'] for values in rows},
+        ).values_list('user_id', 'club_id', 'role', 'status', 'created_at'):
+            existing.add((user_id, club_id, status, created_at))
+            if status == 'PENDING':
+                pending.add((user_id, club_id))
+            if role == 'ADMIN':
+                admins.add((user_id, club_id))
+
+        memberships = []
+        deltas = defaultdict(Counter)
+        for values in rows:
+            pair = (values['user_id'], values['club_id'])
+            key = (*pair, values['status'], values['created_at'])
+            if (
+                key in existing
+                or (values['status'] == 'PENDING' and pair in pending)
+                or (values['role'] == 'ADMIN' and pair in admins)
+            ):
+                self.totals['existing'] += 1
+                continue
+            existing.add(key)
+            if values['status'] == 'PENDING':
+                pending.add(pair)
+            if values['role'] == 'ADMIN':
+                admins.add(pair)
+            memberships.append(Membership(
+                user_id=values['user_id'],
+                club_id=values['club_id'],
+                role=values['role'],
+                status=values['status'],
+                created_at=values['created_at'],
+            ))
+            counter = MEMBERSHIP_COUNTERS.get(values['status'])
+            if counter:
+                deltas[values['club_id']][counter] += 1
+        bulk_create_keeping_created_at(Membership, memberships)
+        self.update_clubs(deltas)
+        self.totals['created'] += len(memberships)
+
+    def insert_posts(self, rows):
+        # Posts have no unique key; the club, author, creation time and title
+        # together stand in for one, so a rerun does not duplicate them.
+        rows = self.resolve(rows, 'club', 'author')
+        existing = set(Post.objects.filter(
+            club_id__in={values['club_id'] for values in rows},
+            created_at__in={values['created_at'] for values in rows},
+        ).values_list('club_id', 'author_id', 'created_at', 'title'))
+
+        posts = []
+        deltas = defaultdict(Counter)
+        for values in rows:
+            key = (values['club_id'], values['user_id'], values['created_at'], values['title'])
+            if key in existing:
+                self.totals['existing'] += 1
+                continue
+            existing.add(key)
+            posts.append(Post(
+                title=values['title'],
+                body=values['body'],
+                excerpt=make_excerpt(values['body']),
+                type=values['type'],
+                is_published=values['is_published'],
+                club_id=values['club_id'],
+                author_id=values['user_id'],
+                created_at=values['created_at'],
+            ))
+            if values['is_published']:
+                deltas[values['club_id']]['published_post_count'] += 1
+        bulk_create_keeping_created_at(Post, posts)
+        self.update_clubs(deltas)
+        self.totals['created'] += len(posts)
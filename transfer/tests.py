@@ -0,0 +1,117 @@
+import json
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from clubs.models import Club
+from memberships.models import Membership
+from posts.models import Post
+
+
+User = get_user_model()
+
+
+class TransferCommandTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return str(Path(self.directory.name) / name)
+
+    def write(self, name, lines):
+        Path(self.path(name)).write_text(''.join(json.dumps(line) + '\n' for line in lines))
+        return self.path(name)
+
+    def run_command(self, *args, **options):
+        out, err = StringIO(), StringIO()
+        call_command(*args, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_round_trip(self):
+        creator = User.objects.create_user('creator')
+        club = Club.objects.create(name='Chess Club', description='Weekly games', creator=creator)
+        Membership.objects.create(user=User.objects.create_user('member'), club=club, status='APPROVED')
+        Membership.objects.create(user=User.objects.create_user('pending'), club=club)
+        Post.objects.create(title='Opening night', body='Body text', club=club, author=creator)
+        Post.objects.create(title='Draft', body='Later', club=club, author=creator, is_published=False)
+        created_at = Post.objects.get(title='Opening night').created_at
+
+        for records, fmt in (('clubs', 'csv'), ('memberships', 'jsonl'), ('posts', 'csv')):
+            self.run_command('export_clubhub', records, self.path(f'{records}.{fmt}'), chunk_size=1)
+        Club.objects.all().delete()
+
+        for records, fmt in (('clubs', 'csv'), ('memberships', 'jsonl'), ('posts', 'csv')):
+            self.run_command('import_clubhub', records, self.path(f'{records}.{fmt}'), batch_size=1)
+
+        club = Club.objects.get(slug='chess-club')
+        self.assertEqual(
+            (club.approved_member_count, club.pending_request_count, club.published_post_count), (2, 1, 1)
+        )
+        self.assertEqual(club.membership_set.get(user=creator).role, 'ADMIN')
+        post = Post.objects.get(title='Opening night')
+        self.assertEqual(post.created_at, created_at)
+        self.assertEqual(post.excerpt, 'Body text')
+
+        # Rerunning skips what is already there.
+        out, _ = self.run_command('import_clubhub', 'memberships', self.path('memberships.jsonl'))
+        self.assertIn('0 created, 3 already present', out)
+        out, _ = self.run_command('import_clubhub', 'posts', self.path('posts.csv'))
+        self.assertIn('0 created, 2 already present', out)
+        club.refresh_from_db()
+        self.assertEqual((club.approved_member_count, club.published_post_count), (2, 1))
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertTrue(Post._meta.get_field('created_at').auto_now_add)
+
+    def test_rejected_and_new_pending_request_are_both_kept(self):
+        creator = User.objects.create_user('creator')
+        Club.objects.create(name='Chess Club', description='Weekly games', creator=creator)
+        path = self.write('memberships.jsonl', [
+            {'club': 'chess-club', 'user': 'joiner', 'status': 'REJECTED', 'created_at': '2025-01-01T00:00:00+00:00'},
+            {'club': 'chess-club', 'user': 'joiner', 'status': 'PENDING', 'created_at': '2025-02-01T00:00:00+00:00'},
+            {'club': 'chess-club', 'user': 'joiner', 'status': 'PENDING', 'created_at': '2025-03-01T00:00:00+00:00'},
+        ])
+        out, _ = self.run_command('import_clubhub', 'memberships', path, create_users=True)
+        self.assertIn('2 created, 1 already present', out)
+        self.assertEqual(
+            sorted(Membership.objects.filter(user__username='joiner').values_list('status', flat=True)),
+            ['PENDING', 'REJECTED'],
+        )
+        out, _ = self.run_command('import_clubhub', 'memberships', path, create_users=True)
+        self.assertIn('0 created, 3 already present', out)
+        club = Club.objects.get()
+        self.assertEqual((club.approved_member_count, club.pending_request_count), (1, 1))
+
+    def test_invalid_rows_are_rejected(self):
+        User.objects.create_user('creator')
+        path = self.write('clubs.jsonl', [
+            {'name': 'Chess Club', 'description': 'Weekly games', 'creator': 'creator',
+             'created_at': '2025-01-02T03:04:05+00:00'},
+            {'name': 'No Description', 'creator': 'creator'},
+            {'name': 'Ghost Club', 'description': 'Boo', 'creator': 'nobody'},
+            {'name': 'Chess Club', 'description': 'Duplicate', 'creator': 'creator'},
+        ])
+        out, err = self.run_command('import_clubhub', 'clubs', path)
+        self.assertIn('1 created, 1 already present, 2 rejected', out)
+        self.assertIn('line 2: description', err)
+        self.assertIn("line 3: unknown user 'nobody'", err)
+        club = Club.objects.get()
+        self.assertEqual(club.created_at, datetime(2025, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc))
+        self.assertEqual(club.approved_member_count, 1)
+
+    def test_create_users_and_resume(self):
+        creator = User.objects.create_user('creator')
+        Club.objects.create(name='Chess Club', description='Weekly games', creator=creator)
+        path = self.write('memberships.jsonl', [
+            {'club': 'chess-club', 'user': 'first', 'status': 'APPROVED'},
+            {'club': 'chess-club', 'user': 'second'},
+        ])
+        self.run_command('import_clubhub', 'memberships', path, create_users=True, resume_from=2)
+        self.assertFalse(User.objects.filter(username='first').exists())
+        membership = Membership.objects.get(user__username='second')
+        self.assertEqual((membership.role, membership.status), ('MEMBER', 'PENDING'))
+        self.assertFalse(membership.user.has_usable_password())